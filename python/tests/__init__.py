@@ -0,0 +1,16 @@
+"""
+    Tests for the parts of vtool that run without Maya.
+
+    Run from the python folder with:
+        python -m unittest discover -s tests -t .
+"""
+
+import os
+import sys
+import tempfile
+
+python_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if python_path not in sys.path:
+    sys.path.insert(0, python_path)
+
+os.environ.setdefault('VETALA_SETTINGS', tempfile.mkdtemp(prefix='vetala_settings_'))
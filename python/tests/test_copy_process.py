@@ -0,0 +1,67 @@
+from __future__ import absolute_import
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from vtool import util_file
+from vtool.process_manager import process
+
+
+class CopyProcessTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='vtool_copy_')
+        self.target = os.path.join(self.directory, 'target')
+        os.makedirs(self.target)
+
+        self.process = process.Process('source')
+        self.process.set_directory(self.directory)
+        self.process.create()
+
+        self.filepath = os.path.join(self.process.get_path(), 'notes.txt')
+        self._save_version(self.filepath, 'one\n', 'source v1')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _save_version(self, filepath, text, comment):
+        with open(filepath, 'w') as open_file:
+            open_file.write(text)
+
+        util_file.VersionFile(filepath).save(comment)
+
+    def test_hardlink_copy_keeps_index_separate(self):
+        new_process = process.copy_process(self.process, self.target, exclude_history=False, link='hardlink')
+
+        version_folder = os.path.join(self.process.get_path(), '.version')
+        new_version_folder = os.path.join(new_process.get_path(), '.version')
+
+        for name in ('comments.txt', 'history.jsonl'):
+            self.assertEqual(os.stat(os.path.join(new_version_folder, name)).st_nlink, 1)
+
+        self.assertEqual(os.stat(os.path.join(new_version_folder, 'version.1')).st_nlink,
+                         os.stat(os.path.join(version_folder, 'version.1')).st_nlink)
+
+        new_filepath = os.path.join(new_process.get_path(), 'notes.txt')
+        self._save_version(new_filepath, 'two\n', 'copy v2')
+
+        source_versions = util_file.VersionFile(self.filepath)
+        self.assertEqual(source_versions.get_version_numbers(), [1])
+        with open(os.path.join(version_folder, 'comments.txt')) as comment_file:
+            self.assertNotIn('copy v2', comment_file.read())
+
+    def test_failed_copy_is_removed(self):
+
+        def fail(done, total, filepath):
+            raise IOError('disk full')
+
+        new_process = process.copy_process(self.process, self.target, progress_function=fail)
+
+        self.assertIsNone(new_process)
+        self.assertEqual(os.listdir(self.target), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
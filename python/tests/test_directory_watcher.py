@@ -0,0 +1,107 @@
+from __future__ import absolute_import
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from vtool import util_file
+from vtool.process_manager import process
+
+
+class ManualWatcher(util_file.DirectoryWatcher):
+    # polled by the test instead of a thread.
+
+    def start(self):
+        pass
+
+
+class PollingWatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = util_file.fix_slashes(tempfile.mkdtemp(prefix='vtool_watch_'))
+        os.makedirs(os.path.join(self.directory, 'sub'))
+
+        self.watcher = ManualWatcher(use_inotify=False)
+
+    def tearDown(self):
+        self.watcher.stop()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _poll(self):
+        return set((event.kind, event.path) for event in self.watcher.poll())
+
+    def test_flat_watch_lists_only_its_folder(self):
+        self.assertTrue(self.watcher.watch(self.directory, recursive=False))
+        self.assertFalse(self.watcher.is_watching(self.directory + '/sub'))
+
+        os.makedirs(os.path.join(self.directory, 'new'))
+        os.makedirs(os.path.join(self.directory, 'sub', 'inner'))
+
+        self.assertEqual(self._poll(), set([('add', self.directory + '/new')]))
+
+    def test_recursive_watch_reports_new_folder_contents(self):
+        self.watcher.watch(self.directory)
+
+        os.makedirs(os.path.join(self.directory, 'sub', 'inner', 'deeper'))
+        shutil.rmtree(os.path.join(self.directory, 'sub', 'inner', 'deeper'))
+        os.makedirs(os.path.join(self.directory, 'sub', 'inner', 'deep'))
+
+        self.assertEqual(self._poll(), set([('add', self.directory + '/sub/inner'),
+                                            ('add', self.directory + '/sub/inner/deep')]))
+
+        shutil.rmtree(os.path.join(self.directory, 'sub'))
+
+        self.assertEqual(self._poll(), set([('remove', self.directory + '/sub')]))
+
+    def test_unchanged_folders_are_not_listed(self):
+        self.watcher.watch(self.directory)
+        self.watcher._get_backend().mtime_resolution = -1.0
+
+        listed = []
+        list_folder = self.watcher._list
+
+        def count_list(folder):
+            listed.append(folder)
+            return list_folder(folder)
+
+        self.watcher._list = count_list
+
+        with open(os.path.join(self.directory, 'sub', 'file.txt'), 'w') as open_file:
+            open_file.write('text')
+
+        self.assertEqual(self._poll(), set([('add', self.directory + '/sub/file.txt')]))
+        self.assertEqual(listed, [self.directory + '/sub'])
+
+        listed[:] = []
+
+        self.assertEqual(self._poll(), set())
+        self.assertEqual(listed, [])
+
+    def test_watches_are_counted(self):
+        self.watcher.watch(self.directory, recursive=False)
+        self.watcher.watch(self.directory, recursive=False)
+
+        self.watcher.unwatch(self.directory, recursive=False)
+        self.assertTrue(self.watcher.is_watching(self.directory))
+
+        self.watcher.unwatch(self.directory, recursive=False)
+        self.assertFalse(self.watcher.is_watching(self.directory))
+
+    def test_scanner_does_not_trust_flat_watch(self):
+        os.makedirs(os.path.join(self.directory, 'folder'))
+        self.watcher.watch(self.directory, recursive=False)
+
+        scanner = process.ProcessTreeScanner()
+        scanner.set_watcher(self.watcher)
+
+        self.assertEqual(sorted(scanner.scan(self.directory)[1]), ['folder', 'sub'])
+
+        os.makedirs(os.path.join(self.directory, 'folder', '.code'))
+
+        self.assertEqual(scanner.scan(self.directory), [['folder'], ['sub']])
+        self.assertEqual(scanner.watch_hits, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+from __future__ import absolute_import
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from vtool import util_file
+
+
+class FolderSizeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = util_file.fix_slashes(tempfile.mkdtemp(prefix='vtool_size_'))
+        self.filepath = os.path.join(self.directory, 'sub', 'file.txt')
+
+        os.makedirs(os.path.join(self.directory, 'sub'))
+        os.makedirs(os.path.join(self.directory, '.version'))
+
+        self._write(self.filepath, 1000)
+        self._write(os.path.join(self.directory, '.version', 'version.1'), 500)
+
+    def tearDown(self):
+        util_file.FolderSizeService.clear(self.directory)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _write(self, filepath, size):
+        with open(filepath, 'wb') as open_file:
+            open_file.write(b'x' * size)
+
+    def test_size_bytes(self):
+        service = util_file.FolderSizeService()
+
+        self.assertEqual(service.get_size_bytes(self.directory), 1500)
+        self.assertEqual(service.get_size_bytes(self.directory, ['.version']), 1000)
+
+    def test_file_rewritten_in_place(self):
+        util_file.get_folder_size_service().get_size_bytes(self.directory)
+
+        mtime = os.stat(os.path.join(self.directory, 'sub')).st_mtime
+        self._write(self.filepath, 3000)
+        os.utime(os.path.join(self.directory, 'sub'), (mtime, mtime))
+
+        self.assertEqual(util_file.get_folder_size(self.directory, 4), 0.0035)
+        self.assertEqual(util_file.get_folder_size_service().get_size_bytes(self.directory), 3500)
+
+
+class HardlinkSizeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = util_file.fix_slashes(tempfile.mkdtemp(prefix='vtool_size_'))
+        self.filepath = os.path.join(self.directory, 'script.py')
+
+    def tearDown(self):
+        util_file.FolderSizeService.clear(self.directory)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _get_unique_size(self):
+        inodes = {}
+        for root, folders, files in os.walk(self.directory):
+            for name in files:
+                stat = os.lstat(os.path.join(root, name))
+                inodes[(stat.st_dev, stat.st_ino)] = stat.st_size
+
+        return sum(inodes.values())
+
+    def test_version_links_counted_once(self):
+        version_file = util_file.VersionFile(self.filepath)
+
+        for text in ('a' * 700, 'b' * 900):
+            with open(self.filepath, 'w') as open_file:
+                open_file.write(text)
+            version_file.save('save')
+
+        if os.stat(version_file.get_version_path(1)).st_nlink < 2:
+            self.skipTest('version files are not hardlinked on this file system')
+
+        for cache in (True, False):
+            service = util_file.FolderSizeService(cache=cache)
+            self.assertEqual(service.get_size_bytes(self.directory), self._get_unique_size())
+
+
+if __name__ == '__main__':
+    unittest.main()
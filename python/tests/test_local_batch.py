@@ -0,0 +1,67 @@
+from __future__ import absolute_import
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from vtool import util_file
+from vtool.process_manager import process
+
+
+def create_process(directory, name, script_text):
+    process_inst = process.Process(name)
+    process_inst.set_directory(directory)
+    process_inst.create()
+
+    process_inst.create_code('build', 'script.python')
+    util_file.write_replace(process_inst.get_code_file('build'), script_text)
+    process_inst.set_manifest(['build.py'], [True])
+
+    return process_inst.get_path()
+
+
+class LocalBatchRunnerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='vtool_batch_')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_pass_fail_and_timeout(self):
+        passing = create_process(self.directory, 'passing', 'def main():\n    pass\n')
+        failing = create_process(self.directory, 'failing', 'def main():\n    raise RuntimeError("broken")\n')
+        slow = create_process(self.directory, 'slow', 'import time\n\ndef main():\n    time.sleep(120)\n')
+
+        runner = process.LocalBatchRunner(sys.executable, max_jobs=3, timeout=5, save=False)
+        report = runner.run([passing, failing, slow])
+
+        jobs = dict((job['path'], job) for job in report['jobs'])
+
+        self.assertEqual((report['passed'], report['failed'], report['timed_out']), (1, 1, 1))
+
+        self.assertEqual(jobs[passing]['status'], 'pass')
+        self.assertEqual(jobs[passing]['status_list'], [['build.py', 'Success']])
+
+        self.assertEqual(jobs[failing]['status'], 'fail')
+        self.assertEqual(jobs[failing]['errors'], ['build.py'])
+
+        self.assertEqual(jobs[slow]['status'], 'timeout')
+        self.assertLess(jobs[slow]['seconds'], 60)
+
+        for job in report['jobs']:
+            self.assertTrue(os.path.isfile(job['log']))
+
+        self.assertIn('Passed: 1   Failed: 1   Timed out: 1', runner.get_report_text(report))
+
+    def test_default_max_jobs(self):
+        runner = process.LocalBatchRunner(sys.executable)
+
+        self.assertGreaterEqual(runner.max_jobs, 1)
+        self.assertLessEqual(runner.max_jobs, process.LocalBatchRunner.default_max_jobs)
+
+
+if __name__ == '__main__':
+    unittest.main()
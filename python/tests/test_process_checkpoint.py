@@ -0,0 +1,88 @@
+from __future__ import absolute_import
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from vtool import util_file
+from vtool.process_manager import process
+
+
+class CheckpointTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='vtool_checkpoint_')
+        self.log_path = os.path.join(self.directory, 'log.txt')
+
+        self.process = process.Process('build')
+        self.process.set_directory(self.directory)
+        self.process.create()
+
+        self._set_script('skeleton', 'put.joint_count = 3\n    log("skeleton")')
+        self._set_script('rig', 'log("rig %s" % put.joint_count)')
+
+        self.process.set_manifest(['skeleton.py', 'rig.py'], [True, True])
+        self.process.set_checkpoint_scripts(['skeleton.py'])
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _set_script(self, name, body):
+        text = 'def log(text):\n' \
+               '    with open(%r, "a") as log_file:\n' \
+               '        log_file.write(text + "\\n")\n\n' \
+               'def main():\n' \
+               '    %s\n' % (self.log_path, body)
+
+        if not self.process.get_code_file(name):
+            self.process.create_code(name, 'script.python')
+
+        util_file.write_replace(self.process.get_code_file(name), text)
+
+    def _run(self, **kwargs):
+        process_inst = process.Process()
+        process_inst.set_directory(self.process.get_path())
+        return process_inst.run(**kwargs)
+
+    def _read_log(self):
+        with open(self.log_path) as log_file:
+            lines = log_file.read().splitlines()
+
+        os.remove(self.log_path)
+
+        return lines
+
+    def test_resume_after_checkpoint(self):
+        self.assertEqual(self._run(), [['skeleton.py', 'Success'], ['rig.py', 'Success']])
+        self.assertEqual(self._read_log(), ['skeleton', 'rig 3'])
+
+        self.assertEqual(self._run(), [['skeleton.py', 'Checkpoint'], ['rig.py', 'Success']])
+        self.assertEqual(self._read_log(), ['rig 3'])
+
+    def test_changed_script_invalidates_checkpoint(self):
+        self._run()
+        self._read_log()
+
+        self._set_script('skeleton', 'put.joint_count = 5\n    log("skeleton")')
+
+        self.assertEqual(self._run(), [['skeleton.py', 'Success'], ['rig.py', 'Success']])
+        self.assertEqual(self._read_log(), ['skeleton', 'rig 5'])
+
+    def test_resume_off(self):
+        self._run()
+        self._read_log()
+
+        self._run(resume=False)
+        self.assertEqual(self._read_log(), ['skeleton', 'rig 3'])
+
+    def test_failed_build_saves_no_checkpoint(self):
+        self._set_script('skeleton', 'raise RuntimeError("broken")')
+
+        self._run()
+
+        self.assertFalse(os.path.isdir(os.path.join(self.process.get_checkpoint_path(), 'skeleton')))
+
+
+if __name__ == '__main__':
+    unittest.main()
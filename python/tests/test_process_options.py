@@ -0,0 +1,63 @@
+from __future__ import absolute_import
+
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from vtool.process_manager import process
+
+
+class ProcessOptionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='vtool_options_')
+
+        self.process = process.Process('options')
+        self.process.set_directory(self.directory)
+        self.process.create()
+
+        self.process.add_option('count', 1, 'rig')
+        self.process.add_option('side', 'L', 'rig')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _edit_on_disk(self, name, value):
+        filepath = os.path.join(self.process.get_path(), 'options.json')
+
+        with open(filepath) as open_file:
+            data = json.load(open_file)
+
+        data = [[key, value if key == name else old_value] for key, old_value in data]
+        if name not in [key for key, old_value in data]:
+            data.append([name, value])
+
+        time.sleep(0.01)
+        with open(filepath, 'w') as open_file:
+            json.dump(data, open_file)
+
+    def test_get_option(self):
+        self.assertEqual(self.process.get_option('count', 'rig'), 1)
+        self.assertEqual(self.process.get_option('side'), 'L')
+        self.assertEqual(self.process.get_option_match('count'), 1)
+
+    def test_merge_on_flush_updates_options(self):
+        self.assertEqual(self.process.get_option('side'), 'L')
+
+        with self.process.batch_options():
+            self.process.set_option('count', 2, 'rig')
+            self.assertEqual(self.process.get_option('count'), 2)
+
+            self._edit_on_disk('rig.side', 'R')
+            self._edit_on_disk('rig.mirror', True)
+
+        self.assertEqual(self.process.get_option('count'), 2)
+        self.assertEqual(self.process.get_option('side'), 'R')
+        self.assertEqual(self.process.get_option('mirror'), True)
+
+
+if __name__ == '__main__':
+    unittest.main()
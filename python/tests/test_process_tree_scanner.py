@@ -0,0 +1,62 @@
+from __future__ import absolute_import
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from vtool import util_file
+from vtool.process_manager import process
+
+
+class ProcessTreeScannerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = util_file.fix_slashes(tempfile.mkdtemp(prefix='vtool_scan_'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_new_process_found_by_watched_scanner(self):
+        watcher = util_file.DirectoryWatcher(use_inotify=False)
+        watcher.watch(self.directory)
+
+        scanner = process.ProcessTreeScanner()
+        scanner.set_watcher(watcher)
+
+        for inc in range(5):
+            scanner.scan(self.directory)
+            os.makedirs(os.path.join(self.directory, 'process_%s' % inc, '.code'))
+            self.assertIn('process_%s' % inc, scanner.scan(self.directory)[0])
+
+    def test_reused_listing_sees_new_code_folder(self):
+        os.makedirs(os.path.join(self.directory, 'folder'))
+
+        scanner = process.ProcessTreeScanner()
+        scanner.mtime_resolution = -1.0
+
+        self.assertEqual(scanner.scan(self.directory), [[], ['folder']])
+
+        os.makedirs(os.path.join(self.directory, 'folder', '.code'))
+
+        self.assertEqual(scanner.scan(self.directory), [['folder'], []])
+        self.assertEqual(scanner.listing_hits, 1)
+
+    def test_process_create_rename_delete(self):
+        os.makedirs(os.path.join(self.directory, 'name'))
+        process.find_processes(self.directory)
+
+        new_process = process.Process('name')
+        new_process.set_directory(self.directory)
+        new_process.create()
+        self.assertEqual(process.find_processes(self.directory), ['name'])
+
+        new_process.rename('renamed')
+        self.assertEqual(process.find_processes(self.directory), ['renamed'])
+
+        new_process.delete()
+        self.assertEqual(process.find_processes(self.directory), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+from __future__ import absolute_import
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from vtool import util_file
+
+
+class ReadCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='vtool_read_cache_')
+        self.max_entries = util_file.ReadCache.max_entries
+        util_file.ReadCache.clear()
+
+    def tearDown(self):
+        util_file.ReadCache.max_entries = self.max_entries
+        util_file.ReadCache.clear()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _write(self, name, data):
+        filepath = os.path.join(self.directory, name)
+        with open(filepath, 'w') as open_file:
+            json.dump(data, open_file)
+        return filepath
+
+    def test_evicted_path_is_cached_again(self):
+        util_file.ReadCache.max_entries = 1
+
+        first = self._write('first.json', {'name': 'first'})
+        second = self._write('second.json', {'name': 'second'})
+
+        util_file.ReadCache.cache_read_data(first)
+        util_file.ReadCache.cache_read_data(second)
+        self.assertFalse(util_file.ReadCache.is_read(first))
+
+        self.assertEqual(util_file.get_json(first), {'name': 'first'})
+        self.assertTrue(util_file.ReadCache.is_read(first))
+
+        hits = util_file.ReadCache.hits
+        self.assertEqual(util_file.get_json(first), {'name': 'first'})
+        self.assertEqual(util_file.ReadCache.hits, hits + 1)
+
+    def test_changed_file_is_read_again(self):
+        filepath = self._write('data.json', {'value': 1})
+        util_file.ReadCache.cache_read_data(filepath)
+
+        with open(filepath, 'w') as open_file:
+            json.dump({'value': 22}, open_file)
+
+        self.assertEqual(util_file.get_json(filepath), {'value': 22})
+
+    def test_removed_path_is_not_cached(self):
+        filepath = self._write('data.json', {'value': 1})
+        util_file.ReadCache.cache_read_data(filepath)
+        util_file.ReadCache.remove_read_data(filepath)
+
+        util_file.get_json(filepath)
+
+        self.assertFalse(util_file.ReadCache.is_read(filepath))
+
+
+if __name__ == '__main__':
+    unittest.main()
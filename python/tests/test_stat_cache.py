@@ -0,0 +1,64 @@
+from __future__ import absolute_import
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from vtool import util_file
+
+
+class StatCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='vtool_stat_')
+        self.filepath = os.path.join(self.directory, 'file.txt')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_scope_is_per_thread(self):
+        results = []
+
+        def work():
+            results.append(util_file.StatCache.get_active())
+            results.append(util_file.is_file(self.filepath))
+            with open(self.filepath, 'w') as open_file:
+                open_file.write('text')
+            results.append(util_file.is_file(self.filepath))
+
+        with util_file.StatCache() as stat_cache:
+            self.assertFalse(util_file.is_file(self.filepath))
+
+            thread = threading.Thread(target=work)
+            thread.start()
+            thread.join()
+
+            self.assertIs(util_file.StatCache.get_active(), stat_cache)
+
+        self.assertEqual(results, [None, False, True])
+        self.assertIsNone(util_file.StatCache.get_active())
+
+    def test_util_file_writes_reach_other_threads(self):
+
+        with util_file.StatCache():
+            self.assertFalse(util_file.is_file(self.filepath))
+
+            thread = threading.Thread(target=util_file.create_file, args=('file.txt', self.directory))
+            thread.start()
+            thread.join()
+
+            self.assertTrue(util_file.is_file(self.filepath))
+
+    def test_nested_scope(self):
+        with util_file.StatCache() as outer:
+            with util_file.StatCache() as inner:
+                self.assertIs(inner, outer)
+            self.assertIs(util_file.StatCache.get_active(), outer)
+
+        self.assertIsNone(util_file.StatCache.get_active())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,182 @@
+from __future__ import absolute_import
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from vtool import util_weight
+
+
+def create_matrix():
+    # vertex 0: joint_a 0.5, joint_b 0.3, joint_c 0.15, joint_d 0.05
+    # vertex 1: joint_a 1.0
+    # vertex 2: no weights
+    # vertex 3: joint_b 0.00005, joint_c 0.99995
+    return util_weight.SkinWeightMatrix.from_columns(['joint_a', 'joint_b', 'joint_c', 'joint_d'],
+                                                     [[0.5, 1.0, 0.0, 0.0],
+                                                      [0.3, 0.0, 0.0, 0.00005],
+                                                      [0.15, 0.0, 0.0, 0.99995],
+                                                      [0.05, 0.0, 0.0, 0.0]])
+
+
+class SkinWeightMatrixTest(unittest.TestCase):
+
+    def assert_row(self, matrix, vertex_index, expected):
+        row = matrix.get_row(vertex_index)
+
+        self.assertEqual([influence for influence, weight in row], [influence for influence, weight in expected])
+        for (influence, weight), (expected_influence, expected_weight) in zip(row, expected):
+            self.assertAlmostEqual(weight, expected_weight)
+
+    def test_from_columns(self):
+        matrix = create_matrix()
+
+        self.assertEqual(matrix.vertex_count, 4)
+        self.assertEqual(matrix.nonzero_count, 7)
+        self.assertEqual(matrix.get_weight(0, 'joint_b'), 0.3)
+        self.assertEqual(matrix.get_weight(2, 'joint_a'), 0.0)
+        self.assertEqual(matrix.get_column('joint_c'), [0.15, 0.0, 0.0, 0.99995])
+        self.assertEqual(util_weight.SkinWeightMatrix.from_dict(matrix.to_dict(), 4).get_row(3), matrix.get_row(3))
+
+    def test_limit_influences(self):
+        matrix = create_matrix()
+        matrix.limit_influences(2)
+
+        self.assert_row(matrix, 0, [['joint_a', 0.625], ['joint_b', 0.375]])
+        self.assert_row(matrix, 1, [['joint_a', 1.0]])
+        self.assert_row(matrix, 2, [])
+        self.assert_row(matrix, 3, [['joint_b', 0.00005], ['joint_c', 0.99995]])
+
+    def test_limit_influences_without_normalize(self):
+        matrix = create_matrix()
+        matrix.limit_influences(3, normalize=False)
+
+        self.assert_row(matrix, 0, [['joint_a', 0.5], ['joint_b', 0.3], ['joint_c', 0.15]])
+
+    def test_prune(self):
+        matrix = create_matrix()
+        matrix.prune(0.001)
+
+        self.assertEqual(matrix.nonzero_count, 6)
+        self.assert_row(matrix, 0, [['joint_a', 0.5], ['joint_b', 0.3], ['joint_c', 0.15], ['joint_d', 0.05]])
+        self.assert_row(matrix, 3, [['joint_c', 1.0]])
+
+    def test_remap_merges_influences(self):
+        matrix = create_matrix()
+        matrix.remap_influences({'joint_b': 'joint_a', 'joint_d': None})
+
+        self.assertEqual(matrix.influences, ['joint_a', 'joint_c'])
+        self.assert_row(matrix, 0, [['joint_a', 0.8], ['joint_c', 0.15]])
+        self.assert_row(matrix, 3, [['joint_a', 0.00005], ['joint_c', 0.99995]])
+
+    def test_remap_with_column_order(self):
+        matrix = create_matrix()
+        matrix.remap_influences({'joint_a': 'root'}, influences=['joint_c', 'root', 'joint_b', 'joint_d', 'unused'])
+
+        self.assertEqual(matrix.influence_count, 5)
+        self.assert_row(matrix, 0, [['joint_c', 0.15], ['root', 0.5], ['joint_b', 0.3], ['joint_d', 0.05]])
+        self.assertEqual(matrix.get_column('unused'), [0.0] * 4)
+
+        flat = matrix.get_flat_weights(['root', 'joint_c'])
+        self.assertEqual(flat[:2], [0.5, 0.15])
+        self.assertEqual(flat[6:], [0.0, 0.99995])
+
+
+class WeightFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='vtool_weight_')
+        self.filepath = os.path.join(self.directory, 'mesh.weights')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def assert_roundtrip(self, **kwargs):
+        matrix = create_matrix()
+        positions = [[0, 0, 0], [0, 1, 0], [0, 2, 0], None]
+
+        util_weight.write_weight_file(self.filepath, matrix, positions, **kwargs)
+
+        self.assertTrue(util_weight.is_weight_file(self.filepath))
+        self.assertEqual(util_weight.read_weight_header(self.filepath)['vertex_count'], 4)
+
+        read_matrix, read_positions = util_weight.read_weight_file(self.filepath)
+
+        self.assertEqual(read_matrix.influences, matrix.influences)
+        self.assertEqual(read_positions, positions)
+        self.assertEqual(list(read_matrix.offsets), list(matrix.offsets))
+        self.assertEqual(list(read_matrix.indices), list(matrix.indices))
+
+        return matrix, read_matrix
+
+    def test_roundtrip(self):
+        matrix, read_matrix = self.assert_roundtrip()
+        self.assertEqual(list(read_matrix.values), list(matrix.values))
+
+    def test_roundtrip_uncompressed(self):
+        matrix, read_matrix = self.assert_roundtrip(compress=False)
+        self.assertEqual(list(read_matrix.values), list(matrix.values))
+
+    def test_roundtrip_single_precision(self):
+        matrix, read_matrix = self.assert_roundtrip(double_precision=False)
+        for value, read_value in zip(matrix.values, read_matrix.values):
+            self.assertAlmostEqual(value, read_value, places=6)
+
+    def test_influence_dict_roundtrip(self):
+        influence_dict = {'joint_a': {'position': [1, 2, 3], 'weights': [1.0, 0.25, 0.0]},
+                          'joint_b': {'position': [4, 5, 6], 'weights': [0.0, 0.75, 1.0]}}
+
+        util_weight.write_influence_dict(self.filepath, influence_dict)
+
+        self.assertEqual(util_weight.read_influence_dict(self.filepath), influence_dict)
+
+    def test_not_a_weight_file(self):
+        with open(self.filepath, 'w') as open_file:
+            open_file.write('{"joint_a": []}')
+
+        self.assertFalse(util_weight.is_weight_file(self.filepath))
+        self.assertRaises(ValueError, util_weight.read_weight_file, self.filepath)
+
+
+class WeightCatalogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='vtool_catalog_')
+        self.folder_path = os.path.join(self.directory, 'mesh_body')
+        os.makedirs(self.folder_path)
+
+        self._write_settings("['mesh info', [8, 12, 6, [0, 1, 3, 2], [4, 5, 7, 6]]]\n")
+
+        catalog = util_weight.WeightCatalog(self.directory)
+        entry = util_weight.create_catalog_entry(self.folder_path, 'body',
+                                                 [8, 12, 6, [0, 1, 3, 2], [4, 5, 7, 6]])
+        catalog.set_entry('mesh_body', entry)
+        catalog.save()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _write_settings(self, text):
+        with open(os.path.join(self.folder_path, 'settings.info'), 'w') as open_file:
+            open_file.write(text)
+
+    def test_topology(self):
+        catalog = util_weight.WeightCatalog(self.directory)
+
+        self.assertTrue(catalog.is_file_current('mesh_body', 'settings.info'))
+        self.assertTrue(catalog.is_compatible('mesh_body', 8, 12, 6))
+        self.assertFalse(catalog.is_compatible('mesh_body', 8, 12, 7))
+        self.assertEqual(catalog.get_topology('mesh_body')['last_face'], [4, 5, 7, 6])
+
+    def test_rewritten_folder_is_not_current(self):
+        self._write_settings("['mesh info', [9, 12, 6, [0, 1, 3, 2], [4, 5, 7, 6]]]\n")
+
+        catalog = util_weight.WeightCatalog(self.directory)
+
+        self.assertFalse(catalog.is_file_current('mesh_body', 'settings.info'))
+        self.assertFalse(catalog.is_file_current('mesh_missing', 'settings.info'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+from __future__ import absolute_import
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from vtool import util_file
+
+
+class ReverseDeltaTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='vtool_version_')
+        self.filepath = os.path.join(self.directory, 'script.py')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _save_versions(self, contents, keyframe):
+        version_file = util_file.VersionFile(self.filepath)
+        version_file.set_reverse_delta(True)
+        version_file.delta_keyframe = keyframe
+
+        for text in contents:
+            with open(self.filepath, 'w') as open_file:
+                open_file.write(text)
+            version_file.save('save')
+
+        return version_file
+
+    def test_versions_rebuild(self):
+        contents = ['a\n', 'a\nb\n', 'b\nc\n', 'c\nd\n']
+        version_file = self._save_versions(contents, 25)
+
+        for number, text in enumerate(contents, 1):
+            self.assertEqual(version_file.get_version_text(number), text)
+
+    def test_keyframe_shares_hash_with_next_version(self):
+        contents = ['a\n', 'b\n', 'c\n', 'c\n', 'd\n', 'e\n']
+        version_file = self._save_versions(contents, 3)
+
+        for number, text in enumerate(contents, 1):
+            self.assertEqual(version_file.get_version_text(number), text)
+
+        self.assertEqual(version_file.get_version_diff(1, 2), ['--- version 1\n', '+++ version 2\n',
+                                                               '@@ -1 +1 @@\n', '-a\n', '+b\n'])
+
+    def test_unchanged_save_after_keyframe(self):
+        contents = ['line %s\n' % inc for inc in range(1, 25)] + ['keyframe\n', 'keyframe\n', 'after\n']
+        version_file = self._save_versions(contents, 25)
+
+        for number, text in enumerate(contents, 1):
+            self.assertEqual(version_file.get_version_text(number), text)
+
+    def test_remove_unused_blobs_keeps_history(self):
+        contents = ['a\n', 'b\n', 'c\n', 'c\n', 'd\n']
+        version_file = self._save_versions(contents, 3)
+
+        version_file.remove_unused_blobs()
+
+        for number, text in enumerate(contents, 1):
+            self.assertEqual(version_file.get_version_text(number), text)
+
+
+@unittest.skipIf(os.name == 'nt', 'file modes are posix only')
+class VersionModeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='vtool_version_')
+        self.filepath = os.path.join(self.directory, 'script.py')
+        self.umask = util_file._umask
+        util_file._umask = 0o022
+
+    def tearDown(self):
+        util_file._umask = self.umask
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_version_file_is_readable_by_others(self):
+        version_file = util_file.VersionFile(self.filepath)
+
+        for text in ('a\n', 'b\n'):
+            with open(self.filepath, 'w') as open_file:
+                open_file.write(text)
+            version_file.save('save')
+
+        for number in (1, 2):
+            version_path = version_file.get_version_path(number)
+            self.assertEqual(os.stat(version_path).st_mode & 0o777, 0o644)
+
+        blob_store = util_file.BlobStore(version_file.version_folder)
+        file_hash = blob_store.add_data(b'data')
+        self.assertEqual(os.stat(blob_store.get_blob_path(file_hash)).st_mode & 0o777, 0o644)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,7 +7,7 @@ import traceback
 import threading
 import os
 
-from . import util, util_file, usd
+from . import util, util_file, util_weight, usd
 
 if util.in_maya:
     import maya.cmds as cmds
@@ -565,6 +565,7 @@ class ScriptData(FileData):
         util_file.write_lines(filepath, lines)
 
         version = util_file.VersionFile(filepath)
+        version.set_reverse_delta(True)
         version.save(comment)
 
     def set_lines(self, lines):
@@ -1016,6 +1017,57 @@ class SkinWeightData(MayaCustomData):
 
         return found
 
+    def _get_weight_file(self, folder_path, files=None):
+        """
+        Get the binary weight file of a mesh folder, if it should be used instead of the text weights.
+        """
+
+        if files is None:
+            files = util_file.get_files(folder_path)
+
+        if util_weight.weight_file_name not in files:
+            return
+
+        binary_file = False
+        if self.settings.has_setting('binary file'):
+            binary_file = self.settings.get('binary file')
+
+        if not binary_file and 'influence.info' in files:
+            return
+
+        return util_file.join_path(folder_path, util_weight.weight_file_name)
+
+    def _get_weight_matrix(self, folder_path):
+        """
+        Returns:
+            tuple: (influence_dict, SkinWeightMatrix) influence_dict holds the position of each influence.
+        """
+
+        weight_file = None
+        try:
+            weight_file = self._get_weight_file(folder_path)
+        except:
+            pass
+
+        if weight_file:
+            util.show('Getting weight data from disk')
+            try:
+                matrix, positions = util_weight.read_weight_file(weight_file)
+                influence_dict = {}
+                for influence, position in zip(matrix.influences, positions):
+                    influence_dict[influence] = {'position': position}
+                return influence_dict, matrix
+            except:
+                util.error(traceback.format_exc())
+                util.warning('Could not read weight file: %s' % weight_file)
+
+        influence_dict = self._get_influences(folder_path)
+
+        if not influence_dict:
+            return None, None
+
+        return influence_dict, util_weight.SkinWeightMatrix.from_influence_dict(influence_dict)
+
     # @util.stop_watch_wrapper
     def _get_influences(self, folder_path):
 
@@ -1027,6 +1079,14 @@ class SkinWeightData(MayaCustomData):
         except:
             return
 
+        weight_file = self._get_weight_file(folder_path, files)
+        if weight_file:
+            try:
+                return util_weight.read_influence_dict(weight_file)
+            except:
+                util.error(traceback.format_exc())
+                util.warning('Could not read weight file: %s' % weight_file)
+
         found_single_file_weights = any(filter(lambda x: x == 'all.skin.weights', files))
         influences = [filename for filename in files if filename.endswith('.weights') and filename != 'all.skin.weights']
 
@@ -1259,10 +1319,34 @@ class SkinWeightData(MayaCustomData):
 
             results = []
 
+            catalog = util_weight.WeightCatalog(path)
+
+            pipeline = True
+            if self.settings.has_setting('pipeline'):
+                pipeline = self.settings.get('pipeline')
+
+            timer = util.StageTimer()
+            read_jobs = {}
+            read_ahead_count = 0
+            pool = None
+
+            if pipeline:
+                pool = util.WorkerPool()
+                read_ahead_count = pool.max_workers * 2
+
+                for key in keys[:read_ahead_count]:
+                    read_jobs[key] = pool.submit(self._read_mesh_folder, util_file.join_path(path, key), timer)
+
             for inc in range(0, key_count):
 
                 current_key = keys[inc]
 
+                if pool and inc + read_ahead_count < key_count:
+                    next_key = keys[inc + read_ahead_count]
+                    read_jobs[next_key] = pool.submit(self._read_mesh_folder,
+                                                      util_file.join_path(path, next_key),
+                                                      timer)
+
                 mesh = mesh_dict[current_key]
 
                 if len(cmds.ls(mesh)) > 1:
@@ -1279,7 +1363,18 @@ class SkinWeightData(MayaCustomData):
                 if path_inc > 0:
                     first = False
 
-                result = self.import_skin_weights(folder_path, mesh, first=first)
+                mesh_data = None
+                if current_key in read_jobs:
+                    wait_start = timer.start()
+                    try:
+                        mesh_data = read_jobs.pop(current_key).result()
+                    except:
+                        util.error(traceback.format_exc())
+                    timer.end('wait for read', wait_start)
+
+                apply_start = timer.start()
+                result = self.import_skin_weights(folder_path, mesh, first=first, mesh_data=mesh_data, catalog=catalog)
+                timer.end('apply to scene', apply_start)
                 if not result:
                     maya_lib.core.print_warning('Import %s data failed on %s' % (self.name, mesh))
                 results.append(result)
@@ -1300,6 +1395,12 @@ class SkinWeightData(MayaCustomData):
 
             progress_ui.end()
 
+            if pool:
+                pool.shutdown()
+
+            if results:
+                timer.show('Skin weight import stages:')
+
             if len(results) == 1:
                 if not results[0]:
                     return
@@ -1319,7 +1420,164 @@ class SkinWeightData(MayaCustomData):
     def set_single_file(self, bool_value):
         self.settings.set('single file', bool_value)
 
-    def import_skin_weights(self, directory, mesh, first=True):  # TODO: This beast needs to be broken apart.
+    def set_binary_file(self, bool_value):
+        """
+        Export the binary weight file instead of influence.info and .weights files. Off by default.
+        Versions of vtool from before the binary weight file cannot read it, so only turn it on once every reader is updated.
+        """
+        self.settings.set('binary file', bool_value)
+
+    def set_pipeline(self, bool_value):
+        """
+        Whether file reading and writing of all meshes runs on worker threads while the scene is queried.
+        """
+        self.settings.set('pipeline', bool_value)
+
+    def set_incremental(self, bool_value):
+        """
+        Whether export only rewrites meshes whose weights or topology changed since the last export.
+        """
+        self.settings.set('incremental', bool_value)
+
+    def convert_weight_format(self, binary=True, remove_old=True):
+        """
+        Convert the exported weights of every mesh between the text layout and the binary weight file.
+
+        Args:
+            binary (bool): Convert text weights to the binary weight file. If False, convert binary weights to text.
+            remove_old (bool): Remove the files of the old layout after converting.
+
+        Returns:
+            list: The mesh folders that were converted.
+        """
+
+        converted = []
+
+        for path in self.get_existing():
+            for folder in util_file.get_folders(path):
+                folder_path = util_file.join_path(path, folder)
+                weight_file = util_file.join_path(folder_path, util_weight.weight_file_name)
+                info_file = util_file.join_path(folder_path, 'influence.info')
+
+                if binary:
+                    if util_file.is_file(weight_file) or not util_file.is_file(info_file):
+                        continue
+
+                    influence_dict = self._get_influences(folder_path)
+                    if not influence_dict:
+                        continue
+
+                    util_weight.write_influence_dict(weight_file, influence_dict)
+
+                    if remove_old:
+                        files = util_file.get_files(folder_path)
+                        for filename in files:
+                            if filename.endswith('.weights') or filename == 'influence.info':
+                                util_file.delete_file(filename, folder_path)
+                else:
+                    if not util_file.is_file(weight_file):
+                        continue
+
+                    matrix, positions = util_weight.read_weight_file(weight_file)
+                    weights_dict = matrix.to_dict()
+
+                    info_lines = []
+                    for influence, position in zip(matrix.influences, positions):
+                        if influence not in weights_dict:
+                            continue
+
+                        influence_filename = influence.replace(':', '-')
+                        filepath = util_file.create_file('%s.weights' % influence_filename, folder_path)
+                        util_file.write_lines(filepath, str(weights_dict[influence]))
+
+                        info_lines.append("{'%s' : {'position' : %s}}" % (influence, str(position)))
+
+                    info_file = util_file.create_file('influence.info', folder_path)
+                    util_file.write_lines(info_file, info_lines)
+
+                    if remove_old:
+                        util_file.delete_file(weight_file)
+
+                util.show('Converted skin weights: %s' % folder)
+                converted.append(folder)
+
+        return converted
+
+    def _get_skin_settings(self, directory):
+        """
+        Returns:
+            list: [attribute name, value] for each line of settings.info
+        """
+
+        file_path = util_file.join_path(directory, 'settings.info')
+
+        if not util_file.is_file(file_path):
+            return []
+
+        lines = util_file.get_file_lines(file_path)
+
+        return list(map(eval, filter(None, map(lambda x: x.strip(), lines))))
+
+    def _read_mesh_folder(self, directory, timer=None):
+        """
+        Read and decode everything import_skin_weights needs from a mesh folder.
+        This does not touch the scene, so it can run on a worker thread.
+
+        Returns:
+            dict: settings, influence_dict and weight_matrix
+        """
+
+        if timer is None:
+            timer = util.StageTimer()
+
+        stage_start = timer.start()
+
+        mesh_data = {'settings': self._get_skin_settings(directory)}
+        mesh_data['influence_dict'], mesh_data['weight_matrix'] = self._get_weight_matrix(directory)
+
+        timer.end('read and decode', stage_start)
+
+        return mesh_data
+
+    def _is_topology_compatible(self, mesh, catalog, folder):
+        """
+        Check mesh against the topology recorded in the catalog at export.
+        The topology is only used while settings.info is still the file the catalog recorded.
+
+        Returns:
+            bool: None if the catalog has no topology for folder, or settings.info changed since.
+        """
+
+        topology = catalog.get_topology(folder)
+
+        if not topology:
+            return
+
+        if not catalog.is_file_current(folder, 'settings.info'):
+            return
+
+        check = maya_lib.geo.MeshTopologyCheck(mesh)
+
+        if not catalog.is_compatible(folder, check.mesh1_vert_count, check.mesh1_edge_count,
+                                     check.mesh1_face_count):
+            return False
+        if not check.check_first_face_verts(topology['first_face']):
+            return False
+        if not check.check_last_face_verts(topology['last_face']):
+            return False
+
+        return True
+
+    def import_skin_weights(self, directory, mesh, first=True, mesh_data=None, catalog=None):  # TODO: This beast needs to be broken apart.
+        """
+        Args:
+            directory (str): The mesh folder.
+            mesh (str): The mesh to skin.
+            first (bool): Whether to replace the current skin cluster, instead of adding another.
+            mesh_data (dict): The mesh folder already read by _read_mesh_folder.
+            catalog (util_weight.WeightCatalog): The catalog of the folder above directory, read once for every mesh.
+                By default, it is read here. Topology is checked against the catalog, or settings.info for older exports.
+        """
 
         nicename = maya_lib.core.get_basename(mesh)
         short_name = cmds.ls(mesh)
@@ -1351,8 +1609,6 @@ class SkinWeightData(MayaCustomData):
         compatible_mesh = True
         ran_mesh_check = False
 
-        file_path = util_file.join_path(directory, 'settings.info')
-
         shape_types = ['mesh', 'nurbsSurface', 'nurbsCurve', 'lattice']
         shape_is_good = self._test_shape(mesh, shape_types)
 
@@ -1361,38 +1617,52 @@ class SkinWeightData(MayaCustomData):
                          ' Currently supported nodes include: %s.' % (short_name, shape_types))
             return False
 
-        if util_file.is_file(file_path):
-            lines = util_file.get_file_lines(file_path)
-            for line_list in map(eval, filter(None, map(lambda x: x.strip(), lines))):
-                attr_name = line_list[0]
-                value = line_list[1]
+        if mesh_data is None:
+            self._progress_ui.status('Importing skin weights on: %s    - getting influences' % nicename)
+            mesh_data = self._read_mesh_folder(directory)
 
-                if attr_name == 'blendWeights':
-                    blend_value = value
+        if catalog is None:
+            catalog = util_weight.WeightCatalog(util_file.get_dirname(directory))
 
-                elif attr_name == 'mesh info':
+        if maya_lib.core.has_shape_of_type(mesh, 'mesh'):
+            catalog_compatible = self._is_topology_compatible(mesh, catalog, util_file.get_basename(directory))
 
-                    check = maya_lib.geo.MeshTopologyCheck(mesh)
-                    check.mesh2_vert_count = value[0]
-                    check.mesh2_edge_count = value[1]
-                    check.mesh2_face_count = value[2]
+            if catalog_compatible is not None:
+                compatible_mesh = catalog_compatible
+                ran_mesh_check = True
 
-                    if not check.check_vert_edge_face_count():
-                        compatible_mesh = False
-                    if not check.check_first_face_verts(value[3]):
-                        compatible_mesh = False
-                    if not check.check_last_face_verts(value[4]):
-                        compatible_mesh = False
+        for line_list in mesh_data['settings']:
+            attr_name = line_list[0]
+            value = line_list[1]
 
-                    ran_mesh_check = True
+            if attr_name == 'blendWeights':
+                blend_value = value
 
-                else:
+            elif attr_name == 'mesh info':
+
+                if ran_mesh_check:
+                    continue
 
-                    skin_attribute_dict[attr_name] = value
+                check = maya_lib.geo.MeshTopologyCheck(mesh)
+                check.mesh2_vert_count = value[0]
+                check.mesh2_edge_count = value[1]
+                check.mesh2_face_count = value[2]
 
-        self._progress_ui.status('Importing skin weights on: %s    - getting influences' % nicename)
+                if not check.check_vert_edge_face_count():
+                    compatible_mesh = False
+                if not check.check_first_face_verts(value[3]):
+                    compatible_mesh = False
+                if not check.check_last_face_verts(value[4]):
+                    compatible_mesh = False
 
-        influence_dict = self._get_influences(directory)
+                ran_mesh_check = True
+
+            else:
+
+                skin_attribute_dict[attr_name] = value
+
+        influence_dict = mesh_data['influence_dict']
+        weight_matrix = mesh_data['weight_matrix']
 
         self._progress_ui.status('Importing skin weights on: %s    - got influences' % nicename)
         if not influence_dict:
@@ -1483,33 +1753,21 @@ class SkinWeightData(MayaCustomData):
                 skin_inst.add_influence(influence)
             skin_cluster = skin_inst.get_skin()
 
-            weights_found = []
             influences_found = []
 
             # prep skin import data
             import maya.api.OpenMaya as OM
-            weight_array = OM.MDoubleArray()
 
             for influence in influences:
 
-                if influence not in influence_dict or 'weights' not in influence_dict[influence]:
+                if not weight_matrix.has_influence(influence):
                     util.warning('Weights missing for influence %s' % influence)
                     continue
 
-                weights_found.append(influence_dict[influence]['weights'])
                 influences_found.append(influence)
 
-            for inc in range(0, len(weights_found[0])):
-
-                for inc2 in range(0, len(influences_found)):
-
-                    weight = weights_found[inc2][inc]
-
-                    if isinstance(weight, int):
-                        weight = float(weight)
-                    weight_array.append(weight)
-
-            if len(weights_found) == len(influences_found):
+            if influences_found:
+                weight_array = OM.MDoubleArray(weight_matrix.get_flat_weights(influences_found))
                 maya_lib.api.set_skin_weights(skin_cluster, weight_array, 0)
 
         if not new_way:
@@ -1529,6 +1787,8 @@ class SkinWeightData(MayaCustomData):
 
             progress_ui = maya_lib.core.ProgressBar('import skin', len(list(influence_dict.keys())))
 
+            sparse_columns = weight_matrix.get_sparse_columns()
+
             for influence in influences:
                 orig_influence = influence
                 if influence.count('|') > 1:
@@ -1540,11 +1800,11 @@ class SkinWeightData(MayaCustomData):
 
                 progress_ui.status(message)
 
-                if 'weights' not in influence_dict[orig_influence]:
+                if not weight_matrix.has_influence(orig_influence):
                     util.warning('Weights missing for influence %s' % influence)
                     return
 
-                weights = influence_dict[orig_influence]['weights']
+                vertex_indices, weights = sparse_columns[weight_matrix.get_influence_index(orig_influence)]
 
                 if influence not in influence_index_dict:
                     continue
@@ -1556,9 +1816,9 @@ class SkinWeightData(MayaCustomData):
                 # this wasn't faster, zipping zero weights is much faster than setting all the weights
                 # cmds.setAttr(attr, *weights )
 
-                for inc in range(0, len(weights)):
+                for inc, weight in zip(vertex_indices, weights):
 
-                    weight = float(weights[inc])
+                    weight = float(weight)
 
                     if weight == 0 or weight < 0.0001:
                         continue
@@ -1613,7 +1873,7 @@ class SkinWeightData(MayaCustomData):
         cmds.undoInfo(state=True)
 
     def export_data(self, comment, selection=None, single_file=False, version_up=True, blend_weights=True,
-                    long_names=False, second_only=False):  # TODO: This needs to be broken apart as well.
+                    long_names=False, second_only=False, binary_file=None, pipeline=None, incremental=None):  # TODO: This needs to be broken apart as well.
 
         if selection is None:
             selection = []
@@ -1636,8 +1896,34 @@ class SkinWeightData(MayaCustomData):
             selection = meshes + curves + surfaces + lattices
             util.warning('Exporting skin clusters on meshes, nurbsCurves, nurbsSurfaces and lattices')
 
+        if binary_file is None:
+            binary_file = False
+            if self.settings.has_setting('binary file'):
+                binary_file = self.settings.get('binary file')
+
+        if pipeline is None:
+            pipeline = True
+            if self.settings.has_setting('pipeline'):
+                pipeline = self.settings.get('pipeline')
+
+        if incremental is None:
+            incremental = False
+            if self.settings.has_setting('incremental'):
+                incremental = self.settings.get('incremental')
+
+        weight_format = self._get_weight_format(binary_file, single_file)
+
         found_one = False
 
+        timer = util.StageTimer()
+        jobs = []
+        catalogs = {}
+        changed_meshes = {}
+        max_workers = None
+        if not pipeline:
+            max_workers = 1
+        pool = util.WorkerPool(max_workers)
+
         progress = maya_lib.core.ProgressBar('Exporting skin weights on:', len(selection))
 
         for thing in selection:
@@ -1681,88 +1967,35 @@ class SkinWeightData(MayaCustomData):
                     path = self.get_file(inc)
                     found_one = True
 
-                    geo_path = util_file.join_path(path, thing_filename)
-
-                    if util_file.is_dir(geo_path, case_sensitive=True):
-                        files = util_file.get_files(geo_path)
-
-                        for filename in files:
-                            util_file.delete_file(filename, geo_path)
-
-                    else:
-                        geo_path = util_file.create_dir(thing_filename, path)
-
-                    if not geo_path:
-                        util.error('Please check!'
-                                   ' Unable to create skin weights directory: %s in %s' % (thing_filename, path))
-                        continue
-
-                    weights = maya_lib.deform.get_skin_weights(skin)
+                    query_start = timer.start()
 
-                    info_file = util_file.create_file('influence.info', geo_path)
-                    settings_file = util_file.create_file('settings.info', geo_path)
+                    weight_matrix = maya_lib.deform.get_skin_weight_matrix(skin)
+                    positions = self._name_weight_matrix(weight_matrix, skin)
 
-                    info_lines = []
                     settings_lines = []
-                    weights_dict = {}
-
-                    for influence in weights:
-
-                        if influence is None or influence == 'None':
-                            continue
-
-                        weight_list = weights[influence]
-
-                        if not weight_list:
-                            continue
-
-                        if not single_file:
-                            thread = LoadWeightFileThread()
-
-                            influence_line = thread.run(influence, skin, weights[influence], geo_path)
-                        else:
-                            influence_name = maya_lib.deform.get_skin_influence_at_index(influence, skin)
-                            sub_weights = weights[influence]
-
-                            if not influence_name or not cmds.objExists(influence_name):
-                                continue
-
-                            weights_dict[influence_name] = sub_weights
-
-                            influence_position = cmds.xform(influence_name, q=True, ws=True, t=True)
-                            influence_line = "{'%s' : {'position' : %s}}" % (influence_name, str(influence_position))
-
-                        if influence_line:
-                            info_lines.append(influence_line)
-
-                    if single_file:
-                        filepath = util_file.create_file('all.skin.weights', geo_path)
-
-                        lines = ['%s=%s' % (key, str(weights_dict[key])) for key in weights_dict]
-                        util_file.write_lines(filepath, lines)
-
-                    util_file.write_lines(info_file, info_lines)
+                    mesh_info = None
 
                     blend_weights_attr = '%s.blendWeights' % skin
 
                     export_attrs = ['skinningMethod', 'maintainMaxInfluences', 'maxInfluences']
 
-                    if maya_lib.core.has_shape_of_type(thing, 'mesh'):
-                        self._export_ref_obj(thing, geo_path)
+                    is_mesh = maya_lib.core.has_shape_of_type(thing, 'mesh')
 
+                    if is_mesh:
                         verts, edges, faces = maya_lib.geo.get_vert_edge_face_count(thing)
                         verts1 = maya_lib.geo.get_face_vert_indices(thing, 0)
                         verts2 = maya_lib.geo.get_face_vert_indices(thing, -1)
 
-                        settings_lines.append("['mesh info', %s]" % [verts, edges, faces, verts1, verts2])
+                        mesh_info = [verts, edges, faces, verts1, verts2]
+                        settings_lines.append("['mesh info', %s]" % mesh_info)
 
                     if cmds.objExists(blend_weights_attr) and blend_weights:
                         maya_lib.core.print_help('Exporting %s blend weights'
                                                  ' (for dual quaternion)' % maya_lib.core.get_basename(thing))
 
-                        blend_weights = maya_lib.deform.get_skin_blend_weights(skin)
+                        blend_weight_values = maya_lib.deform.get_skin_blend_weights(skin)
 
-                        settings_lines.append("['blendWeights', %s]" % blend_weights)
+                        settings_lines.append("['blendWeights', %s]" % blend_weight_values)
 
                     for attribute_name in export_attrs:
 
@@ -1774,21 +2007,97 @@ class SkinWeightData(MayaCustomData):
                         attribute_value = cmds.getAttr(attribute_path)
                         settings_lines.append("['%s', %s]" % (attribute_name, attribute_value))
 
-                    util_file.write_lines(settings_file, settings_lines)
+                    timer.end('scene query', query_start)
+
+                    hash_start = timer.start()
+                    weight_hash = util_weight.get_weight_hash(weight_matrix, positions, settings_lines)
+                    timer.end('hash weights', hash_start)
+
+                    if path not in catalogs:
+                        catalogs[path] = util_weight.WeightCatalog(path)
+                        changed_meshes[path] = []
+
+                    previous_entry = catalogs[path].get_entry(thing_filename)
+                    geo_path = util_file.join_path(path, thing_filename)
+
+                    unchanged = self._is_mesh_unchanged(geo_path, previous_entry, weight_hash, weight_format)
+
+                    if not unchanged:
+                        changed_meshes[path].append(thing_filename)
+
+                    if incremental and unchanged:
+                        util.show('Skin weights unchanged, skipping folder: %s' % thing_filename)
+                        if second_only:
+                            break
+                        continue
+
+                    if util_file.is_dir(geo_path, case_sensitive=True):
+                        files = util_file.get_files(geo_path)
+
+                        for filename in files:
+                            util_file.delete_file(filename, geo_path)
+
+                    else:
+                        geo_path = util_file.create_dir(thing_filename, path)
+
+                    if not geo_path:
+                        util.error('Please check!'
+                                   ' Unable to create skin weights directory: %s in %s' % (thing_filename, path))
+                        continue
+
+                    if is_mesh:
+                        self._export_ref_obj(thing, geo_path)
+
+                    job = pool.submit(self._write_mesh_weights, geo_path, weight_matrix, positions, settings_lines,
+                                      binary_file, single_file, timer, thing, mesh_info, weight_hash)
+                    jobs.append([path, geo_path, job])
 
                     mesh_folder = util_file.get_basename(geo_path)
                     deformer_folder = util_file.get_basename(util_file.get_dirname(geo_path))
 
-                    util.show('Skin weights exported to folder: %s/%s' % (deformer_folder, mesh_folder))
+                    util.show('Skin weights queued for folder: %s/%s' % (deformer_folder, mesh_folder))
                     if second_only:
                         break
 
             if progress.break_signaled():
-                progress.end()
                 break
 
             progress.next()
 
+        wait_start = timer.start()
+        catalog_entries = {}
+        for data_path, geo_path, job in jobs:
+            if data_path not in catalog_entries:
+                catalog_entries[data_path] = {}
+            try:
+                folder, entry, warnings = job.result()
+            except:
+                util.error(traceback.format_exc())
+                util.warning('Skin weights failed to write to folder: %s' % geo_path)
+                continue
+
+            for warning in warnings:
+                util.warning(warning)
+
+            catalog_entries[data_path][util_file.get_basename(geo_path)] = entry
+            util.show('Skin weights exported to folder: %s' % folder)
+        pool.shutdown()
+        timer.end('wait for writes', wait_start)
+
+        catalog_start = timer.start()
+        for data_path in catalog_entries:
+            catalog = self._update_catalog(data_path, catalog_entries[data_path])
+            catalog.save()
+        timer.end('write catalog', catalog_start)
+
+        for data_path in changed_meshes:
+            changed = changed_meshes[data_path]
+            if changed:
+                util.show('Skin weights changed in %s on: %s' % (util_file.get_basename(data_path), ', '.join(changed)))
+
+        if jobs:
+            timer.show('Skin weight export stages:')
+
         if not found_one:
             progress.end()
             watch.end()
@@ -1801,13 +2110,300 @@ class SkinWeightData(MayaCustomData):
             maya_lib.core.print_help('skin weights exported.')
 
         if version_up:
-            util_file.get_permission(path)
-            version = util_file.VersionFile(path)
-            version.save(comment)
+            changed = changed_meshes.get(path, [])
+
+            if incremental and not changed:
+                util.show('No skin weights changed. Skipping version up.')
+            else:
+                util_file.get_permission(path)
+                version = util_file.VersionFile(path)
+                version.save(comment, {'changed': ', '.join(changed)})
 
         progress.end()
         watch.end()
 
+    def _get_weight_format(self, binary_file, single_file):
+        if binary_file:
+            return 'binary'
+        if single_file:
+            return 'single file'
+        return 'text'
+
+    def _is_mesh_unchanged(self, geo_path, entry, weight_hash, weight_format):
+        """
+        Check a mesh folder against its catalog entry and the hash of the weights about to be exported.
+        """
+
+        if not entry:
+            return False
+
+        if entry.get('weight_hash') != weight_hash or entry.get('format') != weight_format:
+            return False
+
+        for filename in entry.get('files', {}):
+            if not util_file.is_file(util_file.join_path(geo_path, filename)):
+                return False
+
+        return True
+
+    def _name_weight_matrix(self, weight_matrix, skin):
+        """
+        Scene query. Replace the influence indices of the matrix with influence names.
+
+        Returns:
+            list: The world position of each influence.
+        """
+
+        influence_names = {}
+
+        for influence in weight_matrix.influences:
+            if influence is None or influence == 'None':
+                continue
+
+            influence_name = maya_lib.deform.get_skin_influence_at_index(influence, skin)
+
+            if not influence_name or not cmds.objExists(influence_name):
+                continue
+
+            influence_names[influence] = influence_name
+
+        names = list(influence_names.values())
+        names.sort()
+
+        mapping = dict((influence, influence_names.get(influence)) for influence in weight_matrix.influences)
+        weight_matrix.remap_influences(mapping, names)
+
+        positions = [cmds.xform(name, q=True, ws=True, t=True) for name in names]
+
+        return positions
+
+    def _write_mesh_weights(self, geo_path, weight_matrix, positions, settings_lines, binary_file=False,
+                            single_file=False, timer=None, mesh=None, mesh_info=None, weight_hash=None):
+        """
+        Write the files of one mesh folder. This does not touch the scene, so it can run on a worker thread.
+        Nothing is printed here. Printing from a worker thread is not safe in Maya, so messages are returned for the main thread.
+
+        Returns:
+            list: [deformer folder/mesh folder, the catalog entry of the mesh folder, warning messages]
+        """
+
+        if timer is None:
+            timer = util.StageTimer()
+
+        warnings = []
+
+        if binary_file:
+            stage_start = timer.start()
+            filepath = util_file.join_path(geo_path, util_weight.weight_file_name)
+            util_weight.write_weight_file(filepath, weight_matrix, positions)
+            timer.end('serialize and write weights', stage_start)
+        else:
+            stage_start = timer.start()
+            weights_dict = weight_matrix.to_dict()
+            timer.end('serialize weights', stage_start)
+
+            stage_start = timer.start()
+            info_lines = []
+            lines = []
+
+            for influence_name, influence_position in zip(weight_matrix.influences, positions):
+                if influence_name not in weights_dict:
+                    continue
+
+                weights = weights_dict[influence_name]
+
+                if single_file:
+                    lines.append('%s=%s' % (influence_name, str(weights)))
+                else:
+                    influence_filename = influence_name.replace(':', '-')
+                    filepath = util_file.create_file('%s.weights' % influence_filename, geo_path)
+
+                    if not filepath:
+                        warnings.append('%s was not created.' % util_file.join_path(geo_path, influence_name))
+                        continue
+
+                    util_file.write_lines(filepath, str(weights))
+
+                info_lines.append("{'%s' : {'position' : %s}}" % (influence_name, str(influence_position)))
+
+            if single_file:
+                filepath = util_file.create_file('all.skin.weights', geo_path)
+                util_file.write_lines(filepath, lines)
+
+            info_file = util_file.create_file('influence.info', geo_path)
+            util_file.write_lines(info_file, info_lines)
+            timer.end('write weights', stage_start)
+
+        stage_start = timer.start()
+        settings_file = util_file.create_file('settings.info', geo_path)
+        util_file.write_lines(settings_file, settings_lines)
+        timer.end('write settings', stage_start)
+
+        stage_start = timer.start()
+        entry = util_weight.create_catalog_entry(geo_path, mesh, mesh_info, weight_matrix.influences, positions,
+                                                 weight_matrix.vertex_count)
+        entry['weight_hash'] = weight_hash
+        entry['format'] = self._get_weight_format(binary_file, single_file)
+        timer.end('hash files', stage_start)
+
+        mesh_folder = util_file.get_basename(geo_path)
+        deformer_folder = util_file.get_basename(util_file.get_dirname(geo_path))
+
+        return ['%s/%s' % (deformer_folder, mesh_folder), entry, warnings]
+
+    def _get_catalog_entry(self, folder_path):
+        """
+        Create a catalog entry for a mesh folder that was exported before catalogs were written.
+        """
+
+        mesh_info = None
+        for line_list in self._get_skin_settings(folder_path):
+            if line_list[0] == 'mesh info':
+                mesh_info = line_list[1]
+
+        influences = []
+        positions = []
+        vertex_count = None
+
+        weight_file = self._get_weight_file(folder_path)
+
+        if weight_file:
+            header = util_weight.read_weight_header(weight_file)
+            influences = header['influences']
+            positions = header['positions']
+            vertex_count = header['vertex_count']
+        else:
+            info_file = util_file.join_path(folder_path, 'influence.info')
+
+            if util_file.is_file(info_file):
+                influence_dict = {}
+                for line_dict in map(eval, filter(None, util_file.get_file_lines(info_file))):
+                    influence_dict.update(line_dict)
+
+                influences = list(influence_dict.keys())
+                influences.sort()
+                positions = [influence_dict[influence].get('position') for influence in influences]
+
+        if mesh_info:
+            vertex_count = mesh_info[0]
+
+        folder = util_file.get_basename(folder_path)
+        mesh = folder.replace('-', ':').replace('.', '|')
+        if mesh != folder and folder.find('.') > -1:
+            mesh = '|' + mesh
+
+        return util_weight.create_catalog_entry(folder_path, mesh, mesh_info, influences, positions, vertex_count)
+
+    def _update_catalog(self, path, entries=None):
+        """
+        Add entries to the catalog of path.
+        Mesh folders missing from the catalog get an entry and entries of deleted mesh folders are removed.
+
+        Returns:
+            WeightCatalog
+        """
+
+        if entries is None:
+            entries = {}
+
+        catalog = util_weight.WeightCatalog(path)
+
+        for folder in entries:
+            catalog.set_entry(folder, entries[folder])
+
+        folders = [folder for folder in util_file.get_folders(path) if not folder.startswith('.')]
+
+        for folder in folders:
+            if catalog.has_entry(folder):
+                continue
+
+            try:
+                catalog.set_entry(folder, self._get_catalog_entry(util_file.join_path(path, folder)))
+            except:
+                util.error(traceback.format_exc())
+                util.warning('Could not add %s to the skin weights catalog.' % folder)
+
+        for folder in catalog.get_folders():
+            if folder not in folders:
+                catalog.remove_entry(folder)
+
+        return catalog
+
+    def get_catalog(self, inc=0):
+        """
+        Get the catalog of the skin weights folder. The catalog is built if it was not written at export.
+
+        Args:
+            inc (int): 0 for the first skin cluster, 1 for the second...
+
+        Returns:
+            WeightCatalog
+        """
+
+        path = self.get_file(inc)
+
+        if not util_file.is_dir(path):
+            return
+
+        catalog = util_weight.WeightCatalog(path)
+
+        if not catalog.exists():
+            catalog = self._update_catalog(path)
+            catalog.save()
+
+        return catalog
+
+    def get_mesh_topology(self, folder, inc=0):
+        """
+        Returns:
+            dict: vertex_count, edge_count, face_count, first_face and last_face recorded at export.
+        """
+
+        catalog = self.get_catalog(inc)
+
+        if not catalog:
+            return
+
+        return catalog.get_topology(folder)
+
+    def get_changed_meshes(self, version_number=None, inc=0):
+        """
+        Find which mesh folders changed since a version.
+
+        Args:
+            version_number (int): By default, the latest version. This finds changes that are not versioned yet.
+            inc (int): 0 for the first skin cluster, 1 for the second...
+
+        Returns:
+            dict: 'added', 'removed' and 'changed' lists of mesh folder names.
+        """
+
+        catalog = self.get_catalog(inc)
+
+        if not catalog:
+            return
+
+        version_file = util_file.VersionFile(util_file.get_dirname(catalog.directory))
+
+        version_catalog = None
+        version_path = None
+
+        if version_number is None:
+            version_numbers = version_file.get_version_numbers()
+            if version_numbers:
+                version_number = version_numbers[-1]
+
+        if version_number:
+            version_path = version_file.get_version_path(version_number)
+
+        if version_path and util_file.is_dir(version_path):
+            version_catalog = util_weight.WeightCatalog(version_path)
+
+            if not version_catalog.exists():
+                version_catalog = self._update_catalog(version_path)
+
+        return catalog.get_changes(version_catalog)
+
     def get_skin_meshes(self):
 
         filepath = self.get_file()
@@ -1816,7 +2412,12 @@ class SkinWeightData(MayaCustomData):
         meshes = None
 
         if util_file.is_dir(path):
-            meshes = util_file.get_folders(path)
+            catalog = util_weight.WeightCatalog(path)
+
+            if catalog.exists():
+                meshes = catalog.get_folders()
+            else:
+                meshes = util_file.get_folders(path)
 
         return meshes
 
@@ -1836,7 +2437,15 @@ class SkinWeightData(MayaCustomData):
 
         test_path = util_file.join_path(path, mesh)
 
-        return not util_file.is_dir(test_path)
+        removed = not util_file.is_dir(test_path)
+
+        if removed:
+            catalog = util_weight.WeightCatalog(path)
+
+            if catalog.remove_entry(mesh):
+                catalog.save()
+
+        return removed
 
 
 class LoadWeightFileThread(threading.Thread):
@@ -3344,7 +3953,7 @@ class MayaFileData(MayaCustomData):
         top_transforms = maya_lib.core.get_top_dag_nodes(exclude_cameras=True)
         return top_transforms
 
-    def save(self, comment):
+    def save(self, comment, version=True):
 
         if not util.is_in_maya():
             util.warning('Data must be accessed from within maya.')
@@ -3385,11 +3994,12 @@ class MayaFileData(MayaCustomData):
         MayaFileData.check_after_save = True
 
         if saved:
-            version = util_file.VersionFile(filepath)
+            if version:
+                version_file = util_file.VersionFile(filepath)
 
-            # if maya_lib.core.is_batch() or not version.has_versions():
+                # if maya_lib.core.is_batch() or not version.has_versions():
 
-            version.save(comment)
+                version_file.save(comment)
 
             maya_lib.core.print_help('Saved %s data.' % self.name)
             return True
@@ -6,6 +6,7 @@ import math
 
 from .. import util
 from .. import util_math
+from .. import util_weight
 
 if util.is_in_maya():
     import maya.cmds as cmds
@@ -1379,9 +1380,17 @@ def get_border_edges(mesh):
     return found
 
 
-def get_skin_weights_dict(skin_cluster, vert_ids=None):
-    if vert_ids is None:
-        vert_ids = []
+def get_skin_weights_matrix(skin_cluster, vert_ids=None):
+    """
+    Get the skin weights as a sparse matrix. Only weights that exist on the skin cluster are stored.
+
+    Args:
+        skin_cluster (str): The name of a skin cluster.
+        vert_ids (list): Only get the weights of these vertices.
+
+    Returns:
+        util_weight.SkinWeightMatrix: Influences are the logical influence indices of the skin cluster.
+    """
     mobject = get_object(skin_cluster)
 
     mf_skin = omAnim.MFnSkinCluster(mobject)
@@ -1390,14 +1399,20 @@ def get_skin_weights_dict(skin_cluster, vert_ids=None):
     weights_plug = mf_skin.findPlug('weights', 0)
     weight_list_attr = weight_list_plug.attribute()
     weights_attr = weights_plug.attribute()
-    weight_influence_ids = om.MIntArray()
-
-    weights = {}
 
     vert_count = weight_list_plug.numElements()
 
     if not vert_ids:
-        vert_ids = list(range(vert_count))
+        vert_ids = range(vert_count)
+    else:
+        vert_ids = sorted(set(vert_ids))
+
+    influences = []
+    columns = {}
+
+    offsets = [0] * (vert_count + 1)
+    indices = []
+    values = []
 
     for vertex_id in vert_ids:
 
@@ -1407,22 +1422,40 @@ def get_skin_weights_dict(skin_cluster, vert_ids=None):
 
         influence_plug = om.MPlug(weights_plug)
 
+        count = 0
+
         for influence_id in weight_influence_ids:
 
             influence_plug.selectAncestorLogicalIndex(influence_id, weights_attr)
 
-            if influence_id not in weights:
-                weights[influence_id] = [0] * vert_count
-
             try:
                 value = influence_plug.asDouble()
-                weights[influence_id][vertex_id] = value
-
             except KeyError:
                 # assumes a removed influence
-                pass
+                continue
+
+            column = columns.get(influence_id)
+            if column is None:
+                column = len(influences)
+                columns[influence_id] = column
+                influences.append(influence_id)
+
+            indices.append(column)
+            values.append(value)
+            count += 1
+
+        offsets[vertex_id + 1] = count
+
+    for inc in range(vert_count):
+        offsets[inc + 1] += offsets[inc]
+
+    return util_weight.SkinWeightMatrix.from_rows(influences, offsets, indices, values)
+
+
+def get_skin_weights_dict(skin_cluster, vert_ids=None):
+    matrix = get_skin_weights_matrix(skin_cluster, vert_ids)
 
-    return weights
+    return matrix.to_dict()
 
 
 def get_identity_matrix():
@@ -4835,6 +4835,23 @@ def get_skin_weights(skin_deformer, vert_ids=None):
     return value_map
 
 
+def get_skin_weight_matrix(skin_deformer, vert_ids=None):
+    """
+    Get the skin weights for the skin cluster as a sparse matrix.
+    Only the weights that exist on the skin cluster are stored,
+    so this is much lighter than get_skin_weights on dense meshes with many influences.
+
+    Args:
+        skin_deformer (str): The name of a skin deformer.
+        vert_ids (list): Only get the weights of these vertices.
+
+    Returns:
+        util_weight.SkinWeightMatrix: Influences are the influence indices of the skin cluster.
+    """
+
+    return api.get_skin_weights_matrix(skin_deformer, vert_ids)
+
+
 def get_skin_influence_weights(influence_name, skin_deformer):
     """
     This is good to use if you just need to query one influence in a skin cluster.
@@ -4846,12 +4863,12 @@ def get_skin_influence_weights(influence_name, skin_deformer):
     if influence_index is None:
         return
 
-    weights_dict = api.get_skin_weights_dict(skin_deformer)
+    weight_matrix = api.get_skin_weights_matrix(skin_deformer)
 
-    if influence_index in weights_dict:
-        weights = weights_dict[influence_index]
+    if weight_matrix.has_influence(influence_index):
+        weights = weight_matrix.get_column(influence_index)
 
-    if influence_index not in weights_dict:
+    if not weight_matrix.has_influence(influence_index):
         indices = attr.get_indices('%s.weightList' % skin_deformer)
         index_count = len(indices)
         weights = [0] * index_count
@@ -5142,7 +5159,7 @@ def smooth_skin_weights(verts, iterations=1, percent=1, mode=0, use_api=False):
         vert_inc = 1
 
         if vert_count > all_weights_switch:
-            weights = get_skin_weights(skin)
+            weights = get_skin_weight_matrix(skin)
 
         if use_api:
             weight_array = om.MDoubleArray()
@@ -5191,16 +5208,14 @@ def smooth_skin_weights(verts, iterations=1, percent=1, mode=0, use_api=False):
             surrounding_vert_indices = surrounding_vert_indices + [vert_index]
 
             if not weights:
-                weights = get_skin_weights(skin, surrounding_vert_indices)
+                weights = get_skin_weight_matrix(skin, surrounding_vert_indices)
 
             for influence_index in influence_indices:
 
-                if influence_index not in weights:
+                if not weights.has_influence(influence_index):
                     continue
 
-                influence_weights = weights[influence_index]
-
-                current_weight = influence_weights[vert_index]
+                current_weight = weights.get_weight(vert_index, influence_index)
 
                 all_zero = True
                 all_one = True
@@ -5208,7 +5223,7 @@ def smooth_skin_weights(verts, iterations=1, percent=1, mode=0, use_api=False):
                 sub_weights = []
 
                 for surrounding_index in surrounding_vert_indices:
-                    weight = influence_weights[surrounding_index]
+                    weight = weights.get_weight(surrounding_index, influence_index)
 
                     sub_weights.append(weight)
 
@@ -0,0 +1,86 @@
+# Copyright (C) 2022 Louis Vottero louis.vot@gmail.com    All rights reserved.
+
+"""
+Builds one process in its own interpreter for LocalBatchRunner.
+
+Usage:
+    mayapy batch_local.py process_path [result_path] [--no-save]
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import json
+import traceback
+
+print('Using Python Version:\t', sys.version)
+vetala_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if vetala_path not in sys.path:
+    sys.path.insert(0, vetala_path)
+print('Using Vetala Path: ', vetala_path)
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    save = '--no-save' not in sys.argv
+
+    if not args:
+        print('No process path given.')
+        return 2
+
+    process_path = args[0]
+    result_path = None
+    if len(args) > 1:
+        result_path = args[1]
+
+    standalone = False
+    try:
+        import maya.standalone
+        maya.standalone.initialize(name='python')
+        standalone = True
+    except ImportError:
+        print('Maya standalone not found, building without Maya.')
+
+    from vtool import util
+    from vtool.process_manager import process
+
+    os.environ['VETALA_CURRENT_PROCESS'] = process_path
+
+    result = {'path': process_path, 'status_list': [], 'errors': []}
+
+    try:
+        process_inst = process.Process()
+        process_inst.set_directory(process_path)
+
+        status_list = process_inst.run() or []
+        for script, status in status_list:
+            if status not in ('Success', 'Skipped', 'Checkpoint'):
+                result['errors'].append(script)
+                status = 'fail'
+            result['status_list'].append([script, status])
+
+        if save and util.is_in_maya():
+            if not process_inst.save_data('build', 'Local batch build'):
+                result['errors'].append('Could not save build data')
+    except Exception:
+        result['errors'].append(traceback.format_exc())
+
+    if result_path:
+        with open(result_path, 'w') as result_file:
+            json.dump(result, result_file)
+
+    if standalone:
+        try:
+            maya.standalone.uninitialize()
+        except Exception:
+            pass
+
+    if result['errors']:
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,7 +8,19 @@ import traceback
 import string
 import subprocess
 import inspect
+import json
+import hashlib
+import math
+import time
+import threading
 from functools import wraps
+from collections import OrderedDict
+from copy import deepcopy
+
+try:
+    from os import scandir
+except ImportError:
+    scandir = None
 
 from .. import util
 from .. import util_file
@@ -54,14 +66,423 @@ def get_current_process_instance():
     return process_inst
 
 
+class ProcessTreeScanner(object):
+    """
+    Lists processes and interesting folders in a directory without re-checking every folder on each call.
+    Each directory's modified time is kept with its listing. While it has not changed, the listing is reused
+    and only the child folders are checked for .code, one check per folder.
+    With a DirectoryWatcher set, directories it watches recursively are not checked again until it reports a change
+    under them or their modified time changes.
+
+    Args:
+        cache_path (str): Optional json file to keep the cache between sessions.
+    """
+
+    max_entries = 20000
+    cache_version = 2
+
+    # file systems like fat and some network shares only keep modified times to the second or two.
+    mtime_resolution = 2.0
+
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path
+
+        self._entries = {}
+        self._loaded = False
+        self._dirty = False
+        self._lock = threading.RLock()
+
+        self._watcher = None
+        self._current = set()
+        self._generation = 0
+
+        self._thread = None
+
+        self.scans = 0
+        self.listing_hits = 0
+        self.code_checks = 0
+        self.watch_hits = 0
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+
+        if not self.cache_path or not util_file.exists(self.cache_path):
+            return
+
+        try:
+            cache = util_file.get_json(self.cache_path)
+        except Exception:
+            log.debug('Could not read process tree cache %s' % self.cache_path)
+            return
+
+        if not cache or cache.get('version') != self.cache_version:
+            return
+
+        self._entries.update(cache.get('directories', {}))
+
+    @staticmethod
+    def _get_mtime(directory):
+        try:
+            return os.stat(directory).st_mtime
+        except OSError:
+            return
+
+    def _get_children(self, directory):
+        """
+        Returns:
+            list: [name, is_dir, is_file] for every entry that does not start with a dot.
+        """
+        children = []
+
+        if scandir:
+            try:
+                iterator = scandir(directory)
+            except OSError:
+                return None
+
+            for entry in iterator:
+                if entry.name.startswith('.'):
+                    continue
+                try:
+                    is_dir = entry.is_dir()
+                    children.append([entry.name, is_dir, not is_dir and entry.is_file()])
+                except OSError:
+                    continue
+
+            return children
+
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return None
+
+        for name in names:
+            if name.startswith('.'):
+                continue
+            full_path = os.path.join(directory, name)
+            is_dir = os.path.isdir(full_path)
+            children.append([name, is_dir, not is_dir and os.path.isfile(full_path)])
+
+        return children
+
+    def _get_cached_listing(self, entry, mtime):
+        """
+        The listing of an entry, if the directory has not changed since it was listed.
+        A directory modified within mtime_resolution of its listing is listed again,
+        because a change in the same tick would not change its modified time.
+        """
+        if entry.get('mtime') != mtime or entry.get('checked', 0) - mtime <= self.mtime_resolution:
+            return
+
+        return [[name, value[1], value[2]] for name, value in entry['children'].items()]
+
+    def _get_cached_result(self, directory):
+        entry = self._entries.get(directory)
+
+        if not entry:
+            return
+
+        found = []
+        found_non = []
+
+        for name, value in entry['children'].items():
+            if value[0] == 'process':
+                found.append(name)
+            if value[0] == 'folder':
+                found_non.append(name)
+
+        return [found, found_non]
+
+    def _remove_entry(self, directory):
+        with self._lock:
+            self._current.discard(directory)
+            if directory in self._entries:
+                self._entries.pop(directory)
+                self._dirty = True
+
+    def set_watcher(self, watcher):
+        """
+        Args:
+            watcher (util_file.DirectoryWatcher): Trust cached results for directories it watches until it reports a change.
+        """
+        if self._watcher:
+            self._watcher.remove_callback(self._watch_events)
+
+        self._watcher = watcher
+
+        with self._lock:
+            self._current.clear()
+
+        if watcher:
+            watcher.add_callback(self._watch_events)
+
+    def _watch_events(self, events):
+
+        with self._lock:
+            self._generation += 1
+
+            for event in events:
+                path = util_file.fix_slashes(event.path)
+
+                if event.kind == 'rescan':
+                    prefix = path + '/'
+                    for directory in list(self._current):
+                        if directory == path or directory.startswith(prefix):
+                            self._current.discard(directory)
+                    continue
+
+                # a change to .code under a process changes what the folder above the process lists it as.
+                parent = os.path.dirname(path)
+                self._current.discard(path)
+                self._current.discard(parent)
+                self._current.discard(os.path.dirname(parent))
+
+    def scan(self, directory):
+        """
+        Scan one directory and update the cache.
+
+        Returns:
+            list: [processes, non_processes] in listing order.
+        """
+        directory = util_file.fix_slashes(directory)
+
+        checked = time.time()
+        mtime = self._get_mtime(directory)
+
+        if mtime is None:
+            self._remove_entry(directory)
+            return [[], []]
+
+        children = None
+
+        with self._lock:
+            self._load()
+            generation = self._generation
+            entry = self._entries.get(directory)
+
+            if entry and entry.get('mtime') == mtime and directory in self._current:
+                self.watch_hits += 1
+                return self._get_cached_result(directory)
+
+            if entry:
+                children = self._get_cached_listing(entry, mtime)
+
+        if children is None:
+            children = self._get_children(directory)
+        else:
+            with self._lock:
+                self.listing_hits += 1
+
+        if children is None:
+            self._remove_entry(directory)
+            return [[], []]
+
+        found = []
+        found_non = []
+        new_children = OrderedDict()
+
+        code_checks = 0
+
+        for name, is_dir, is_file in children:
+            kind = None
+
+            if is_dir:
+                code_checks += 1
+                if os.path.exists(os.path.join(directory, name, '.code')):
+                    kind = 'process'
+
+            if not kind:
+                if name.find('.') == -1 or not is_file:
+                    kind = 'folder'
+
+            new_children[name] = [kind, is_dir, is_file]
+
+            if kind == 'process':
+                found.append(name)
+            if kind == 'folder':
+                found_non.append(name)
+
+        with self._lock:
+            self.scans += 1
+            self.code_checks += code_checks
+
+            cached = (entry or {}).get('children', {})
+            if new_children != cached or not entry or entry.get('mtime') != mtime:
+                self._dirty = True
+
+            self._entries.pop(directory, None)
+            self._entries[directory] = {'mtime': mtime, 'checked': checked, 'children': new_children}
+
+            if len(self._entries) > self.max_entries:
+                for key in list(self._entries.keys())[:len(self._entries) - self.max_entries]:
+                    self._entries.pop(key)
+                    self._current.discard(key)
+
+            watcher = self._watcher
+            # the children have to be watched too, or a new .code under one of them would be missed.
+            if watcher and generation == self._generation and watcher.is_watching(directory, recursive=True):
+                self._current.add(directory)
+
+        return [found, found_non]
+
+    def walk(self, directory, max_workers=1, depth=None):
+        """
+        Scan directory and every process and folder under it, one level at a time on a WorkerPool.
+        This warms the cache so expanding the process tree afterwards does not touch .code folders.
+        Local disks scan fastest on one thread. More workers help on network shares.
+
+        Args:
+            directory (str): The directory to start at.
+            max_workers (int): Threads to scan with.
+            depth (int): How many levels to go down. None means all.
+
+        Returns:
+            int: The number of directories scanned.
+        """
+
+        level = [util_file.fix_slashes(directory)]
+        count = 0
+        current_depth = 0
+
+        with util.WorkerPool(max_workers) as pool:
+            while level:
+                results = pool.map(self.scan, level)
+                count += len(level)
+
+                current_depth += 1
+                if depth is not None and current_depth > depth:
+                    break
+
+                next_level = []
+                for parent, result in zip(level, results):
+                    for name in result[0] + result[1]:
+                        next_level.append(parent + '/' + name)
+                level = next_level
+
+        return count
+
+    def walk_in_background(self, directory, depth=None):
+        """
+        Walk on a thread and save the cache when done, so the ui can show the tree without waiting for it.
+        Nothing is started while a walk is still running.
+
+        Returns:
+            ProcessTreeWalkThread: None if a walk is still running.
+        """
+
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._thread = ProcessTreeWalkThread(self, directory, depth)
+        self._thread.start()
+
+        return self._thread
+
+    def invalidate(self, directory=None, recursive=True):
+        """
+        Forget cached results for directory and everything under it, or everything if no directory is given.
+
+        Args:
+            directory (str)
+            recursive (bool): Also forget the directories under directory.
+        """
+        with self._lock:
+            self._load()
+            if not directory:
+                self._entries.clear()
+                self._current.clear()
+                self._dirty = True
+                return
+
+            directory = util_file.fix_slashes(directory)
+
+            if not recursive:
+                self._remove_entry(directory)
+                return
+
+            for key in list(self._entries.keys()):
+                if key == directory or key.startswith(directory + '/'):
+                    self._remove_entry(key)
+
+    def save(self):
+        if not self.cache_path or not self._dirty:
+            return
+
+        with self._lock:
+            cache = {'version': self.cache_version, 'directories': dict(self._entries)}
+            self._dirty = False
+
+        try:
+            util_file.create_dir(os.path.dirname(self.cache_path))
+            util_file.set_json(self.cache_path, cache, atomic=True)
+        except Exception:
+            log.debug('Could not save process tree cache %s' % self.cache_path)
+
+    def get_stats(self):
+        return {'directories': len(self._entries), 'scans': self.scans, 'listing_hits': self.listing_hits,
+                'code_checks': self.code_checks, 'watch_hits': self.watch_hits}
+
+
+class ProcessTreeWalkThread(threading.Thread):
+    """
+    Walks a ProcessTreeScanner in the background and saves it.
+    """
+
+    def __init__(self, scanner, directory, depth=None):
+        super(ProcessTreeWalkThread, self).__init__()
+
+        self.daemon = True
+
+        self.scanner = scanner
+        self.directory = directory
+        self.depth = depth
+
+    def run(self):
+        try:
+            self.scanner.walk(self.directory, depth=self.depth)
+            self.scanner.save()
+        except Exception:
+            log.debug(traceback.format_exc())
+
+
+_process_tree_scanner = None
+
+
+def get_process_tree_scanner():
+    """
+    Returns:
+        ProcessTreeScanner: The scanner used by find_processes. It is saved next to the vetala settings.
+    """
+    global _process_tree_scanner
+
+    if _process_tree_scanner is None:
+        settings_path = os.environ.get('VETALA_SETTINGS')
+        if not settings_path:
+            settings_path = util_file.get_default_directory()
+
+        cache_path = util_file.join_path(settings_path, 'process_tree_cache.json')
+        _process_tree_scanner = ProcessTreeScanner(cache_path)
+        _process_tree_scanner.set_watcher(util_file.get_directory_watcher())
+
+    return _process_tree_scanner
+
+
+def save_process_tree_cache():
+    if _process_tree_scanner:
+        _process_tree_scanner.save()
+
+
 def find_processes(directory=None, return_also_non_process_list=False, stop_at_one=False):
     """
     This will try to find the processes in the supplied directory.
+    Results come from the ProcessTreeScanner, so folders that have not changed are not checked again.
     
     Args:
         directory(str): The directory to search for processes.
-        return_also_non_process_list (bool): TODO: Fill description.
-        stop_at_one (bool): TODO: Fill description.
+        return_also_non_process_list (bool): Also return folders that are not processes but could hold processes.
+        stop_at_one (bool): Only return the first process found, or the first folder if there are no processes.
         
     Returns:
         list: The processes in the directory.
@@ -79,65 +500,432 @@ def find_processes(directory=None, return_also_non_process_list=False, stop_at_o
 
     log.debug('Find Processes %s' % directory)
 
-    root = directory
-    dirs = []
-    try:
-        dirs = os.listdir(directory)
-    except:
-        pass
+    found, found_non = get_process_tree_scanner().scan(directory)
+
+    if stop_at_one:
+        # only check found not found_non, because function is find "processes"
+        if found:
+            found = found[:1]
+            found_non = []
+        else:
+            found_non = found_non[:1]
+
+    if not return_also_non_process_list:
+        return found
+    if return_also_non_process_list:
+        return [found, found_non]
+
+
+def benchmark_process_scan(directory, process_count=10000, group_size=100):
+    """
+    Build a synthetic project with process_count processes in folders of group_size,
+    then time listing it the old way (listdir and a .code check per folder) against the ProcessTreeScanner.
+
+    Returns:
+        dict: Timings in seconds.
+    """
+
+    project = util_file.join_path(directory, 'scan_project')
+
+    if not util_file.exists(project):
+        for group_inc in range(int(math.ceil(process_count / float(group_size)))):
+            group_path = util_file.join_path(project, 'group_%s' % group_inc)
+            for inc in range(group_size):
+                if group_inc * group_size + inc >= process_count:
+                    break
+                os.makedirs(util_file.join_path(group_path, 'process_%s/.code' % inc))
+
+    groups = util_file.get_folders(project)
+
+    results = {}
+
+    start = time.time()
+    for group in groups:
+        group_path = util_file.join_path(project, group)
+        for folder in os.listdir(group_path):
+            full_path = util_file.join_path(group_path, folder)
+            if not is_process(full_path):
+                is_interesting_folder(folder, group_path)
+    results['listdir'] = time.time() - start
+
+    scanner = ProcessTreeScanner()
+
+    start = time.time()
+    for group in groups:
+        scanner.scan(util_file.join_path(project, group))
+    results['scan_cold'] = time.time() - start
+
+    start = time.time()
+    for group in groups:
+        scanner.scan(util_file.join_path(project, group))
+    results['scan_warm'] = time.time() - start
+
+    scanner = ProcessTreeScanner()
+
+    start = time.time()
+    scanner.walk(project, depth=1)
+    results['walk'] = time.time() - start
+
+    return results
+
+
+def is_interesting_folder(folder_name, directory):
+    full_path = util_file.join_path(directory, folder_name)
+    if folder_name.find('.') > -1:
+
+        if not folder_name.startswith('.'):
+
+            if not util_file.is_file(full_path):
+                return True
+    else:
+        return True
+
+    return False
+
+
+def is_process(directory):
+    if not directory:
+        return False
+
+    code_path = util_file.join_path(directory, '.code')
+
+    if not util_file.exists(code_path):
+        return False
+
+    return True
+
+
+class Manifest(object):
+    """
+    The scripts and states of a process manifest, parsed once.
+    Scripts are indexed by name, and by the script group they sit under, so state, children and parent lookups do not scan the list.
+    Use Manifest.load to get a shared instance that is only parsed again when the file changes on disk.
+
+    Args:
+        filepath (str): The manifest file.
+    """
+
+    _cache = {}
+    _lock = threading.Lock()
+
+    def __init__(self, filepath=None):
+        self.filepath = filepath
+
+        self.scripts = []
+        self.states = []
+
+        self._states = {}
+        self._children = {}
+        self._stat_key = None
+        self._build_plan = None
+
+    @staticmethod
+    def _get_stat_key(filepath):
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return None
+
+        return stat.st_mtime, stat.st_size
+
+    @staticmethod
+    def _parse_state(token):
+        if token == 'True':
+            return True
+        if token == 'False':
+            return False
+
+        try:
+            return eval(token)
+        except Exception:
+            return False
+
+    @classmethod
+    def load(cls, filepath):
+        """
+        Returns:
+            Manifest: The parsed manifest, or None if the file does not exist.
+        """
+
+        if not filepath:
+            return
+
+        stat_key = cls._get_stat_key(filepath)
+
+        if stat_key is None:
+            return
+
+        with cls._lock:
+            manifest = cls._cache.get(filepath)
+
+        if manifest and manifest._stat_key == stat_key:
+            return manifest
+
+        manifest = cls(filepath)
+        manifest.read()
+        manifest._stat_key = stat_key
+
+        with cls._lock:
+            cls._cache[filepath] = manifest
+
+        return manifest
+
+    @classmethod
+    def remove_cache(cls, filepath=None):
+        with cls._lock:
+            if filepath:
+                cls._cache.pop(filepath, None)
+            else:
+                cls._cache.clear()
+
+    def read(self):
+        scripts = []
+        states = []
+
+        for line in util_file.get_file_lines(self.filepath):
+
+            split_line = line.split()
+
+            if not split_line:
+                continue
+
+            scripts.append(' '.join(split_line[:-1]))
+
+            state = False
+            if len(split_line) >= 2:
+                state = self._parse_state(split_line[-1])
+
+            states.append(state)
+
+        self.set(scripts, states)
+
+    def set(self, scripts, states=None):
+        """
+        Replace the scripts and states and rebuild the index. This does not write the file.
+        """
+
+        if states is None:
+            states = []
+
+        self.scripts = list(scripts)
+        self.states = [False] * len(self.scripts)
+        self.states[:len(states)] = list(states)[:len(self.scripts)]
+
+        self._states = {}
+        self._children = {}
+        self._build_plan = None
+
+        for script, state in zip(self.scripts, self.states):
+            self._states[script] = state
+
+            if script.find('/') > -1:
+                parent = script[:script.rfind('/')]
+                self._children.setdefault(parent, []).append(script)
+
+    def write(self, append=False):
+        """
+        Write to the file and keep this instance as the cached manifest for it.
+        """
+
+        scripts = []
+        states = []
+
+        for script, state in zip(self.scripts, self.states):
+            if script == 'manifest.py':
+                continue
+            scripts.append(script)
+            states.append(state)
+
+        lines = ['%s %s' % (script, state) for script, state in zip(scripts, states)]
+
+        with util_file.FileLock(self.filepath):
+            util_file.write_lines(self.filepath, lines, append=append, atomic=True)
+
+        if not append:
+            self.set(scripts, states)
+
+        if append:
+            self.read()
+
+        self._stat_key = self._get_stat_key(self.filepath)
+
+        with self._lock:
+            self._cache[self.filepath] = self
+
+    def has_script(self, script_name):
+        return script_name in self._states
+
+    def get_state(self, script_name):
+        return self._states.get(script_name)
+
+    def set_state(self, script_name, state):
+        """
+        Returns:
+            bool: Whether the script was found.
+        """
+        if script_name not in self._states:
+            return False
+
+        for inc, script in enumerate(self.scripts):
+            if script == script_name:
+                self.states[inc] = state
+
+        self._states[script_name] = state
+        self._build_plan = None
+
+        return True
+
+    def get_states(self):
+        """
+        Returns:
+            dict: script name : state
+        """
+        return dict(self._states)
+
+    def get_children(self, code_name):
+        """
+        Args:
+            code_name (str): The script group name, without .py
+
+        Returns:
+            list: The scripts directly under code_name, in manifest order.
+        """
+        return list(self._children.get(code_name, []))
+
+    def get_parent(self, script_name):
+        """
+        Returns:
+            str: The script group script_name sits under, or None if it is at the top.
+        """
+        if script_name.find('/') == -1:
+            return
+
+        parent = script_name[:script_name.rfind('/')]
+        parent_script = parent + '.py'
+
+        if parent_script in self._states:
+            return parent_script
+
+    def get_build_plan(self):
+        """
+        Returns:
+            BuildPlan: The plan for the current scripts and states. It is reused until they change.
+        """
+        if not self._build_plan:
+            self._build_plan = BuildPlan(self.scripts, self.states)
+
+        return self._build_plan
+
+
+class BuildStep(object):
+    """
+    One manifest script in a BuildPlan.
+    """
+
+    def __init__(self, script, state, index):
+        self.script = script
+        self.name = util_file.remove_extension(script)
+        self.state = state
+        self.index = index
+
+        self.parent = None
+        self.children = []
+        self.ancestors = []
+        self.enabled = state
+
+    def get_depth(self):
+        return len(self.ancestors)
+
+
+class BuildPlan(object):
+    """
+    The manifest compiled into the order Process.run goes through, with each script's group parent resolved.
+    A script is enabled when it and every group above it are on.
+    Plans are made by Manifest.get_build_plan and kept until the manifest changes.
+
+    Args:
+        scripts (list): Scripts in manifest order.
+        states (list): The on/off state of each script.
+    """
 
-    for folder in dirs:
+    def __init__(self, scripts, states):
+        self.steps = []
+        self.roots = []
 
-        if stop_at_one:
-            # only check found not found_non, because function is find "processes"
-            if found:
-                break
+        steps_by_name = {}
 
-            if found_non and return_also_non_process_list:
-                break
+        for inc, (script, state) in enumerate(zip(scripts, states)):
+            step = BuildStep(script, state, inc)
 
-        if folder.startswith('.'):
-            continue
+            parent = None
+            name = step.name
+            while name.find('/') > -1:
+                name = name[:name.rfind('/')]
+                if name in steps_by_name:
+                    parent = steps_by_name[name]
+                    break
 
-        full_path = util_file.join_path(directory, folder)
+            if parent:
+                step.parent = parent
+                step.ancestors = parent.ancestors + [parent.name]
+                step.enabled = state and parent.enabled
+                parent.children.append(step)
+            else:
+                self.roots.append(step)
 
-        if is_process(full_path):
-            found.append(folder)
-        else:
-            if return_also_non_process_list:
-                if is_interesting_folder(folder, directory):
-                    found_non.append(folder)
+            steps_by_name[step.name] = step
+            self.steps.append(step)
 
-    if not return_also_non_process_list:
-        return found
-    if return_also_non_process_list:
-        return [found, found_non]
+    def is_skipped(self, step, skipped_names):
+        """
+        Args:
+            step (BuildStep)
+            skipped_names (set): Names of scripts that asked to skip their children while running.
 
+        Returns:
+            bool: Whether a script above step asked to skip its children.
+        """
+        if not skipped_names:
+            return False
 
-def is_interesting_folder(folder_name, directory):
-    full_path = util_file.join_path(directory, folder_name)
-    if folder_name.find('.') > -1:
+        for name in step.ancestors:
+            if name in skipped_names:
+                return True
 
-        if not folder_name.startswith('.'):
+        return False
 
-            if not util_file.is_file(full_path):
-                return True
-    else:
-        return True
+    def get_run_scripts(self):
+        """
+        Returns:
+            list: The scripts that will run, in order, if no script asks to skip its children.
+        """
+        return [step.script for step in self.steps if step.enabled]
 
-    return False
+    def get_status_list(self):
+        """
+        A dry run of the plan.
 
+        Returns:
+            list: [script, status] for every script, where status is Run, Skipped or Parent Off.
+        """
+        status_list = []
 
-def is_process(directory):
-    if not directory:
-        return False
+        for step in self.steps:
+            status = 'Run'
+            if not step.state:
+                status = 'Skipped'
+            elif not step.enabled:
+                status = 'Parent Off'
+            status_list.append([step.script, status])
 
-    code_path = util_file.join_path(directory, '.code')
+        return status_list
 
-    if not util_file.exists(code_path):
-        return False
+    def get_text(self):
+        lines = []
+        for step, status_entry in zip(self.steps, self.get_status_list()):
+            lines.append('%s%s : %s' % ('    ' * step.get_depth(), status_entry[0], status_entry[1]))
 
-    return True
+        return '\n'.join(lines)
 
 
 def is_process_enabled(directory):
@@ -227,6 +1015,10 @@ def decorator_process_run_script(function):
 
             reset_process_builtins(self, {'put': put})
 
+        timing_entry = None
+        if self._timing:
+            timing_entry = self._timing.start('script', script)
+
         value = None
 
         if in_maya:
@@ -253,7 +1045,20 @@ def decorator_process_run_script(function):
             cmds.evaluationManager(mode=mode)
 
         else:
-            value = function(self, script, hard_error, settings, return_status)
+            try:
+                value = function(self, script, hard_error, settings, return_status)
+            except Exception:
+                if timing_entry:
+                    self._timing.end(timing_entry, 'fail')
+                raise
+
+        if timing_entry:
+            status = None
+            if return_status:
+                status = 'Success'
+                if value != 'Success':
+                    status = 'fail'
+            self._timing.end(timing_entry, status)
 
         if 'reset' in locals():
 
@@ -279,6 +1084,111 @@ def decorator_process_run_script(function):
     return wrapper
 
 
+class OptionStore(object):
+    """
+    The options of a process, kept in memory.
+    Short option names are indexed to their group.name keys, and formatted values are kept until the options change.
+    The options file is only read again when it changes on disk.
+    If the settings are read again or merged with changes from disk, for example by a delayed flush, the index is built again.
+    """
+
+    def __init__(self):
+        self.settings = util_file.SettingsFile()
+        self.directory = None
+
+        self._index = None
+        self._formatted = {}
+        self._revision = None
+
+    def set_directory(self, directory):
+        self.directory = directory
+        self.settings.set_directory(directory, 'options.json')
+        self.invalidate()
+
+    def update(self, directory):
+        """
+        Read the options again if the directory changed or the file changed on disk.
+
+        Returns:
+            bool: True if the options were read again.
+        """
+        if directory != self.directory:
+            self.set_directory(directory)
+            return True
+
+        filepath = self.settings.get_file()
+
+        if not filepath:
+            return False
+
+        if self.settings._get_stat_key(filepath) == self.settings._stat_key:
+            return False
+
+        self.settings.reload()
+        self.invalidate()
+        return True
+
+    def invalidate(self):
+        self._index = None
+        self._formatted = {}
+
+    def _check_revision(self):
+        if self._revision != self.settings.revision:
+            self.invalidate()
+            self._revision = self.settings.revision
+
+    def _get_index(self):
+        self._check_revision()
+
+        if self._index is not None:
+            return self._index
+
+        index = {}
+
+        for key in self.settings.settings_dict:
+            split_key = key.split('.')
+            index.setdefault(split_key[-1], []).append(key)
+
+        self._index = index
+
+        return index
+
+    def get_keys(self, name):
+        """
+        Returns:
+            list: The group.name keys of options with the short name, in file order.
+        """
+        return self._get_index().get(name, [])
+
+    def get_formatted(self, key, format_function, option_name=None):
+        """
+        Args:
+            key (str): The group.name key of the option.
+            format_function: Called with (value, option_name) to format the raw value.
+            option_name (str): The name to pass to format_function. Defaults to key.
+
+        Returns:
+            The formatted value. It is kept until the options change.
+        """
+        if option_name is None:
+            option_name = key
+
+        cache_key = (key, option_name)
+
+        self._check_revision()
+
+        if cache_key in self._formatted:
+            value = self._formatted[cache_key]
+        else:
+            value = format_function(self.settings.settings_dict[key], option_name)
+            self._formatted[cache_key] = value
+
+        if isinstance(value, (list, dict)):
+            value = deepcopy(value)
+
+        return value
+
+
 class Process(object):
     """
     This class has functions to work on individual processes in the Process Manager.
@@ -291,6 +1201,7 @@ class Process(object):
     backup_folder_name = '.backup'
     process_data_filename = 'manifest.data'
     enable_filename = '.enable'
+    checkpoint_folder_name = '.checkpoint'
 
     def __init__(self, name=None):
 
@@ -300,6 +1211,7 @@ class Process(object):
         self._runtime_values = None
         self._data_override = None
         self.option_settings = None
+        self._option_store = None
         log.debug('Initialize process %s' % name)
 
         self.directory = util_file.get_cwd()
@@ -307,6 +1219,8 @@ class Process(object):
         self.process_name = name
 
         self.external_code_paths = []
+        self._external_code_key = None
+        self._found_external_code_paths = []
 
         self._reset()
         self._update_options = True
@@ -319,11 +1233,16 @@ class Process(object):
 
         self._unreal_skeletal_mesh = None
 
+        self._checkpoint_scene = None
+
+        self._timing = None
+
     def _reset(self):
         self.parts = []
         self.option_values = {}
 
         self.option_settings = None
+        self._option_store = None
         self.settings = None
         self._control_inst = None
         self._data_override = None
@@ -333,16 +1252,24 @@ class Process(object):
 
     def _setup_options(self):
 
-        if not self.option_settings or self._update_options:
+        if not self.option_settings or not self._option_store:
             self._load_options()
+            return
+
+        if self._update_options:
+            self._option_store.update(self._get_override_path())
 
     def _load_options(self):
 
         log.debug('Setup options')
-        options = util_file.SettingsFile()
+        self._option_store = OptionStore()
+        self._option_store.set_directory(self._get_override_path())
 
-        self.option_settings = options
-        self.option_settings.set_directory(self._get_override_path(), 'options.json')
+        self.option_settings = self._option_store.settings
+
+    def _clear_option_cache(self):
+        if self._option_store:
+            self._option_store.invalidate()
 
     def _setup_settings(self):
 
@@ -611,8 +1538,6 @@ class Process(object):
 
     def _source_script(self, script):
 
-        util_file.delete_pyc(script)
-
         put = None
         if self._data_override:
             put = self._data_override._put
@@ -624,7 +1549,7 @@ class Process(object):
 
         util.show('Sourcing: %s' % script)
 
-        module = util_file.source_python_module(script)
+        module = util_file.CodeCache.source_module(script)
 
         status = None
         init_passed = False
@@ -733,6 +1658,27 @@ class Process(object):
         directory = util.convert_to_sequence(directory)
 
         self.external_code_paths = directory
+        self._external_code_key = None
+
+    def get_external_code_paths(self):
+        """
+        Returns:
+            list: The external code paths that exist. They are only checked again when the external code library changes.
+        """
+
+        key = tuple(self.external_code_paths)
+
+        if key != self._external_code_key:
+            self._found_external_code_paths = [path for path in key if util_file.is_dir(path)]
+            self._external_code_key = key
+
+        return list(self._found_external_code_paths)
+
+    def _add_external_code_paths(self):
+
+        for external_code_path in self.get_external_code_paths():
+            if external_code_path not in sys.path:
+                sys.path.append(external_code_path)
 
     def is_process(self):
         """
@@ -1006,20 +1952,23 @@ class Process(object):
         return backup_path
 
     def backup(self, comment='Backup', directory=None):
+        """
+        Save a snapshot of the process as a version in the backup folder.
+        Each snapshot is a full folder tree, but unchanged files are hardlinks to the same stored file as the last
+        snapshot, so only changed files are copied. Backups, logs, checkpoints and version history are left out.
+        """
 
         backup_path = self.get_backup_path(directory)
 
-        backup_path = util_file.create_dir('temp_process_backup', backup_path)
-
-        util.show('Backing up to custom directory: %s' % backup_path)
+        util_file.create_dir(backup_path)
 
-        copy_process(self, backup_path)
+        util.show('Backing up to directory: %s' % backup_path)
 
-        version = util_file.VersionFile(backup_path)
+        # versions are kept in backup_path/.version, the same place the old temp_process_backup copy saved them
+        version = util_file.VersionFile(util_file.join_path(backup_path, 'temp_process_backup'))
+        version.set_source(self.get_path(), [self.backup_folder_name, self.checkpoint_folder_name, '.log', '.version'])
         version.save(comment)
 
-        util_file.delete_dir(backup_path)
-
     # --- data
 
     def is_data_folder(self, name, sub_folder=None):
@@ -1299,6 +2248,23 @@ class Process(object):
             None
         """
 
+        if not self._timing:
+            return self._import_data(name, sub_folder)
+
+        timing_entry = self._timing.start('data', name)
+
+        try:
+            value = self._import_data(name, sub_folder)
+        except Exception:
+            self._timing.end(timing_entry, 'fail')
+            raise
+
+        self._timing.end(timing_entry, 'Success')
+
+        return value
+
+    def _import_data(self, name, sub_folder=None):
+
         data_folder_name = self.get_data_folder(name)
 
         if not sub_folder:
@@ -1529,6 +2495,10 @@ class Process(object):
         util_file.delete_versions(folder, keep)
 
     def cache_data_type_read(self, name):
+        """
+        Keep data.json of the data folder in util_file.ReadCache.
+        The cache checks the file on each read, so there is no need to remove it after changes.
+        """
 
         data_folder = data.DataFolder(name, self.get_data_path())
 
@@ -1639,25 +2609,19 @@ class Process(object):
         return code_names
 
     def get_code_children(self, code_name):
-
-        found = []
+        """
+        Returns:
+            list: The scripts directly under the script group code_name, in manifest order.
+        """
 
         code_name = util_file.remove_extension(code_name)
 
-        scripts, states = self.get_manifest()
-
-        for script in scripts:
-            if script.find('/') == -1:
-                continue
-
-            if script.startswith(code_name + '/'):
-
-                sub_script = script[len(code_name + '/'):]
+        manifest = self.get_manifest_inst()
 
-                if not sub_script.find('/') > -1:
-                    found.append(script)
+        if not manifest:
+            return []
 
-        return found
+        return manifest.get_children(code_name)
 
     def get_code_type(self, name):
         """
@@ -1692,41 +2656,42 @@ class Process(object):
             If basename is True, only return the file names without the path.             
         """
 
-        directory = self.get_code_path()
+        with util_file.StatCache():
+            directory = self.get_code_path()
 
-        # folders = util_file.get_folders(directory)
+            # folders = util_file.get_folders(directory)
 
-        files = []
+            files = []
 
-        folders = self.get_code_folders()
+            folders = self.get_code_folders()
 
-        for folder in folders:
+            for folder in folders:
 
-            path = util_file.join_path(directory, folder)
-            code_file = util_file.join_path(path, (util_file.get_basename(folder) + '.py'))
+                path = util_file.join_path(directory, folder)
+                code_file = util_file.join_path(path, (util_file.get_basename(folder) + '.py'))
 
-            if util_file.is_file(code_file):
-                files.append(code_file)
-                continue
+                if util_file.is_file(code_file):
+                    files.append(code_file)
+                    continue
 
-            if fast_with_less_checking:
-                continue
+                if fast_with_less_checking:
+                    continue
 
-            data_folder = data.DataFolder(folder, directory)
-            data_instance = data_folder.get_folder_data_instance()
+                data_folder = data.DataFolder(folder, directory)
+                data_instance = data_folder.get_folder_data_instance()
 
-            if data_instance:
+                if data_instance:
 
-                file_path = data_instance.get_file()
+                    file_path = data_instance.get_file()
 
-                if not basename:
-                    files.append(file_path)
-                if basename:
-                    rel_file_path = util_file.remove_common_path_simple(directory, file_path)
-                    split_path = rel_file_path.split('/')
+                    if not basename:
+                        files.append(file_path)
+                    if basename:
+                        rel_file_path = util_file.remove_common_path_simple(directory, file_path)
+                        split_path = rel_file_path.split('/')
 
-                    code_path = '/'.join(split_path[:-1])
-                    files.append(code_path)
+                        code_path = '/'.join(split_path[:-1])
+                        files.append(code_path)
 
         return files
 
@@ -2076,6 +3041,7 @@ class Process(object):
             util.show('Creating option: %s with a value of: %s' % (name, show_value))
 
         self.option_settings.set(name, value)
+        self._clear_option_cache()
 
     def set_option(self, name, value, group=None):
         self._setup_options()
@@ -2086,6 +3052,7 @@ class Process(object):
             name = '%s' % name
 
         self.option_settings.set(name, value)
+        self._clear_option_cache()
 
     def get_unformatted_option(self, name, group=None):
         self._setup_options()
@@ -2119,6 +3086,7 @@ class Process(object):
         self.option_settings.settings_order.insert(index, name)
 
         self.option_settings._write()
+        self._clear_option_cache()
 
     def get_option(self, name, group=None):
         """
@@ -2151,7 +3119,11 @@ class Process(object):
                 else:
                     util.warning('Could not find option: %s' % name)
         else:
-            value = self._format_option_value(value, name)
+            key = name
+            if group:
+                key = '%s.%s' % (group, name)
+
+            value = self._option_store.get_formatted(key, self._format_option_value, name)
 
         log.info('Get option: name: %s group: %s with value: %s' % (name, group, value))
 
@@ -2167,27 +3139,20 @@ class Process(object):
 
         self._setup_options()
 
-        option_dict = self.option_settings.settings_dict
-
-        found = {}
+        keys = self._option_store.get_keys(name)
 
-        for key in option_dict:
-
-            split_key = key.split('.')
-            group = '.'.join(split_key[:-1])
+        if not keys:
+            return None
 
-            if split_key[-1] == name:
-                value = None
-                if return_first:
-                    value = self._format_option_value(option_dict[key], key)
-                    return value, group
+        if not return_first:
+            return {name: [None, '.'.join(keys[-1].split('.')[:-1])]}
 
-                found[name] = [value, group]
+        key = keys[0]
+        group = '.'.join(key.split('.')[:-1])
 
-        if not found:
-            found = None
+        value = self._option_store.get_formatted(key, self._format_option_value)
 
-        return found
+        return value, group
 
     def get_option_match(self, name, return_first=True):
         """
@@ -2196,24 +3161,15 @@ class Process(object):
 
         self._setup_options()
 
-        option_dict = self.option_settings.settings_dict
-
-        found = {}
-
-        for key in option_dict:
+        keys = self._option_store.get_keys(name)
 
-            split_key = key.split('.')
-            if split_key[-1] == name:
-                value = None
-                if return_first:
-                    value = self._format_option_value(option_dict[key], key)
-                    return value
-                found[name] = value
+        if not keys:
+            return None
 
-        if not found:
-            found = None
+        if not return_first:
+            return {name: None}
 
-        return found
+        return self._option_store.get_formatted(keys[0], self._format_option_value)
 
     def set_option_result_function(self, function_inst):
         """
@@ -2223,6 +3179,7 @@ class Process(object):
         """
 
         self._option_result_function = function_inst
+        self._clear_option_cache()
 
     def has_option(self, name, group=None):
 
@@ -2263,6 +3220,20 @@ class Process(object):
 
         if self.option_settings:
             self.option_settings.clear()
+        self._clear_option_cache()
+
+    def batch_options(self):
+        """
+        Write option changes once at the end, instead of on every add_option or set_option.
+
+        Usage:
+            with process_inst.batch_options():
+                process_inst.add_option('a', 1)
+                process_inst.add_option('b', 2)
+        """
+        self._setup_options()
+
+        return self.option_settings.batch()
 
     def save_default_option_history(self):
         option_file = self.get_option_file()
@@ -2285,47 +3256,31 @@ class Process(object):
 
     # --- manifest
 
-    def get_manifest(self, manifest_file=None):
+    def get_manifest_inst(self, manifest_file=None):
         """
         Returns:
-            tuple: (list, list) Two lists, scripts and states. 
-            The scripts list contains the name of scripts in the manifest. 
-            States contains the enabled/disabled state of the script. 
+            Manifest: The parsed manifest. It is shared until the file changes, so copy its lists before editing them.
         """
 
         if not manifest_file:
             manifest_file = self.get_manifest_file()
 
-        if not util_file.exists(manifest_file):
-            return None, None
-
-        lines = util_file.get_file_lines(manifest_file)
-
-        if not lines:
-            return None, None
-
-        scripts = []
-        states = []
-
-        for line in lines:
-
-            if not line:
-                continue
-
-            states.append(False)
+        return Manifest.load(manifest_file)
 
-            split_line = line.split()
-            if len(split_line):
-                script_name = ' '.join(split_line[:-1])
-
-                scripts.append(script_name)
+    def get_manifest(self, manifest_file=None):
+        """
+        Returns:
+            tuple: (list, list) Two lists, scripts and states. 
+            The scripts list contains the name of scripts in the manifest. 
+            States contains the enabled/disabled state of the script. 
+        """
 
-            if len(split_line) >= 2:
-                state = eval(split_line[-1])
+        manifest = self.get_manifest_inst(manifest_file)
 
-                states[-1] = state
+        if not manifest or not manifest.scripts:
+            return None, None
 
-        return scripts, states
+        return list(manifest.scripts), list(manifest.states)
 
     def get_manifest_dict(self, manifest_file=None):
         """
@@ -2333,39 +3288,12 @@ class Process(object):
             dict: name of code : state 
         """
 
-        if not manifest_file:
-            manifest_file = self.get_manifest_file()
-
-        manifest_dict = {}
-
-        if not util_file.is_file(manifest_file):
-            return manifest_dict
-
-        lines = util_file.get_file_lines(manifest_file)
-
-        if not lines:
-            return manifest_dict
-
-        for line in lines:
-
-            script_name = None
+        manifest = self.get_manifest_inst(manifest_file)
 
-            if not line:
-                continue
-
-            split_line = line.split()
-
-            if len(split_line):
-                script_name = ' '.join(split_line[:-1])
+        if not manifest:
+            return {}
 
-                manifest_dict[script_name] = False
-
-            if len(split_line) >= 2 and script_name:
-                state = eval(split_line[-1])
-
-                manifest_dict[script_name] = state
-
-        return manifest_dict
+        return manifest.get_states()
 
     def get_manifest_folder(self):
         """
@@ -2455,18 +3383,12 @@ class Process(object):
 
     def is_in_manifest(self, entry):
 
-        filename = self.get_manifest_file()
-
-        lines = util_file.get_file_lines(filename)
+        manifest = self.get_manifest_inst()
 
-        for line in lines:
-
-            split_line = line.split(' ')
-
-            if split_line[0] == entry:
-                return True
+        if not manifest:
+            return False
 
-        return False
+        return manifest.has_script(entry)
 
     def get_manifest_history(self):
 
@@ -2486,44 +3408,20 @@ class Process(object):
             append (bool): Whether to add the scripts to the end of the manifest or replace it.
         """
 
-        if states is None:
-            states = []
-        manifest_file = self.get_manifest_file()
-
-        lines = []
-
-        script_count = len(scripts)
-        if states:
-            state_count = len(states)
-        if not states:
-            state_count = 0
-
-        for inc in range(0, script_count):
-
-            if scripts[inc] == 'manifest.py':
-                continue
-
-            if inc > state_count - 1:
-                state = False
-
-            if inc < state_count:
-                state = states[inc]
-
-            line = '%s %s' % (scripts[inc], state)
-            lines.append(line)
-
-        util_file.write_lines(manifest_file, lines, append=append)
+        manifest = Manifest(self.get_manifest_file())
+        manifest.set(scripts, states)
+        manifest.write(append=append)
 
     def has_script(self, script_name):
         if not script_name.endswith('.py'):
             script_name = script_name + '.py'
 
-        scripts, states = self.get_manifest()
+        manifest = self.get_manifest_inst()
 
-        if script_name in scripts:
-            return True
+        if not manifest:
+            return False
 
-        return False
+        return manifest.has_script(script_name)
 
     def get_script_parent(self, script_name):
 
@@ -2603,31 +3501,25 @@ class Process(object):
         if not script_name.endswith('.py'):
             script_name = script_name + '.py'
 
-        scripts, states = self.get_manifest()
+        manifest = self.get_manifest_inst()
 
-        for script, state in zip(scripts, states):
+        if not manifest:
+            return
 
-            if script == script_name:
-                return state
+        return manifest.get_state(script_name)
 
     def set_script_state(self, script_name, bool_value):
         if not script_name.endswith('.py'):
             script_name = script_name + '.py'
 
-        scripts, states = self.get_manifest()
+        manifest = self.get_manifest_inst()
 
-        if not scripts:
+        if not manifest or not manifest.scripts:
             util.warning('Could not update state on %s, because it is not in the manifest' % script_name)
             return
 
-        for inc in range(0, len(scripts)):
-
-            script = scripts[inc]
-
-            if script == script_name:
-                states[inc] = bool_value
-
-        self.set_manifest(scripts, states)
+        manifest.set_state(script_name, bool_value)
+        manifest.write()
 
     def sync_manifest(self):
         """
@@ -2735,7 +3627,14 @@ class Process(object):
         Return
             (str): Path to the process.
         """
-        return self._create_folder()
+        path = self._create_folder()
+
+        if path:
+            scanner = get_process_tree_scanner()
+            scanner.invalidate(util_file.get_dirname(path), recursive=False)
+            scanner.invalidate(path)
+
+        return path
 
     def delete(self):
         """
@@ -2753,6 +3652,13 @@ class Process(object):
 
             util_file.delete_dir(basename, dirname)
 
+        path = self.get_path()
+
+        if path:
+            scanner = get_process_tree_scanner()
+            scanner.invalidate(util_file.get_dirname(path), recursive=False)
+            scanner.invalidate(path)
+
     def rename(self, new_name):
         """
         Rename the process.
@@ -2766,7 +3672,13 @@ class Process(object):
 
         split_name = new_name.split('/')
 
-        if util_file.rename(self.get_path(), split_name[-1]):
+        path = self.get_path()
+
+        if util_file.rename(path, split_name[-1]):
+            scanner = get_process_tree_scanner()
+            scanner.invalidate(util_file.get_dirname(path), recursive=False)
+            scanner.invalidate(path)
+
             self.load(new_name)
             return True
 
@@ -2822,10 +3734,7 @@ class Process(object):
 
             name = util_file.get_basename(script)
 
-            for external_code_path in self.external_code_paths:
-                if util_file.is_dir(external_code_path):
-                    if external_code_path not in sys.path:
-                        sys.path.append(external_code_path)
+            self._add_external_code_paths()
 
             util.show('\n________________________________________________')
             message = 'START\t%s\n' % name
@@ -2920,10 +3829,7 @@ class Process(object):
 
         try:
 
-            for external_code_path in self.external_code_paths:
-                if util_file.is_dir(external_code_path):
-                    if external_code_path not in sys.path:
-                        sys.path.append(external_code_path)
+            self._add_external_code_paths()
 
             pass_process = self
             if self._data_override:
@@ -2953,6 +3859,23 @@ class Process(object):
         This runs the script and all of its children/grandchildren.
         """
 
+        if not self._timing:
+            return self._run_script_group(script, clear_selection, hard_error)
+
+        timing_entry = self._timing.start('group', script)
+
+        try:
+            status_list = self._run_script_group(script, clear_selection, hard_error)
+        except Exception:
+            self._timing.end(timing_entry, 'fail')
+            raise
+
+        self._timing.end(timing_entry, 'Success')
+
+        return status_list
+
+    def _run_script_group(self, script, clear_selection=True, hard_error=True):
+
         status_list = []
         scripts_that_error = []
         skip_children = False
@@ -3111,10 +4034,223 @@ class Process(object):
 
         return childs
 
-    def run(self, start_new=False):
+    def get_checkpoint_path(self):
+        """
+        Returns:
+            str: The path to the folder build checkpoints are saved in.
+        """
+        return self._get_path(self.checkpoint_folder_name)
+
+    def set_checkpoint_scripts(self, scripts):
+        """
+        Turn on checkpoints for run().
+        After each of these top level scripts and their children run, the scene, put and runtime values are saved.
+        The next run starts from the latest checkpoint that is still valid.
+
+        Args:
+            scripts (list): Top level script names, like ['skeleton.py']. An empty list turns checkpoints off.
+        """
+        self.set_setting('checkpoint scripts', list(scripts))
+
+    def get_checkpoint_scripts(self):
+        scripts = self.get_setting('checkpoint scripts')
+
+        if not scripts:
+            return []
+
+        return scripts
+
+    def set_checkpoint_scene(self, scene_inst):
+        """
+        Args:
+            scene_inst (CheckpointScene): What saves and restores the scene. By default MayaCheckpointScene in Maya, otherwise CheckpointScene.
+        """
+        self._checkpoint_scene = scene_inst
+
+    def _get_checkpoint_scene(self):
+        if self._checkpoint_scene:
+            return self._checkpoint_scene
+
+        if in_maya:
+            return MayaCheckpointScene()
+
+        return CheckpointScene()
+
+    def clear_checkpoints(self):
+        path = self.get_checkpoint_path()
+
+        if util_file.is_dir(path):
+            util_file.delete_dir(path)
+
+    def _get_checkpoint_folder(self, script):
+        return util_file.join_path(self.get_checkpoint_path(), util_file.remove_extension(script))
+
+    def _get_build_hashes(self, plan):
+        """
+        Returns:
+            list: For each step in plan, a hash of the options, the data folder and every script up to and including that step.
+        """
+
+        hash_inst = hashlib.sha1()
+
+        option_file = util_file.join_path(self._get_override_path(), 'options.json')
+        if util_file.is_file(option_file):
+            hash_inst.update(util_file.get_file_hash(option_file).encode())
+
+        data_path = self.get_data_path(in_folder=False)
+        if data_path and util_file.is_dir(data_path):
+            for dirpath, dirnames, filenames in os.walk(data_path):
+                dirnames[:] = sorted(name for name in dirnames if name != '.version')
+                for filename in sorted(filenames):
+                    try:
+                        stat = os.stat(os.path.join(dirpath, filename))
+                    except OSError:
+                        continue
+                    relative = os.path.relpath(os.path.join(dirpath, filename), data_path)
+                    hash_inst.update(('%s %s %s\n' % (relative, stat.st_size, stat.st_mtime)).encode())
+
+        hashes = []
+
+        for step in plan.steps:
+            hash_inst.update(('%s %s\n' % (step.script, step.enabled)).encode())
+
+            code_file = self._get_code_file(step.name)
+            if step.enabled and code_file and util_file.is_file(code_file):
+                hash_inst.update(util_file.get_file_hash(code_file).encode())
+
+            hashes.append(hash_inst.hexdigest())
+
+        return hashes
+
+    def _get_runtime_state(self):
+        put = self._put
+        if self._data_override:
+            put = self._data_override._put
+
+        put_values = {}
+        if put is not None:
+            for key, value in put.__dict__.items():
+                if key != '_cache_feedback':
+                    put_values[key] = value
+
+        state = {'put': put_values, 'runtime_values': self.runtime_values or {}}
+
+        try:
+            json.dumps(state)
+        except (TypeError, ValueError):
+            return
+
+        return state
+
+    def _save_checkpoint(self, step, last_index, build_hash):
+
+        state = self._get_runtime_state()
+
+        if state is None:
+            util.warning('Could not save checkpoint after %s. Put and runtime values need to be json types.' % step.script)
+            return
+
+        folder = self._get_checkpoint_folder(step.script)
+        util_file.create_dir(folder)
+
+        filepath = util_file.join_path(folder, 'checkpoint.json')
+        if util_file.is_file(filepath):
+            os.remove(filepath)
+
+        if not self._get_checkpoint_scene().save(folder):
+            util.warning('Could not save checkpoint scene after %s' % step.script)
+            return
+
+        checkpoint = {'script': step.script,
+                      'last_index': last_index,
+                      'hash': build_hash,
+                      'time': time.time()}
+        checkpoint.update(state)
+
+        util_file.set_json(filepath, checkpoint, atomic=True)
+
+        util.show('Saved checkpoint after %s' % step.script)
+
+    def _load_checkpoint(self, plan, build_hashes, checkpoint_scripts):
+        """
+        Restore the latest checkpoint whose upstream scripts, data and options have not changed.
+
+        Returns:
+            int: The index of the last step the checkpoint covers, or -1 if none was restored.
+        """
+
+        scene = self._get_checkpoint_scene()
+
+        for step in reversed(plan.roots):
+
+            if step.script not in checkpoint_scripts:
+                continue
+
+            folder = self._get_checkpoint_folder(step.script)
+            filepath = util_file.join_path(folder, 'checkpoint.json')
+
+            if not util_file.is_file(filepath):
+                continue
+
+            checkpoint = util_file.get_json(filepath)
+
+            if not checkpoint:
+                continue
+
+            last_index = checkpoint.get('last_index', -1)
+
+            if last_index < 0 or last_index >= len(build_hashes):
+                continue
+
+            if build_hashes[last_index] != checkpoint.get('hash'):
+                util.show('Checkpoint after %s is out of date' % step.script)
+                continue
+
+            if not scene.exists(folder) or not scene.load(folder):
+                continue
+
+            self.reset_runtime()
+
+            put = self._put
+            if self._data_override:
+                put = self._data_override._put
+
+            for key, value in checkpoint.get('put', {}).items():
+                put[key] = value
+
+            self.runtime_values = checkpoint.get('runtime_values', {})
+
+            util.show('Resuming from checkpoint after %s' % step.script)
+
+            return last_index
+
+        return -1
+
+    def get_build_plan(self):
+        """
+        Get the plan run() will follow, without running anything.
+        Use get_status_list or get_text on it for a dry run.
+
+        Returns:
+            BuildPlan
+        """
+
+        manifest = self.get_manifest_inst()
+
+        if not manifest:
+            return
+
+        return manifest.get_build_plan()
+
+    def run(self, start_new=False, resume=True):
         """
         Run all the scripts in the manifest, respecting their on/off state.
+        If checkpoint scripts are set, checkpoints are saved while building, and the build starts from the latest valid one.
         
+        Args:
+            start_new (bool): Start a new scene first.
+            resume (bool): Start from a checkpoint if one is valid. Only used when checkpoint scripts are set.
+
         Returns:
             None
         """
@@ -3157,57 +4293,68 @@ class Process(object):
         util.show('Settings path: %s' % self.get_settings_file())
         util.show('Runtime values: %s\n\n' % self.runtime_values)
 
-        scripts, states = self.get_manifest()
-        if not scripts:
+        plan = self.get_build_plan()
+        if not plan or not plan.steps:
             util.show('No scripts!')
             return
 
-        scripts_that_error = []
+        self._timing = util.TimingRecorder()
 
-        state_dict = {}
+        scripts_that_error = []
 
         progress_bar = None
 
         if in_maya:
-            progress_bar = core.ProgressBar('Process', len(scripts))
+            progress_bar = core.ProgressBar('Process', len(plan.steps))
             progress_bar.status('Processing: getting ready...')
 
         status_list = []
-        skip_children = None
+        skipped_names = set()
 
-        for inc in range(0, len(scripts)):
+        checkpoint_scripts = self.get_checkpoint_scripts()
+        checkpoint_step = None
+        build_hashes = None
+        resume_index = -1
+        cancelled = False
 
-            state = states[inc]
-            script = scripts[inc]
+        if checkpoint_scripts:
+            build_hashes = self._get_build_hashes(plan)
+            if resume:
+                resume_index = self._load_checkpoint(plan, build_hashes, checkpoint_scripts)
+
+        for step in plan.steps:
+
+            script = step.script
+            state = step.state
             status = 'Skipped'
 
-            check_script = util_file.remove_extension(script)
+            if step.index <= resume_index:
+                status_list.append([script, 'Checkpoint'])
+                if progress_bar:
+                    progress_bar.inc()
+                continue
+
+            if not step.parent and checkpoint_scripts:
+                if checkpoint_step and not scripts_that_error:
+                    self._save_checkpoint(checkpoint_step, step.index - 1, build_hashes[step.index - 1])
 
-            if skip_children:
-                if script.startswith(skip_children):
-                    state = False
+                checkpoint_step = None
+                if script in checkpoint_scripts:
+                    checkpoint_step = step
 
-            state_dict[check_script] = state
+            if state and plan.is_skipped(step, skipped_names):
+                state = False
 
             if progress_bar:
                 progress_bar.status('Processing: %s' % script)
 
                 if progress_bar.break_signaled():
+                    cancelled = True
                     break
 
             if state:
 
-                parent_state = True
-
-                for key in state_dict:
-
-                    if script.find(key) > -1:
-                        parent_state = state_dict[key]
-
-                        if parent_state == False:
-                            break
-
-                if not parent_state:
+                if not step.enabled:
                     util.show('\tSkipping: %s\n\n' % script)
                     if progress_bar:
                         progress_bar.inc()
@@ -3220,7 +4367,7 @@ class Process(object):
                 try:
                     status = self.run_script(script, hard_error=False, return_status=True)
                     if self._skip_children:
-                        skip_children = check_script
+                        skipped_names.add(step.name)
                         self._skip_children = None
                 except Exception:
                     error = traceback.format_exc()
@@ -3231,7 +4378,7 @@ class Process(object):
                 if not status == 'Success':
                     scripts_that_error.append(script)
 
-            if not states[inc]:
+            if not step.state:
                 util.show('\n------------------------------------------------')
                 util.show('Skipping: %s\n\n' % script)
 
@@ -3240,6 +4387,9 @@ class Process(object):
 
             status_list.append([script, status])
 
+        if checkpoint_step and not scripts_that_error and not cancelled:
+            self._save_checkpoint(checkpoint_step, len(plan.steps) - 1, build_hashes[-1])
+
         minutes, seconds = watch.stop()
 
         if progress_bar:
@@ -3261,6 +4411,10 @@ class Process(object):
             util.show('%s : %s' % (status_entry[1], status_entry[0]))
         util.show('\n\n')
 
+        record = self._timing.get_record(user=util_file.get_user(), errors=scripts_that_error, cancelled=cancelled)
+        self._timing = None
+        self._save_build_timing(record)
+
         util.set_env('VETALA_CURRENT_PROCESS', prev_process)
 
         if manage_node_editor_inst:
@@ -3268,6 +4422,28 @@ class Process(object):
 
         return status_list
 
+    def get_build_timing_log(self):
+        """
+        Returns:
+            BuildTimingLog: The timing records of earlier builds, kept in the process .log folder.
+        """
+        return util_file.BuildTimingLog(self.get_path())
+
+    def _save_build_timing(self, record):
+
+        timing_log = self.get_build_timing_log()
+
+        try:
+            timing_log.add(record)
+        except Exception:
+            util.warning('Could not save build timing in %s' % timing_log.filepath)
+            return
+
+        report = timing_log.get_report(record)
+
+        if report:
+            util.show('Slower than recent builds:\n%s\n\n' % report)
+
     def set_runtime_value(self, name, value):
         """
         This stores data to run between scripts.
@@ -3418,6 +4594,44 @@ class Put(dict):
         return list(self.attribute_names.keys())
 
 
+class CheckpointScene(object):
+    """
+    Saves and restores the scene for a build checkpoint.
+    This is the stand-in used outside of Maya. There is no scene, so a checkpoint only holds put and runtime values.
+    """
+
+    def exists(self, directory):
+        return True
+
+    def save(self, directory):
+        return True
+
+    def load(self, directory):
+        return True
+
+
+class MayaCheckpointScene(CheckpointScene):
+    """
+    Saves the scene for a build checkpoint with MayaBinaryFileData, without versioning it.
+    """
+
+    def _get_data_inst(self, directory):
+        data_folder = data.DataFolder('scene', directory)
+        data_folder.set_data_type('maya.binary')
+
+        return data_folder.get_folder_data_instance()
+
+    def exists(self, directory):
+        return util_file.is_file(util_file.join_path(directory, 'scene/scene.mb'))
+
+    def save(self, directory):
+        return self._get_data_inst(directory).save('Build checkpoint', version=False)
+
+    def load(self, directory):
+        self._get_data_inst(directory).open()
+        return True
+
+
 def get_default_directory():
     """
     Get a default directory to begin in.  
@@ -3460,17 +4674,24 @@ def copy(source_file_or_folder, target_file_or_folder, description=''):
         version.save('Copied from %s' % source_file_or_folder)
 
 
-def copy_process(source_process, target_directory=None):
+def copy_process(source_process, target_directory=None, exclude_history=True, link=None, progress_function=None):
     """
     source process is an instance of a process that you want to copy 
     target_process is the instance of a process you want to copy to. 
     If no target_process is specified, the target process will be set to the directory where the source process is located automatically. 
     If there is already a process named the same in the target process, the name will be incremented. 
     If you need to give the copy a specific name, you should rename it after copy. 
+    The process folder, including sub processes, is copied with util_file.CopyEngine. Backups, logs and checkpoints are not copied.
     
     Args:
         source_process (instance): The instance of a process.
-        target_directory (str): TODO: Fill description.
+        target_directory (str): The directory to copy the process into.
+        exclude_history (bool): Skip .version folders, so the copy starts without version history.
+        link (str): 'hardlink' or 'reflink'. See util_file.CopyEngine.
+        progress_function: Called as function(done, total, filepath) after each file.
+
+    Returns:
+        Process: The new process. None if the copy was cancelled or failed, in which case the partial copy is removed.
     """
 
     if target_directory:
@@ -3481,8 +4702,6 @@ def copy_process(source_process, target_directory=None):
                 util.error('Cannot paste parent under child.  Causes recursion error')
                 return
 
-    sub_folders = source_process.get_sub_processes()
-
     source_name = source_process.get_name()
     source_name = source_name.split('/')[-1]
 
@@ -3495,69 +4714,56 @@ def copy_process(source_process, target_directory=None):
 
     new_name = get_unused_process_name(target_directory, source_name)
 
-    new_process = Process()
-    new_process.set_directory(target_directory)
-    new_process.load(new_name)
-    new_process.create()
-
-    data_folders = source_process.get_data_folders()
-    code_folders = source_process.get_code_folders()
-    settings = source_process.get_setting_names()
-    ramens = source_process.get_ramen_graphs()
-
-    progress = core.ProgressBar()
+    exclude = [Process.backup_folder_name, Process.checkpoint_folder_name, '.log']
+    if exclude_history:
+        exclude.append('.version')
 
-    data_count = len(data_folders)
+    engine = util_file.CopyEngine(link=link, exclude=exclude)
 
-    if data_count:
-        progress.set_count(len(data_folders))
+    progress = None
+    if in_maya:
+        progress = core.ProgressBar('Copying %s' % source_name)
 
-        for data_folder in data_folders:
-            progress.status('Copying Data: %s' % data_folder)
+    def update_progress(done, total, filepath):
+        if progress:
+            if done == 1:
+                progress.set_count(total)
+            progress.status('Copying: %s' % util_file.get_basename(filepath))
             progress.inc()
-            copy_process_data(source_process, new_process, data_folder)
             if progress.break_signaled():
-                progress.end()
-                return
+                engine.cancel()
 
-    manifest_found = False
-
-    if code_folders:
-        if 'manifest' in code_folders:
-            code_folders.remove('manifest')
-            manifest_found = True
-
-        code_count = len(code_folders)
-        if code_count:
-            progress.set_count(len(code_folders))
-            progress.inc(0)
-
-            for code_folder in code_folders:
-                progress.status('Copying Code: %s' % code_folder)
-                progress.inc()
-                copy_process_code(source_process, new_process, code_folder)
-                if progress.break_signaled():
-                    progress.end()
-                    return
-
-    progress.end()
+        if progress_function:
+            progress_function(done, total, filepath)
 
-    for sub_folder in sub_folders:
+    engine.set_progress_function(update_progress)
 
-        sub_process = new_process.get_sub_process(sub_folder)
-        source_sub_process = source_process.get_sub_process(sub_folder)
+    new_path = util_file.join_path(target_directory, new_name)
 
-        if not sub_process.is_process():
-            copy_process(source_sub_process, new_process.get_path())
+    try:
+        engine.copy(source_process.get_path(), new_path)
+    except Exception:
+        util.error(traceback.format_exc())
+        util.warning('Could not copy %s to %s' % (source_process.get_path(), new_path))
+        engine.cancel()
+    finally:
+        if progress:
+            progress.end()
+
+    if engine.is_cancelled():
+        util.show('Copy cancelled. Removing %s' % new_path)
+        util_file.delete_dir(new_path)
+        return
 
-    if manifest_found:
-        copy_process_code(source_process, new_process, 'manifest')
+    util.show('Copied %s files and linked %s files from %s to %s' % (engine.copied, engine.linked,
+                                                                    source_process.get_path(), new_path))
 
-    for setting in settings:
-        copy_process_setting(source_process, new_process, setting)
+    new_process = Process()
+    new_process.set_directory(target_directory)
+    new_process.load(new_name)
 
-    for ramen in ramens:
-        copy_process_ramen(source_process, new_process, ramen)
+    if not new_process.is_process():
+        new_process.create()
 
     return new_process
 
@@ -4043,3 +5249,185 @@ def run_deadline(process_directory, name, parent_jobs=None, batch_name=None):
     job_id = job.submit()
 
     return job_id
+
+
+class LocalBatchRunner(object):
+    """
+    Builds many processes on this machine, each in its own interpreter, a few at a time.
+    Each build writes its output to a log in the process .log folder.
+
+    Args:
+        interpreter (str): The python to build with. By default mayapy where it can be found, otherwise the current python.
+        max_jobs (int): How many builds run at once. By default half the cpus, up to default_max_jobs.
+            Each build is a full Maya session, so memory and licences run out long before cpus do.
+        timeout (float): Seconds before a build is stopped. None means no limit.
+        save (bool): Save the build data after each build. Only happens when the build runs in Maya.
+    """
+
+    poll_seconds = 0.1
+    default_max_jobs = 4
+
+    def __init__(self, interpreter=None, max_jobs=None, timeout=None, save=True):
+
+        if not interpreter:
+            interpreter = util_file.get_mayapy()
+            if interpreter and not util_file.is_file(interpreter):
+                interpreter = None
+        if not interpreter:
+            interpreter = sys.executable
+
+        self.interpreter = interpreter
+        self.max_jobs = max_jobs or self._get_default_max_jobs()
+        self.timeout = timeout
+        self.save = save
+
+        self._status_function = None
+
+    def _get_default_max_jobs(self):
+        cpu_count = 1
+        try:
+            import multiprocessing
+            cpu_count = multiprocessing.cpu_count()
+        except:
+            pass
+
+        return max(1, min(self.default_max_jobs, cpu_count // 2))
+
+    def set_status_function(self, function):
+        """
+        Args:
+            function: Called with the job dict whenever a build starts or finishes.
+        """
+        self._status_function = function
+
+    def _set_status(self, job, status):
+        job['status'] = status
+
+        message = '%s: %s' % (status, job['path'])
+        if job.get('seconds') is not None:
+            message += '  (%s seconds)' % round(job['seconds'], 2)
+        util.show(message)
+
+        if self._status_function:
+            self._status_function(job)
+
+    def _start(self, job):
+
+        log_folder = util_file.create_dir('.log', job['path'])
+        job['log'] = util_file.join_path(log_folder, 'local_batch.txt')
+        job['result_file'] = util_file.join_path(log_folder, 'local_batch.json')
+
+        if util_file.is_file(job['result_file']):
+            os.remove(job['result_file'])
+
+        command = [self.interpreter, util_file.join_path(os.path.dirname(__file__), 'batch_local.py'),
+                   job['path'], job['result_file']]
+
+        if not self.save:
+            command.append('--no-save')
+
+        job['_log_file'] = open(job['log'], 'w')
+        job['_popen'] = subprocess.Popen(command, stdout=job['_log_file'], stderr=subprocess.STDOUT)
+        job['_start'] = time.time()
+
+        self._set_status(job, 'running')
+
+    def _finish(self, job, status):
+        job['seconds'] = time.time() - job.pop('_start')
+        job['returncode'] = job.pop('_popen').returncode
+        job.pop('_log_file').close()
+
+        result_file = job.pop('result_file')
+        if util_file.is_file(result_file):
+            result = util_file.get_json(result_file) or {}
+            job['errors'] = result.get('errors', [])
+            job['status_list'] = result.get('status_list', [])
+
+        self._set_status(job, status)
+
+    def run(self, process_paths):
+        """
+        Args:
+            process_paths (list): Paths of the processes to build.
+
+        Returns:
+            dict: The report, with counts of passed, failed and timed out builds, the total seconds, and a dict per job.
+        """
+
+        jobs = [{'path': path, 'status': 'waiting', 'seconds': None, 'returncode': None,
+                 'errors': [], 'status_list': []} for path in process_paths]
+
+        waiting = list(jobs)
+        running = []
+
+        start = time.time()
+
+        while waiting or running:
+
+            while waiting and len(running) < self.max_jobs:
+                job = waiting.pop(0)
+                try:
+                    self._start(job)
+                except Exception:
+                    job['errors'] = [traceback.format_exc()]
+                    self._set_status(job, 'fail')
+                    continue
+                running.append(job)
+
+            time.sleep(self.poll_seconds)
+
+            for job in list(running):
+                popen = job['_popen']
+
+                if popen.poll() is not None:
+                    running.remove(job)
+                    status = 'pass'
+                    if popen.returncode != 0:
+                        status = 'fail'
+                    self._finish(job, status)
+                    continue
+
+                if self.timeout and time.time() - job['_start'] > self.timeout:
+                    popen.kill()
+                    popen.wait()
+                    running.remove(job)
+                    self._finish(job, 'timeout')
+
+        report = {'passed': len([job for job in jobs if job['status'] == 'pass']),
+                  'failed': len([job for job in jobs if job['status'] == 'fail']),
+                  'timed_out': len([job for job in jobs if job['status'] == 'timeout']),
+                  'seconds': time.time() - start,
+                  'jobs': jobs}
+
+        return report
+
+    def get_report_text(self, report):
+        lines = ['Passed: %s   Failed: %s   Timed out: %s   Total: %s seconds' % (
+            report['passed'], report['failed'], report['timed_out'], round(report['seconds'], 2))]
+
+        for job in sorted(report['jobs'], key=lambda job: job['seconds'] or 0, reverse=True):
+            seconds = job['seconds']
+            if seconds is not None:
+                seconds = round(seconds, 2)
+            lines.append('%s\t%s\t%s' % (job['status'], seconds, job['path']))
+
+            for error in job['errors']:
+                lines.append('\t\terror: %s' % error.strip().split('\n')[-1])
+
+        return '\n'.join(lines)
+
+
+def run_local_batch(process_paths, max_jobs=None, timeout=None, interpreter=None):
+    """
+    Build the processes on this machine with LocalBatchRunner and show the report.
+
+    Returns:
+        dict: The report from LocalBatchRunner.run
+    """
+
+    runner = LocalBatchRunner(interpreter, max_jobs, timeout)
+    report = runner.run(process_paths)
+
+    util.show('\n' + runner.get_report_text(report) + '\n')
+
+    return report
@@ -2009,7 +2009,8 @@ class CodeManifestTree(qt_ui.FileTreeWidget):
 
         self.allow_manifest_update = False
         if not scripts_and_states:
-            super(CodeManifestTree, self).refresh()
+            with util_file.StatCache():
+                super(CodeManifestTree, self).refresh()
 
         if scripts_and_states:
             self._custom_refresh(scripts_and_states[0], scripts_and_states[1])
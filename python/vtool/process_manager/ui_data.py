@@ -266,8 +266,6 @@ class DataProcessWidget(qt_ui.DirectoryWidget):
                     status = traceback.format_exc()
                     util.error(status)
 
-                process_tool.delete_cache_data_type_read(item_name)
-
         if not item:
             if not self.data_widget.file_widget:
                 return
@@ -510,6 +508,7 @@ class SubFolders(qt_ui.AddRemoveDirectoryList):
 class DataTreeWidget(qt_ui.FileTreeWidget):
     active_folder_changed = qt_ui.create_signal(object)
     data_added = qt_ui.create_signal(object, object)
+    directory_events = qt_ui.create_signal(object)
 
     def __init__(self):
         super(DataTreeWidget, self).__init__()
@@ -527,6 +526,9 @@ class DataTreeWidget(qt_ui.FileTreeWidget):
         self.text_edit = False
 
         self.directory = None
+        self._watch_directories = set()
+        self._watch_refresh = False
+        self.directory_events.connect(self._directory_events)
 
         self.setColumnWidth(0, 150)
         self.setColumnWidth(1, 100)
@@ -976,7 +978,70 @@ class DataTreeWidget(qt_ui.FileTreeWidget):
         return path
 
     def refresh(self):
-        self._load_data()
+        with util_file.StatCache():
+            self._load_data()
+
+    def set_directory(self, directory, refresh=True, sub_path=None, name_filter=None):
+        super(DataTreeWidget, self).set_directory(directory, refresh, sub_path, name_filter)
+
+        self._watch(directory)
+
+    def _publish_directory_events(self, events):
+        # called on the watch thread. The signal passes the events to the ui thread.
+        try:
+            self.directory_events.emit(events)
+        except RuntimeError:
+            util_file.get_directory_watcher().remove_callback(self._publish_directory_events)
+
+    def _watch(self, directory):
+        # only the process folder and its data folder are watched, not everything under them.
+
+        watcher = util_file.get_directory_watcher()
+
+        folders = []
+        if directory:
+            folders = [directory, util_file.join_path(directory, process.Process.data_folder_name)]
+
+        for watched in list(self._watch_directories):
+            if watched not in folders:
+                watcher.unwatch(watched, recursive=False)
+                self._watch_directories.discard(watched)
+
+        if not directory:
+            return
+
+        watcher.add_callback(self._publish_directory_events)
+
+        for folder in folders:
+            if folder not in self._watch_directories and watcher.watch(folder, recursive=False):
+                self._watch_directories.add(folder)
+
+    def _directory_events(self, events):
+
+        if not self.directory:
+            return
+
+        data_path = util_file.join_path(self.directory, process.Process.data_folder_name)
+
+        for event in events:
+            if event.kind == 'modify' or not event.is_dir:
+                continue
+
+            if event.kind == 'rescan' or event.path == data_path or util_file.get_dirname(event.path) == data_path:
+                self._watch_refresh = True
+
+        if self._watch_refresh:
+            # changes come in bursts. Update once they settle.
+            qt.QtCore.QTimer.singleShot(300, self._refresh_from_watch)
+
+    def _refresh_from_watch(self):
+        if not self._watch_refresh:
+            return
+
+        self._watch_refresh = False
+        # the data folder may be new.
+        self._watch(self.directory)
+        self.refresh()
 
 
 class DataSizeThread(qt.QtCore.QThread):
@@ -2190,6 +2255,8 @@ class SaveSkinFileWidget(DataSaveFileWidget):
 
         version_up = qt.QCheckBox('Version Up on Export')
         single_file = qt.QCheckBox('Single File')
+        binary_file = qt.QCheckBox('Binary File')
+        incremental = qt.QCheckBox('Only Export Changed Meshes')
         blend_weights = qt.QCheckBox('Dual Quaternion Blend Weights')
         long_names = qt.QCheckBox('Force Long Mesh Names')
 
@@ -2198,6 +2265,8 @@ class SaveSkinFileWidget(DataSaveFileWidget):
         sub_layout1.addWidget(blend_weights)
         sub_layout1.addWidget(version_up)
         sub_layout1.addWidget(single_file)
+        sub_layout1.addWidget(binary_file)
+        sub_layout1.addWidget(incremental)
         sub_layout1.addWidget(long_names)
         sub_layout1.addStretch(1)
 
@@ -2216,6 +2285,8 @@ class SaveSkinFileWidget(DataSaveFileWidget):
 
         self.version_up = version_up
         self.single_file = single_file
+        self.binary_file = binary_file
+        self.incremental = incremental
         self.blend_weights = blend_weights
         self.long_names = long_names
 
@@ -2225,12 +2296,16 @@ class SaveSkinFileWidget(DataSaveFileWidget):
         blend_weights.stateChanged.connect(self._set_blend_weights)
         version_up.stateChanged.connect(self._set_version_up)
         single_file.stateChanged.connect(self._set_single_file)
+        binary_file.stateChanged.connect(self._set_binary_file)
+        incremental.stateChanged.connect(self._set_incremental)
         long_names.stateChanged.connect(self._set_long_names)
 
     def _export_data(self):
 
         version_up = True
         single_file = False
+        binary_file = False
+        incremental = False
         blend_weights = False
         long_names = False
 
@@ -2240,6 +2315,12 @@ class SaveSkinFileWidget(DataSaveFileWidget):
         if self.data_class.settings.has_setting('single file'):
             single_file = self.data_class.settings.get('single file')
 
+        if self.data_class.settings.has_setting('binary file'):
+            binary_file = self.data_class.settings.get('binary file')
+
+        if self.data_class.settings.has_setting('incremental'):
+            incremental = self.data_class.settings.get('incremental')
+
         if self.data_class.settings.has_setting('blend weights'):
             blend_weights = self.data_class.settings.get('blend weights')
 
@@ -2254,12 +2335,15 @@ class SaveSkinFileWidget(DataSaveFileWidget):
                 return
 
         self.data_class.export_data(comment, single_file=single_file, version_up=version_up,
-                                    blend_weights=blend_weights, long_names=long_names)
+                                    blend_weights=blend_weights, long_names=long_names, binary_file=binary_file,
+                                    incremental=incremental)
         self.file_changed.emit()
 
     def _export_selected_data(self, second_only=False):
         version_up = True
         single_file = False
+        binary_file = False
+        incremental = False
         blend_weights = True
         long_names = False
 
@@ -2269,6 +2353,12 @@ class SaveSkinFileWidget(DataSaveFileWidget):
         if self.data_class.settings.has_setting('single file'):
             single_file = self.data_class.settings.get('single file')
 
+        if self.data_class.settings.has_setting('binary file'):
+            binary_file = self.data_class.settings.get('binary file')
+
+        if self.data_class.settings.has_setting('incremental'):
+            incremental = self.data_class.settings.get('incremental')
+
         if self.data_class.settings.has_setting('blend weights'):
             blend_weights = self.data_class.settings.get('blend weights')
 
@@ -2292,6 +2382,8 @@ class SaveSkinFileWidget(DataSaveFileWidget):
         self.data_class.export_data(comment,
                                     selection=selection,
                                     single_file=single_file,
+                                    binary_file=binary_file,
+                                    incremental=incremental,
                                     version_up=version_up,
                                     blend_weights=blend_weights,
                                     long_names=long_names,
@@ -2347,6 +2439,15 @@ class SaveSkinFileWidget(DataSaveFileWidget):
         if single_file_state:
             self.single_file.setChecked(True)
 
+        binary_file_state = self.data_class.settings.get('binary file')
+
+        if binary_file_state:
+            self.binary_file.setChecked(True)
+
+        incremental_state = self.data_class.settings.get('incremental')
+        if incremental_state:
+            self.incremental.setChecked(True)
+
         blend_weight_state = self.data_class.settings.get('blend weights')
 
         # need to check if it exists. Otherwise, it comes in false and sets the checkbox false.
@@ -2383,6 +2484,24 @@ class SaveSkinFileWidget(DataSaveFileWidget):
         else:
             self.data_class.set_single_file(False)
 
+    def _set_binary_file(self):
+
+        state = self.binary_file.checkState()
+
+        if state == qt.QtCore.Qt.Checked:
+            self.data_class.set_binary_file(True)
+        else:
+            self.data_class.set_binary_file(False)
+
+    def _set_incremental(self):
+
+        state = self.incremental.checkState()
+
+        if state == qt.QtCore.Qt.Checked:
+            self.data_class.set_incremental(True)
+        else:
+            self.data_class.set_incremental(False)
+
     def _set_long_names(self):
         state = self.long_names.checkState()
 
@@ -1717,7 +1717,12 @@ class ProcessManagerWindow(qt_ui.BasicWindow):
         if not notes_path:
             return
 
-        util_file.write_replace(notes_path, self.notes.toHtml())
+        try:
+            util_file.write_replace(notes_path, self.notes.toHtml())
+        except (IOError, OSError):
+            util.warning('Could not save notes: %s' % notes_path)
+            return
+
         self.process.set_setting('notes', '')
 
     def set_directory(self, directory=None):
@@ -295,11 +295,14 @@ class ProcessTreeWidget(qt_ui.FileTreeWidget):
     show_settings = qt_ui.create_signal()
     show_maintenance = qt_ui.create_signal()
     selection_changed = qt_ui.create_signal()
+    directory_events = qt_ui.create_signal(object)
 
     def __init__(self, checkable=True):
 
         self.sub_path = None
         self.project_dir = None
+        self._watch_directories = set()
+        self._watch_paths = set()
         self.drag_parent = None
         self.progress_bar = None
         self.top_is_process = False
@@ -344,6 +347,7 @@ class ProcessTreeWidget(qt_ui.FileTreeWidget):
         self.current_folder = None
 
         self.itemSelectionChanged.connect(self._selection_changed)
+        self.directory_events.connect(self._directory_events)
 
         self.disable_right_click = False
 
@@ -1038,6 +1042,107 @@ class ProcessTreeWidget(qt_ui.FileTreeWidget):
         value = process.get_project_setting(name, self.project_dir, settings_inst)
         return value
 
+    def _publish_directory_events(self, events):
+        # called on the watch thread. The signal passes the events to the ui thread.
+        try:
+            self.directory_events.emit(events)
+        except RuntimeError:
+            util_file.get_directory_watcher().remove_callback(self._publish_directory_events)
+
+    def _watch(self, directory):
+        # only the top level and expanded items are watched. Watching the whole project is a full scan on every poll.
+
+        watcher = util_file.get_directory_watcher()
+
+        for watched in list(self._watch_directories):
+            if not directory or (watched != directory and not watched.startswith(directory + '/')):
+                self._unwatch_folder(watched)
+
+        if not directory:
+            return
+
+        watcher.add_callback(self._publish_directory_events)
+
+        self._watch_folder(directory)
+
+    def _watch_folder(self, directory):
+
+        if not directory or directory in self._watch_directories:
+            return
+
+        if util_file.get_directory_watcher().watch(directory, recursive=False):
+            self._watch_directories.add(directory)
+
+    def _unwatch_folder(self, directory):
+
+        watcher = util_file.get_directory_watcher()
+
+        for watched in list(self._watch_directories):
+            if watched == directory or watched.startswith(directory + '/'):
+                watcher.unwatch(watched, recursive=False)
+                self._watch_directories.discard(watched)
+
+    def _directory_events(self, events):
+
+        if not self.directory:
+            return
+
+        for event in events:
+            name = util_file.get_basename(event.path)
+
+            if event.kind == 'rescan':
+                self._watch_paths.add(self.directory)
+                continue
+
+            if event.kind == 'modify':
+                continue
+
+            if name.startswith('.') and name != '.code':
+                continue
+
+            if not event.is_dir and name != '.code':
+                continue
+
+            folder = util_file.get_dirname(event.path)
+            if name == '.code':
+                folder = util_file.get_dirname(folder)
+
+            if folder == self.directory or folder.startswith(self.directory + '/'):
+                self._watch_paths.add(folder)
+
+        if self._watch_paths:
+            # changes come in bursts. Update once they settle.
+            qt.QtCore.QTimer.singleShot(300, self._update_watched_items)
+
+    def _update_watched_items(self):
+
+        paths = self._watch_paths
+        self._watch_paths = set()
+
+        if not paths:
+            return
+
+        if self.directory in paths:
+            self.refresh()
+            return
+
+        names = set()
+        for path in paths:
+            names.add(util_file.remove_common_path_simple(self.directory, path))
+
+        iterator = qt.QTreeWidgetItemIterator(self)
+
+        items = []
+
+        while iterator.value():
+            item = iterator.value()
+            if getattr(item, 'name', None) in names and item.isExpanded():
+                items.append(item)
+            iterator += 1
+
+        for item in items:
+            self._add_sub_items(item)
+
     def _goto_settings_process(self):
 
         goto_process = self._get_project_setting('process')
@@ -1318,6 +1423,10 @@ class ProcessTreeWidget(qt_ui.FileTreeWidget):
                 return True
 
     def _item_collapsed(self, item):
+
+        if hasattr(item, 'get_name') and self.directory:
+            self._unwatch_folder(util_file.join_path(self.directory, item.get_name()))
+
         # not sure about this. If its good usability to have the parent selected when children collapsed
         items = self.selectedItems()
 
@@ -1342,6 +1451,9 @@ class ProcessTreeWidget(qt_ui.FileTreeWidget):
             process_name = item.get_name()
             path = util_file.join_path(self.directory, process_name)
 
+        if path and item.isExpanded():
+            self._watch_folder(path)
+
         self._handle_selection_change = False
 
         try:
@@ -1371,10 +1483,15 @@ class ProcessTreeWidget(qt_ui.FileTreeWidget):
 
     def refresh(self):
 
-        processes, folders = process.find_processes(self.directory, return_also_non_process_list=True)
+        with util_file.StatCache():
+            processes, folders = process.find_processes(self.directory, return_also_non_process_list=True)
+
+            # this can be slow when there are many processes at the top level, and it checks if each process has sub process.
+            self._load_processes(processes, folders)
 
-        # this can be slow when there are many processes at the top level, and it checks if each process has sub process.
-        self._load_processes(processes, folders)
+        if self.directory:
+            # warms the levels below on a thread, so expanding items mostly hits the cache.
+            process.get_process_tree_scanner().walk_in_background(self.directory, depth=2)
 
         self.current_item = None
         self.last_item = None
@@ -1603,6 +1720,8 @@ class ProcessTreeWidget(qt_ui.FileTreeWidget):
 
         super(ProcessTreeWidget, self).set_directory(directory, refresh=refresh, name_filter=name_filter)
 
+        self._watch(self.directory)
+
     def set_settings(self, settings):
 
         self.settings = settings
@@ -3040,11 +3159,15 @@ class ProcessInfoTree(qt.QTreeWidget):
 
 
 class VersionInfoTree(qt.QTreeWidget):
+    size_found = qt_ui.create_signal(object, object, object)
 
     def __init__(self):
 
         self.process = None
 
+        self._size_items = {}
+        self._size_request = None
+
         super(VersionInfoTree, self).__init__()
 
         self.setContextMenuPolicy(qt.QtCore.Qt.CustomContextMenu)
@@ -3053,6 +3176,48 @@ class VersionInfoTree(qt.QTreeWidget):
         self.context_menu = qt.QMenu()
         self._create_context_menu()
 
+        self.size_found.connect(self._set_size)
+
+    def _cancel_sizes(self):
+        if self._size_request:
+            self._size_request.cancel()
+            self._size_request = None
+
+        self._size_items = {}
+
+    def _request_sizes(self):
+
+        if self._size_request or not self._size_items:
+            return
+
+        service = util_file.get_folder_size_service()
+        self._size_request = service.request(list(self._size_items.keys()), self._publish_size, round_value=3)
+
+    def _publish_size(self, path, size, finished):
+        # called on the size thread. The signal passes the size to the ui thread.
+        try:
+            self.size_found.emit(path, size, finished)
+        except RuntimeError:
+            if self._size_request:
+                self._size_request.cancel()
+
+    def _set_size(self, path, size, finished):
+
+        item = self._size_items.get(path)
+
+        if not item:
+            return
+
+        if finished:
+            item.setText(2, str(size))
+        else:
+            item.setText(2, '%s...' % size)
+
+    def clear(self):
+        self._cancel_sizes()
+
+        super(VersionInfoTree, self).clear()
+
     def _item_menu(self, position):
 
         self.current_folder = None
@@ -3114,10 +3279,15 @@ class VersionInfoTree(qt.QTreeWidget):
     def _set_version_info(self, item, folder):
         version_inst = util_file.VersionFile(folder)
         count = version_inst.get_count()
-        size = util_file.get_folder_size(folder, round_value=3)
 
         item.setText(1, str(count))
-        item.setText(2, str(size))
+        item.setText(2, '...')
+
+        # sizes are found on a thread once populate is done, and filled in as they come.
+        if not self._size_items:
+            qt.QtCore.QTimer.singleShot(0, self._request_sizes)
+
+        self._size_items[folder] = item
 
 
 class DataTree(ProcessInfoTree):
@@ -5468,42 +5468,7 @@ class PythonCompleter(qt.QCompleter):
 
     def _get_available_modules(self, paths=None):
 
-        imports = []
-
-        if not paths:
-            paths = sys.path
-        if paths:
-            paths = util.convert_to_sequence(paths)
-
-        for path in paths:
-
-            fix_path = util_file.fix_slashes(path)
-
-            stuff_in_folder = util_file.get_files_and_folders(fix_path)
-
-            for file_or_folder in stuff_in_folder:
-
-                folder_path = util_file.join_path(fix_path, file_or_folder)
-                files = util_file.get_files_with_extension('py', folder_path, fullpath=False)
-
-                if '__init__.py' in files:
-                    imports.append(str(file_or_folder))
-
-            python_files = util_file.get_files_with_extension('py', fix_path, fullpath=False)
-
-            for python_file in python_files:
-
-                if python_file.startswith('__'):
-                    continue
-
-                python_file_name = python_file.split('.')[0]
-
-                imports.append(str(python_file_name))
-
-        if imports:
-            imports = list(set(imports))
-
-        return imports
+        return util_file.get_symbol_index().get_modules(paths)
 
     def _insert_completion(self, completion_string):
 
@@ -5922,6 +5887,15 @@ class PythonCompleter(qt.QCompleter):
 
         self.filepath = filepath
 
+        # index the vetala modules and the process code on a thread, so completion only looks them up.
+        module_folders = [util_file.get_dirname(util_file.fix_slashes(os.path.abspath(__file__)))]
+
+        code_index = filepath.find('/.code/')
+        if code_index > -1:
+            module_folders.append(filepath[:code_index + len('/.code')])
+
+        util_file.get_symbol_index().build(module_folders=module_folders)
+
 
 class AddRemoveList(BasicWidget):
     item_removed = create_signal(object)
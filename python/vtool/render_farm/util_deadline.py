@@ -45,15 +45,21 @@ class DeadlineJob(object):
 
         return txt
 
+    def _write_file(self, filepath, text):
+        try:
+            util_file.write_replace(filepath, text)
+        except (IOError, OSError):
+            util.warning('Could not write: %s' % filepath)
+
     def _create_files(self):
 
         job_info = util_file.create_file('deadline_job_info.txt', self._output_path)
         text = self._dict_to_deadline(self._job_info_dict)
-        util_file.write_replace(job_info, text)
+        self._write_file(job_info, text)
 
         plugin_info = util_file.create_file('deadline_plugin_info.txt', self._output_path)
         text = self._dict_to_deadline(self._plugin_info_dict)
-        util_file.write_replace(plugin_info, text)
+        self._write_file(plugin_info, text)
 
         return [job_info, plugin_info]
 
@@ -16,6 +16,7 @@ import traceback
 import platform
 import os
 import base64
+import threading
 
 if python_version < 3:
     import __builtin__
@@ -24,6 +25,11 @@ else:
     import builtins
     from html.parser import HTMLParser
 
+try:
+    from concurrent import futures
+except ImportError:
+    futures = None
+
 from functools import wraps
 
 temp_log = ''
@@ -752,6 +758,205 @@ class StopWatch(object):
         return self.end()
 
 
+class StageTimer(object):
+    """
+    Adds up how long each stage of a job takes. Stages can be timed from several threads at once.
+    """
+
+    def __init__(self):
+        self.stages = []
+        self.seconds = {}
+        self.counts = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            if stage not in self.seconds:
+                self.stages.append(stage)
+                self.seconds[stage] = 0.0
+                self.counts[stage] = 0
+
+            self.seconds[stage] += seconds
+            self.counts[stage] += 1
+
+    def start(self):
+        return time.time()
+
+    def end(self, stage, start_time):
+        self.add(stage, time.time() - start_time)
+
+    def get_seconds(self, stage):
+        return self.seconds.get(stage, 0.0)
+
+    def get_report(self):
+        """
+        Returns:
+            list: [stage, seconds, count] in the order stages were first timed.
+        """
+        with self._lock:
+            return [[stage, self.seconds[stage], self.counts[stage]] for stage in self.stages]
+
+    def show(self, description=''):
+        if description:
+            show(description)
+
+        for stage, seconds, count in self.get_report():
+            show('\t%s: %s seconds (%s)' % (stage, round(seconds, 3), count))
+
+
+def get_cpu_time():
+    """
+    Returns:
+        float: User and system cpu seconds used by this process so far.
+    """
+    times = os.times()
+    return times[0] + times[1]
+
+
+class TimingRecorder(object):
+    """
+    Records wall and cpu time for named entries, like the scripts and data imports of a build.
+    Entries started while another entry is open get it as their parent.
+    """
+
+    def __init__(self):
+        self.entries = []
+        self._stack = []
+        self._start = time.time()
+        self._start_cpu = get_cpu_time()
+
+    def start(self, kind, name):
+        """
+        Returns:
+            dict: The entry. Pass it to end.
+        """
+        entry = {'kind': kind, 'name': name, 'parent': None, 'status': None,
+                 '_wall': time.time(), '_cpu': get_cpu_time()}
+
+        if self._stack:
+            entry['parent'] = self._stack[-1]['name']
+
+        self._stack.append(entry)
+
+        return entry
+
+    def end(self, entry, status=None):
+        if entry in self._stack:
+            self._stack.remove(entry)
+
+        entry['wall'] = round(time.time() - entry.pop('_wall'), 4)
+        entry['cpu'] = round(get_cpu_time() - entry.pop('_cpu'), 4)
+        entry['status'] = status
+
+        self.entries.append(entry)
+
+    def get_record(self, **kwargs):
+        """
+        Returns:
+            dict: The totals and entries, plus any keyword arguments.
+        """
+        record = {'time': self._start,
+                  'wall': round(time.time() - self._start, 4),
+                  'cpu': round(get_cpu_time() - self._start_cpu, 4),
+                  'entries': list(self.entries)}
+        record.update(kwargs)
+
+        return record
+
+
+class _FinishedFuture(object):
+    """
+    Used by WorkerPool when it runs jobs in the calling thread.
+    """
+
+    def __init__(self, function, args, kwargs):
+        self._result = None
+        self._exception = None
+
+        try:
+            self._result = function(*args, **kwargs)
+        except Exception as exception:
+            self._exception = exception
+
+    def done(self):
+        return True
+
+    def result(self, timeout=None):
+        if self._exception:
+            raise self._exception
+        return self._result
+
+    def exception(self, timeout=None):
+        return self._exception
+
+
+def get_worker_count(max_workers=None):
+    """
+    Get how many worker threads to use. VETALA_WORKERS overrides the default.
+    """
+
+    if max_workers:
+        return max_workers
+
+    env_workers = os.environ.get('VETALA_WORKERS')
+    if env_workers:
+        try:
+            return max(1, int(env_workers))
+        except ValueError:
+            pass
+
+    cpu_count = 1
+    try:
+        import multiprocessing
+        cpu_count = multiprocessing.cpu_count()
+    except:
+        pass
+
+    return min(32, cpu_count + 4)
+
+
+class WorkerPool(object):
+    """
+    A bounded pool of worker threads.
+    Only give it work that does not touch the scene, like file io and serialization.
+    If threads are not available, jobs run in the calling thread.
+
+    Args:
+        max_workers (int): The number of threads. By default, get_worker_count()
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = get_worker_count(max_workers)
+
+        self._executor = None
+        if futures and self.max_workers > 1:
+            self._executor = futures.ThreadPoolExecutor(max_workers=self.max_workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.shutdown()
+
+    def submit(self, function, *args, **kwargs):
+        if self._executor:
+            return self._executor.submit(function, *args, **kwargs)
+
+        return _FinishedFuture(function, args, kwargs)
+
+    def map(self, function, items):
+        """
+        Run function on every item and return the results in order.
+        """
+        jobs = [self.submit(function, item) for item in items]
+        return [job.result() for job in jobs]
+
+    def shutdown(self, wait=True):
+        if self._executor:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
 class Variable(object):
     """
     Simple base class for variables on a node.
@@ -19,8 +19,29 @@ import threading
 import stat
 import ast
 import filecmp
+import fnmatch
+import difflib
 import time
 import hashlib
+import marshal
+import types
+import atexit
+from functools import wraps
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+try:
+    from os import scandir
+except ImportError:
+    scandir = None
 
 from . import util
 from . import logger
@@ -147,126 +168,1711 @@ class ProcessLog(object):
         util.set_env('VETAL_TEMP_LOG', '')
 
 
+class BuildTimingLog(object):
+    """
+    Json lines file in the process .log folder with one timing record per build.
+    Each record holds the wall and cpu time of every script, data import and script group in the build.
+
+    Args:
+        directory (str): The process path.
+    """
+
+    file_name = 'build_timing.jsonl'
+    max_records = 200
+
+    def __init__(self, directory):
+        self.directory = join_path(directory, '.log')
+        self.filepath = join_path(self.directory, self.file_name)
+
+    def add(self, record):
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+        with open(self.filepath, 'a') as log_file:
+            log_file.write(json.dumps(record, sort_keys=True) + '\n')
+
+        records = self.get_records()
+        if len(records) > self.max_records * 2:
+            text = ''.join(json.dumps(record, sort_keys=True) + '\n' for record in records[-self.max_records:])
+            write_replace(self.filepath, text)
+
+    def get_records(self, count=None):
+        """
+        Returns:
+            list: Records from oldest to newest. If count is given, only the newest count.
+        """
+        if not os.path.isfile(self.filepath):
+            return []
+
+        records = []
+
+        with open(self.filepath, 'r') as log_file:
+            for line in log_file:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+
+        if count:
+            records = records[-count:]
+
+        return records
+
+    def get_history(self, name, kind='script', count=None):
+        """
+        Returns:
+            list: [time, wall, cpu] for every build that timed name, oldest first.
+        """
+        history = []
+
+        for record in self.get_records(count):
+            for entry in record.get('entries', []):
+                if entry.get('name') == name and entry.get('kind') == kind:
+                    history.append([record.get('time'), entry.get('wall'), entry.get('cpu')])
+
+        return history
+
+    def get_regressions(self, record=None, window=5, threshold=1.25, min_seconds=0.05):
+        """
+        Compare a record to the median of the builds before it.
+
+        Args:
+            record (dict): The record to check. By default the newest one.
+            window (int): How many earlier builds make up the baseline.
+            threshold (float): How many times slower than the baseline counts as a regression.
+            min_seconds (float): Ignore entries faster than this, they are mostly noise.
+
+        Returns:
+            list: [kind, name, wall, baseline] for each slower entry, slowest change first.
+        """
+
+        records = self.get_records()
+
+        if record is None:
+            if not records:
+                return []
+            record = records[-1]
+
+        previous = [test for test in records if test.get('time') < record.get('time')][-window:]
+
+        baseline_times = {}
+        for test in previous:
+            for entry in test.get('entries', []):
+                if entry.get('status') != 'Success' and entry.get('kind') == 'script':
+                    continue
+                key = (entry.get('kind'), entry.get('name'))
+                baseline_times.setdefault(key, []).append(entry.get('wall', 0))
+
+        found = []
+
+        for entry in record.get('entries', []):
+            key = (entry.get('kind'), entry.get('name'))
+
+            if key not in baseline_times:
+                continue
+
+            wall = entry.get('wall', 0)
+            if wall < min_seconds:
+                continue
+
+            times = sorted(baseline_times[key])
+            baseline = times[len(times) // 2]
+
+            if wall > baseline * threshold:
+                found.append([key[0], key[1], wall, baseline])
+
+        found.sort(key=lambda value: value[2] - value[3], reverse=True)
+
+        return found
+
+    def get_report(self, record=None, window=5, threshold=1.25):
+        """
+        Returns:
+            str: The regressions as text, one per line.
+        """
+        lines = []
+        for kind, name, wall, baseline in self.get_regressions(record, window, threshold):
+            lines.append('%s %s: %s seconds, usually %s' % (kind, name, round(wall, 2), round(baseline, 2)))
+
+        return '\n'.join(lines)
+
+
+class WatchEvent(object):
+    """
+    A change found by a DirectoryWatcher.
+
+    kind is 'add', 'remove', 'modify', or 'rescan' when changes were lost and everything under path should be checked again.
+    """
+
+    def __init__(self, kind, path, is_dir=False):
+        self.kind = kind
+        self.path = path
+        self.is_dir = is_dir
+
+    def __repr__(self):
+        return 'WatchEvent(%s, %s, is_dir=%s)' % (self.kind, self.path, self.is_dir)
+
+
+class InotifyBackend(object):
+    """
+    Linux inotify through ctypes. Every directory under a watched root gets its own watch.
+    """
+
+    create = 0x00000100
+    delete = 0x00000200
+    close_write = 0x00000008
+    attrib = 0x00000004
+    moved_from = 0x00000040
+    moved_to = 0x00000080
+    delete_self = 0x00000400
+    move_self = 0x00000800
+    overflow = 0x00004000
+    ignored = 0x00008000
+    is_dir_flag = 0x40000000
+    only_dir = 0x01000000
+
+    cloexec = 0o2000000
+    nonblock = 0o4000
+
+    _event_struct = None
+
+    def __init__(self, watcher):
+        import ctypes
+        import ctypes.util
+        import struct
+
+        self._ctypes = ctypes
+        self._event_struct = struct.Struct('iIII')
+
+        self.watcher = watcher
+
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+
+        self._fd = self._libc.inotify_init1(self.cloexec | self.nonblock)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+
+        self._paths = {}
+        self._descriptors = {}
+        self._names = {}
+
+    def _get_mask(self):
+        return (self.create | self.delete | self.close_write | self.attrib | self.moved_from | self.moved_to |
+                self.delete_self | self.move_self | self.only_dir)
+
+    def add(self, directory, report=False):
+        """
+        Watch directory, and every directory under it if it is watched recursively.
+
+        Args:
+            directory (str): The directory to watch.
+            report (bool): Return add events for what is already in it. Used for new folders, whose contents may have been made before the watch.
+
+        Returns:
+            list: WatchEvent for entries found, if report is on.
+        """
+
+        events = []
+        folders = [directory]
+        recursive = self.watcher.is_recursive(directory)
+
+        while folders:
+            folder = folders.pop()
+
+            if folder in self._descriptors:
+                continue
+
+            descriptor = self._libc.inotify_add_watch(self._fd, folder.encode('utf-8'), self._get_mask())
+
+            if descriptor < 0:
+                error = self._ctypes.get_errno()
+                if error == 28:
+                    util.warning('Out of inotify watches. Raise fs.inotify.max_user_watches to watch: %s' % folder)
+                    raise OSError(error, 'inotify_add_watch failed')
+                continue
+
+            self._paths[descriptor] = folder
+            self._descriptors[folder] = descriptor
+
+            names = set()
+            for name, is_dir in self.watcher._list(folder):
+                names.add(name)
+                child_path = folder + '/' + name
+                if report:
+                    events.append(WatchEvent('add', child_path, is_dir))
+                if is_dir and recursive:
+                    folders.append(child_path)
+
+            self._names[folder] = names
+
+        return events
+
+    def remove(self, directory):
+        prefix = directory + '/'
+        for folder in list(self._descriptors.keys()):
+            if folder == directory or folder.startswith(prefix):
+                self._forget(folder, remove_watch=True)
+
+    def _forget(self, folder, remove_watch=False):
+        descriptor = self._descriptors.pop(folder, None)
+        self._names.pop(folder, None)
+
+        if descriptor is None:
+            return
+
+        self._paths.pop(descriptor, None)
+        if remove_watch:
+            self._libc.inotify_rm_watch(self._fd, descriptor)
+
+    def fileno(self):
+        return self._fd
+
+    def read(self, timeout):
+        """
+        Returns:
+            list: WatchEvent for changes that arrived within timeout seconds.
+        """
+
+        import select
+
+        try:
+            ready = select.select([self._fd], [], [], timeout)[0]
+        except (OSError, select.error, ValueError):
+            return []
+
+        if not ready:
+            return []
+
+        try:
+            data = os.read(self._fd, 65536)
+        except OSError:
+            return []
+
+        events = []
+        offset = 0
+        header_size = self._event_struct.size
+
+        with self.watcher._lock:
+            while offset + header_size <= len(data):
+                descriptor, mask, cookie, length = self._event_struct.unpack_from(data, offset)
+                offset += header_size
+                name = data[offset:offset + length].rstrip(b'\0').decode('utf-8', 'replace')
+                offset += length
+
+                events += self._get_events(descriptor, mask, name)
+
+        return events
+
+    def _get_events(self, descriptor, mask, name):
+
+        if mask & self.overflow:
+            return [WatchEvent('rescan', root, True) for root in self.watcher.get_directories()]
+
+        folder = self._paths.get(descriptor)
+
+        if folder is None:
+            return []
+
+        if mask & self.ignored or mask & self.delete_self or mask & self.move_self:
+            if mask & self.ignored:
+                self._forget(folder)
+            return []
+
+        if not name or self.watcher.is_excluded(name):
+            return []
+
+        path = folder + '/' + name
+        is_dir = bool(mask & self.is_dir_flag)
+        names = self._names.setdefault(folder, set())
+
+        if mask & (self.create | self.moved_to):
+            if name in names:
+                return [WatchEvent('modify', path, is_dir)]
+
+            names.add(name)
+            events = [WatchEvent('add', path, is_dir)]
+
+            if is_dir and self.watcher.is_recursive(folder):
+                try:
+                    events += self.add(path, report=True)
+                except OSError:
+                    events.append(WatchEvent('rescan', path, True))
+            return events
+
+        if mask & (self.delete | self.moved_from):
+            names.discard(name)
+            if is_dir:
+                self.remove(path)
+            return [WatchEvent('remove', path, is_dir)]
+
+        if mask & (self.close_write | self.attrib):
+            return [WatchEvent('modify', path, is_dir)]
+
+        return []
+
+    def close(self):
+        if self._fd is not None and self._fd >= 0:
+            os.close(self._fd)
+        self._fd = None
+
+
+class PollingBackend(object):
+    """
+    Finds changes by checking the modified time of each watched folder, and listing again only the folders that changed.
+    Adding, removing or renaming an entry changes the modified time of its folder, so only add and remove are found.
+    Files changed in place are not reported.
+    """
+
+    # file systems like fat and some network shares only keep modified times to the second or two.
+    mtime_resolution = 2.0
+
+    def __init__(self, watcher):
+        self.watcher = watcher
+
+        # watched directory: {folder: [mtime, checked, {name: is_dir}]}
+        self._snapshots = {}
+
+    def _get_snapshot(self, directory, before=None):
+        """
+        List the folders under directory that changed since before.
+
+        Returns:
+            list: [snapshot, WatchEvent for entries added or removed since before]
+        """
+
+        if before is None:
+            before = {}
+
+        recursive = self.watcher.is_recursive(directory)
+
+        snapshot = {}
+        events = []
+        folders = [directory]
+
+        while folders:
+            folder = folders.pop()
+
+            checked = time.time()
+            try:
+                mtime = os.stat(folder).st_mtime
+            except OSError:
+                continue
+
+            old_listing = before.get(folder)
+
+            if old_listing and old_listing[0] == mtime and old_listing[1] - mtime > self.mtime_resolution:
+                listing = old_listing
+            else:
+                listing = [mtime, checked, dict(self.watcher._list(folder))]
+
+                if before:
+                    old_names = {}
+                    if old_listing:
+                        old_names = old_listing[2]
+
+                    for name, is_dir in listing[2].items():
+                        if name not in old_names:
+                            events.append(WatchEvent('add', folder + '/' + name, is_dir))
+                    for name, is_dir in old_names.items():
+                        if name not in listing[2]:
+                            events.append(WatchEvent('remove', folder + '/' + name, is_dir))
+
+            snapshot[folder] = listing
+
+            if recursive:
+                for name, is_dir in listing[2].items():
+                    if is_dir:
+                        folders.append(folder + '/' + name)
+
+        return [snapshot, events]
+
+    def add(self, directory):
+        if self.watcher.is_recursive(directory):
+            for watched in list(self._snapshots.keys()):
+                if watched.startswith(directory + '/'):
+                    self._snapshots.pop(watched)
+
+        self._snapshots[directory] = self._get_snapshot(directory)[0]
+        return []
+
+    def remove(self, directory):
+        self._snapshots.pop(directory, None)
+
+    def read(self, timeout):
+
+        events = []
+
+        with self.watcher._lock:
+            snapshots = list(self._snapshots.items())
+
+        # listing happens outside the lock, so watching and unwatching are not held up by a slow share.
+        for directory, before in snapshots:
+            after, found = self._get_snapshot(directory, before)
+
+            with self.watcher._lock:
+                if self._snapshots.get(directory) is not before:
+                    continue
+                self._snapshots[directory] = after
+
+            events += found
+
+        if not events and timeout:
+            self.watcher._stop_event.wait(timeout)
+
+        return events
+
+    def close(self):
+        self._snapshots = {}
+
+
+class DirectoryWatcher(object):
+    """
+    Publishes add, remove and modify events for files and folders under watched directories.
+    Uses inotify on Linux, and lists the directories on an interval everywhere else or if inotify is not available.
+    Callbacks are called on the watch thread with a list of WatchEvent. UI code should pass them on to the main thread.
+
+    Args:
+        recursive (bool): Watch folders under the watched directories too, unless watch is told otherwise.
+        interval (float): Longest wait for inotify events, which is also how long stop can take.
+        poll_interval (float): Seconds between listings when polling. Listing a whole project is slow on network drives, so this is longer.
+        exclude (list): File and folder name patterns to ignore. Names under an excluded folder are ignored too.
+        use_inotify (bool): Use inotify when it is available.
+    """
+
+    default_exclude = ['.version', '.backup', '.checkpoint', '.log', '__pycache__', '.*.tmp', '.*.lock', '*.pyc']
+
+    def __init__(self, recursive=True, interval=1.0, poll_interval=10.0, exclude=None, use_inotify=True):
+        self.recursive = recursive
+        self.interval = interval
+        self.poll_interval = poll_interval
+
+        if exclude is None:
+            exclude = self.default_exclude
+        self.exclude = list(exclude)
+
+        self._directories = []
+        # directory: [watches without recursion, recursive watches]
+        self._watches = {}
+        self._callbacks = []
+        self._lock = threading.RLock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._backend = None
+        self._use_inotify = use_inotify
+
+    def _get_backend(self):
+        if self._backend:
+            return self._backend
+
+        if self._use_inotify and sys.platform.startswith('linux'):
+            try:
+                self._backend = InotifyBackend(self)
+            except (OSError, AttributeError):
+                log.debug('inotify not available. Polling for changes.')
+
+        if not self._backend:
+            self._backend = PollingBackend(self)
+
+        return self._backend
+
+    def _list(self, directory):
+        """
+        Returns:
+            list: [name, is_dir] for entries in directory that are not excluded.
+        """
+
+        found = []
+
+        try:
+            if scandir:
+                for entry in scandir(directory):
+                    if self.is_excluded(entry.name):
+                        continue
+                    try:
+                        found.append([entry.name, entry.is_dir()])
+                    except OSError:
+                        continue
+            else:
+                for name in os.listdir(directory):
+                    if self.is_excluded(name):
+                        continue
+                    found.append([name, os.path.isdir(os.path.join(directory, name))])
+        except OSError:
+            pass
+
+        return found
+
+    def is_excluded(self, name):
+        for pattern in self.exclude:
+            if fnmatch.fnmatch(name, pattern):
+                return True
+
+        return False
+
+    def get_backend_name(self):
+        if isinstance(self._get_backend(), InotifyBackend):
+            return 'inotify'
+        return 'polling'
+
+    def get_directories(self):
+        return list(self._directories)
+
+    def is_recursive(self, directory):
+        """
+        Whether directory is watched with everything under it.
+        """
+
+        directory = fix_slashes(directory)
+
+        for watched in self._directories:
+            if not self._watches[watched][1]:
+                continue
+            if directory == watched or directory.startswith(watched + '/'):
+                return True
+
+        return False
+
+    def is_watching(self, directory, recursive=False):
+        """
+        Whether changes to directory are published.
+
+        Args:
+            directory (str): The directory to check.
+            recursive (bool): Only if the folders under directory are watched too.
+        """
+
+        if recursive:
+            return self.is_recursive(directory)
+
+        directory = fix_slashes(directory)
+
+        if directory in self._watches:
+            return True
+
+        return self.is_recursive(directory)
+
+    def _is_covered(self, directory):
+        """
+        Whether a recursively watched folder above directory, that is watched by the backend, already covers it.
+        """
+
+        for watched in self._directories:
+            if not self._watches[watched][1]:
+                continue
+            if directory.startswith(watched + '/') and not self._is_covered(watched):
+                return True
+
+        return False
+
+    def _reset(self, directory):
+        """
+        Give directory, and the folders watched under it, to the backend again after directory was watched in another way.
+        """
+
+        if not self._backend:
+            return
+
+        self._backend.remove(directory)
+
+        for watched in [directory] + self._directories:
+            if watched != directory and not watched.startswith(directory + '/'):
+                continue
+            if watched in self._watches and not self._is_covered(watched):
+                self._backend.add(watched)
+
+    def add_callback(self, function):
+        """
+        Args:
+            function: Called with a list of WatchEvent.
+        """
+        with self._lock:
+            if function not in self._callbacks:
+                self._callbacks.append(function)
+
+    def remove_callback(self, function):
+        with self._lock:
+            if function in self._callbacks:
+                self._callbacks.remove(function)
+
+    def watch(self, directory, recursive=None):
+        """
+        Each watch needs its own unwatch.
+
+        Args:
+            directory (str): The directory to watch.
+            recursive (bool): Watch the folders under directory too. None uses recursive of the watcher.
+                Watching only the folders that are shown keeps polling cheap on network drives.
+
+        Returns:
+            bool: Whether directory is watched.
+        """
+
+        directory = fix_slashes(directory).rstrip('/')
+
+        if recursive is None:
+            recursive = self.recursive
+
+        if not is_dir(directory):
+            return False
+
+        with self._lock:
+            counts = self._watches.get(directory)
+
+            if counts:
+                was_recursive = bool(counts[1])
+                counts[int(bool(recursive))] += 1
+
+                if recursive and not was_recursive and not self._is_covered(directory):
+                    self._reset(directory)
+
+                return True
+
+            counts = [0, 0]
+            counts[int(bool(recursive))] += 1
+            self._watches[directory] = counts
+            self._directories.append(directory)
+
+            if self._is_covered(directory):
+                # already covered by a watched folder above it.
+                self.start()
+                return True
+
+            backend = self._get_backend()
+
+            try:
+                if recursive:
+                    self._reset(directory)
+                else:
+                    backend.add(directory)
+            except OSError:
+                if isinstance(backend, PollingBackend):
+                    self._directories.remove(directory)
+                    self._watches.pop(directory)
+                    return False
+                backend.close()
+                self._backend = PollingBackend(self)
+                for watched in self._directories:
+                    if not self._is_covered(watched):
+                        self._backend.add(watched)
+
+        self.start()
+
+        return True
+
+    def unwatch(self, directory, recursive=None):
+        """
+        Undo one watch of directory. It stays watched while other watches of it are left.
+
+        Args:
+            directory (str): The directory to unwatch.
+            recursive (bool): The recursive that was given to watch.
+        """
+
+        directory = fix_slashes(directory).rstrip('/')
+
+        if recursive is None:
+            recursive = self.recursive
+
+        with self._lock:
+            counts = self._watches.get(directory)
+
+            if not counts:
+                return
+
+            inc = int(bool(recursive))
+            if not counts[inc]:
+                inc = 1 - inc
+
+            was_recursive = bool(counts[1])
+            counts[inc] -= 1
+
+            if counts[0] or counts[1]:
+                if was_recursive and not counts[1] and not self._is_covered(directory):
+                    self._reset(directory)
+                return
+
+            self._watches.pop(directory)
+            self._directories.remove(directory)
+
+            if self._is_covered(directory):
+                return
+
+            # folders under it that were watched on their own still need to be watched.
+            self._reset(directory)
+
+    def poll(self, timeout=0):
+        """
+        Read changes and call the callbacks.
+
+        Returns:
+            list: The WatchEvent found.
+        """
+
+        backend = self._get_backend()
+
+        events = backend.read(timeout)
+
+        if not events:
+            return events
+
+        with self._lock:
+            callbacks = list(self._callbacks)
+
+        for callback in callbacks:
+            try:
+                callback(events)
+            except Exception:
+                util.error(traceback.format_exc())
+
+        return events
+
+    def start(self):
+        """
+        Publish changes from a daemon thread.
+        """
+
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = WatchDirectoryThread(self)
+        self._thread.start()
+
+    def stop(self):
+
+        self._stop_event.set()
+
+        if self._thread:
+            self._thread.join(self.interval + 1)
+            self._thread = None
+
+        with self._lock:
+            if self._backend:
+                self._backend.close()
+                self._backend = None
+
+
 class WatchDirectoryThread(threading.Thread):
     """
-    Not developed fully.
+    Runs a DirectoryWatcher until it is stopped.
+    """
+
+    def __init__(self, watcher):
+        super(WatchDirectoryThread, self).__init__()
+
+        self.watcher = watcher
+        self.daemon = True
+
+    def run(self):
+
+        while not self.watcher._stop_event.is_set():
+            with self.watcher._lock:
+                has_directories = bool(self.watcher._directories)
+
+            if not has_directories:
+                self.watcher._stop_event.wait(self.watcher.interval)
+                continue
+
+            timeout = self.watcher.interval
+            if self.watcher.get_backend_name() == 'polling':
+                timeout = self.watcher.poll_interval
+
+            try:
+                self.watcher.poll(timeout)
+            except Exception:
+                util.error(traceback.format_exc())
+                self.watcher._stop_event.wait(self.watcher.interval)
+
+
+_directory_watcher = None
+
+
+def get_directory_watcher():
+    """
+    Returns:
+        DirectoryWatcher: The watcher shared by process and ui code.
+    """
+
+    global _directory_watcher
+
+    if _directory_watcher is None:
+        _directory_watcher = DirectoryWatcher()
+
+    return _directory_watcher
+
+
+class BlobStore(object):
+    """
+    Stores file contents by hash, so each unique file is stored only once.
+    Blobs live in directory/blobs/<first two characters of the hash>/<hash>
+
+    Args:
+        directory (str): The folder to keep the blobs folder in.
+    """
+
+    def __init__(self, directory):
+        self.directory = join_path(directory, 'blobs')
+
+    def get_blob_path(self, file_hash):
+        return join_path(self.directory, '%s/%s' % (file_hash[:2], file_hash))
+
+    def has_blob(self, file_hash):
+        return os.path.isfile(self.get_blob_path(file_hash))
+
+    def add_file(self, filepath, chunk_size=1048576):
+        """
+        Copy a file into the store. The file is hashed while it is copied.
+
+        Returns:
+            str: The hash of the file.
+        """
+
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+        temp_handle, temp_path = tempfile.mkstemp(prefix='.blob', dir=self.directory)
+
+        hash_inst = hashlib.sha1()
+
+        try:
+            with os.fdopen(temp_handle, 'wb') as temp_file:
+                with open(filepath, 'rb') as source_file:
+                    chunk = source_file.read(chunk_size)
+                    while chunk:
+                        hash_inst.update(chunk)
+                        temp_file.write(chunk)
+                        chunk = source_file.read(chunk_size)
+
+            file_hash = hash_inst.hexdigest()
+            blob_path = self.get_blob_path(file_hash)
+
+            if os.path.isfile(blob_path):
+                os.remove(temp_path)
+            else:
+                blob_folder = get_dirname(blob_path)
+                if not os.path.isdir(blob_folder):
+                    os.makedirs(blob_folder)
+                os.chmod(temp_path, 0o666 & ~get_umask())
+                os.rename(temp_path, blob_path)
+        except:
+            if os.path.isfile(temp_path):
+                os.remove(temp_path)
+            raise
+
+        return file_hash
+
+    def add_data(self, data):
+        """
+        Add bytes to the store.
+
+        Returns:
+            str: The hash of the data.
+        """
+
+        file_hash = hashlib.sha1(data).hexdigest()
+        blob_path = self.get_blob_path(file_hash)
+
+        if os.path.isfile(blob_path):
+            return file_hash
+
+        blob_folder = get_dirname(blob_path)
+        if not os.path.isdir(blob_folder):
+            os.makedirs(blob_folder)
+
+        temp_handle, temp_path = tempfile.mkstemp(prefix='.blob', dir=blob_folder)
+        with os.fdopen(temp_handle, 'wb') as temp_file:
+            temp_file.write(data)
+
+        os.chmod(temp_path, 0o666 & ~get_umask())
+        os.rename(temp_path, blob_path)
+
+        return file_hash
+
+    def get_data(self, file_hash):
+        with open(self.get_blob_path(file_hash), 'rb') as blob_file:
+            return blob_file.read()
+
+    def remove_blob(self, file_hash):
+        blob_path = self.get_blob_path(file_hash)
+
+        if os.path.isfile(blob_path):
+            os.remove(blob_path)
+
+    def link_blob(self, file_hash, filepath):
+        """
+        Hardlink a blob to filepath.
+
+        Returns:
+            bool: False if the file system does not support hardlinks.
+        """
+
+        if not hasattr(os, 'link'):
+            return False
+
+        try:
+            os.link(self.get_blob_path(file_hash), filepath)
+        except (OSError, NotImplementedError):
+            return False
+
+        return True
+
+    def copy_blob(self, file_hash, filepath):
+        shutil.copyfile(self.get_blob_path(file_hash), filepath)
+
+    def get_hashes(self):
+        found = []
+
+        if not os.path.isdir(self.directory):
+            return found
+
+        for folder in os.listdir(self.directory):
+            folder_path = join_path(self.directory, folder)
+
+            if not os.path.isdir(folder_path):
+                continue
+
+            for filename in os.listdir(folder_path):
+                if not filename.startswith('.'):
+                    found.append(filename)
+
+        return found
+
+    def remove_unreferenced(self, referenced):
+        """
+        Delete blobs that are not in referenced.
+
+        Args:
+            referenced (set): The hashes that are still used.
+
+        Returns:
+            int: The number of bytes freed.
+        """
+
+        freed = 0
+
+        for file_hash in self.get_hashes():
+            if file_hash in referenced:
+                continue
+
+            blob_path = self.get_blob_path(file_hash)
+            freed += os.path.getsize(blob_path)
+            os.remove(blob_path)
+
+        return freed
+
+
+class VersionIndex(object):
+    """
+    Append only json lines file with the comment, user, size and time of every version in a version folder.
+    Parsed entries are shared between instances until the file changes.
+
+    Args:
+        version_folder (str): The version folder.
+    """
+
+    file_name = 'history.jsonl'
+
+    _cache = {}
+    _lock = threading.Lock()
+
+    def __init__(self, version_folder):
+        self.version_folder = version_folder
+        self.filepath = join_path(version_folder, self.file_name)
+
+    def _get_stat_key(self):
+        try:
+            file_stat = os.stat(self.filepath)
+        except OSError:
+            return
+
+        return file_stat.st_mtime, file_stat.st_size
+
+    def _load(self):
+        """
+        Returns:
+            dict: dict[version] = entry
+        """
+
+        stat_key = self._get_stat_key()
+
+        if stat_key is None:
+            return {}
+
+        with self._lock:
+            cached = self._cache.get(self.filepath)
+            if cached and cached[0] == stat_key:
+                return cached[1]
+
+        entries = {}
+
+        with open(self.filepath, 'r') as index_file:
+            for line in index_file:
+                line = line.strip()
+                if not line:
+                    continue
+
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    log.info('Skipping bad line in %s' % self.filepath)
+                    continue
+
+                version = entry.get('version')
+
+                if entry.get('deleted'):
+                    entries.pop(version, None)
+                    continue
+
+                entries[version] = entry
+
+        with self._lock:
+            self._cache[self.filepath] = [stat_key, entries]
+
+        return entries
+
+    def _append(self, entries):
+        lines = [json.dumps(entry, sort_keys=True) + '\n' for entry in entries]
+
+        with self._lock:
+            with open(self.filepath, 'a') as index_file:
+                index_file.writelines(lines)
+
+            self._cache.pop(self.filepath, None)
+
+    def exists(self):
+        return os.path.isfile(self.filepath)
+
+    def add(self, version, comment, user, size=None, save_time=None, data=None):
+        """
+        Args:
+            version (int or str): The version number. 'default' for the default version.
+            comment (str)
+            user (str)
+            size (int): The size of the version in bytes.
+            save_time (float): Seconds since the epoch.
+            data (dict): Extra values to store with the version.
+        """
+
+        if save_time is None:
+            save_time = time.time()
+
+        entry = {'version': version,
+                 'comment': comment,
+                 'user': user,
+                 'size': size,
+                 'time': save_time}
+
+        if data:
+            entry['data'] = data
+
+        self._append([entry])
+
+    def remove(self, version):
+        self._append([{'version': version, 'deleted': True}])
+
+    def get(self, version):
+        return self._load().get(version)
+
+    def get_versions(self):
+        versions = [version for version in self._load() if isinstance(version, int)]
+        versions.sort()
+
+        return versions
+
+    def get_entries(self, start=0, count=None, reverse=False):
+        """
+        Get a page of entries ordered by version.
+
+        Args:
+            start (int): The index of the first entry in the page.
+            count (int): The number of entries. By default, all entries after start.
+            reverse (bool): Newest versions first.
+
+        Returns:
+            list
+        """
+
+        entries = self._load()
+        versions = self.get_versions()
+
+        if reverse:
+            versions.reverse()
+
+        if count is None:
+            versions = versions[start:]
+        else:
+            versions = versions[start:start + count]
+
+        return [entries[version] for version in versions]
+
+    def migrate(self, comment_path, get_version_info):
+        """
+        Create the index from a comments.txt file.
+
+        Args:
+            comment_path (str): The comments.txt file.
+            get_version_info (function): Gets a version number and returns (size, time) of the version.
+
+        Returns:
+            int: The number of versions found.
+        """
+
+        new_entries = []
+
+        for line in get_file_lines(comment_path):
+
+            line_info_dict = {}
+
+            for sub_line in util.split_line(line, ';'):
+                assignment = util.split_line(sub_line, '=')
+
+                if len(assignment) > 1 and assignment[0]:
+                    value = assignment[1].strip()
+                    if value.startswith('"') and value.endswith('"'):
+                        value = value[1:-1]
+
+                    line_info_dict[assignment[0].strip()] = value
+
+            version = line_info_dict.pop('version', None)
+
+            if version is None:
+                continue
+
+            if version.isdigit():
+                version = int(version)
+
+            comment = line_info_dict.pop('comment', None)
+            user = line_info_dict.pop('user', None)
+
+            size, save_time = get_version_info(version)
+
+            entry = {'version': version,
+                     'comment': comment,
+                     'user': user,
+                     'size': size,
+                     'time': save_time}
+
+            if line_info_dict:
+                entry['data'] = line_info_dict
+
+            new_entries.append(entry)
+
+        self._append(new_entries)
+
+        return len(new_entries)
+
+
+class VersionFile(object):
+    """
+    Convenience to version a file or folder.
+
+    File contents are stored once in a BlobStore in the version folder.
+    Each version has a manifest of the blobs it uses and its files are hardlinks to the blobs.
+    If hardlinks are not supported, only the manifest is saved and get_version_path
+    creates the version from the blobs when it is asked for.
+
+    With set_reverse_delta, older versions of a text file are stored as the difference to the version after them.
+    
+    Args:
+        filepath (str): The path to the file to version.
     """
 
-    def __init__(self):
-        super(WatchDirectoryThread, self).__init__()
+    def __init__(self, filepath):
+        self.filepath = filepath
+
+        if filepath:
+            self.filename = get_basename(self.filepath)
+            self.path = get_dirname(filepath)
+
+        self.version_folder_name = '.version'
+        self.version_name = 'version'
+        self.version_folder = None
+        self.updated_old = False
+
+        self.reverse_delta = False
+        self.delta_keyframe = 25
+
+        self.source_path = None
+        self.source_exclude = []
+
+    def _prep_directories(self):
+        self._create_version_folder()
+        self._create_comment_file()
+
+    def _create_version_folder(self):
+
+        self.version_folder = create_dir(self.version_folder_name, self.path)
+
+    def _create_comment_file(self):
+        self.comment_file = create_file('comments.txt', self.version_folder)
+
+    def _increment_version_file_name(self):
+
+        version_numbers = self._get_manifest_version_numbers(self.version_folder)
+
+        if version_numbers:
+            path = join_path(self.version_folder, self.version_name + '.' + str(version_numbers[-1] + 1))
+
+            if not exists(path):
+                return path
+
+        path = join_path(self.version_folder, self.version_name + '.1')
+
+        return inc_path_name(path)
+
+    def _default_version_file_name(self):
+
+        if not self.version_name:
+            return
+
+        version_folder = self._get_version_folder()
+        path = join_path(version_folder, self.version_name + '.default')
+
+        return path
+
+    def _get_version_path(self, version_int):
+        path = join_path(self._get_version_folder(), self.version_name + '.' + str(version_int))
+
+        return path
+
+    def _get_version_number(self, filepath):
+
+        version_number = util.get_end_number(filepath)
+
+        return version_number
+
+    def _get_version_folder(self):
+        if is_file(self.filepath):
+            dir_name = get_dirname(self.filepath)
+            path = join_path(dir_name, self.version_folder_name)
+        else:
+            path = join_path(self.filepath, self.version_folder_name)
+        return path
+
+    def _get_source(self):
+        if self.source_path:
+            return self.source_path
+
+        return self.filepath
+
+    def _get_index(self, version_folder):
+        return VersionIndex(version_folder)
+
+    def _migrate_index(self, index):
+        version_folder = index.version_folder
+
+        def get_version_info(version):
+            version_path = join_path(version_folder, '%s.%s' % (self.version_name, version))
+
+            manifest = self._read_manifest(self._get_manifest_path(version_path, version_folder))
+            if manifest:
+                return manifest['size'], manifest['time']
+
+            if not exists(version_path):
+                return None, None
+
+            size = os.path.getsize(version_path)
+            if os.path.isdir(version_path):
+                size = 0
+                for root, dirs, files in os.walk(version_path):
+                    size += sum(os.path.getsize(join_path(root, name)) for name in files)
+
+            return size, os.path.getmtime(version_path)
+
+        count = index.migrate(join_path(version_folder, 'comments.txt'), get_version_info)
+
+        log.info('Moved %s versions from comments.txt to %s' % (count, index.filepath))
+
+    def _get_saved_size(self, version_file):
+        manifest = self._read_manifest(self._get_manifest_path(version_file, get_dirname(version_file)))
+
+        if manifest:
+            return manifest['size']
+
+        if is_file(version_file):
+            return os.path.getsize(version_file)
+
+    def _get_comment_path(self):
+        folder = self._get_version_folder()
+
+        filepath = None
+
+        if folder:
+            filepath = join_path(folder, 'comments.txt')
+
+        return filepath
+
+    def _get_manifest_folder(self, version_folder=None):
+        if not version_folder:
+            version_folder = self._get_version_folder()
+
+        return join_path(version_folder, 'manifests')
+
+    def _get_manifest_path(self, version_filename, version_folder=None):
+        return join_path(self._get_manifest_folder(version_folder), '%s.json' % get_basename(version_filename))
+
+    def _get_manifest_version_numbers(self, version_folder=None):
+        manifest_folder = self._get_manifest_folder(version_folder)
+
+        numbers = []
+
+        if not os.path.isdir(manifest_folder):
+            return numbers
+
+        for filename in os.listdir(manifest_folder):
+            split_name = filename.split('.')
+
+            if len(split_name) != 3 or split_name[0] != self.version_name or split_name[2] != 'json':
+                continue
+
+            if split_name[1].isdigit():
+                numbers.append(int(split_name[1]))
+
+        numbers.sort()
+
+        return numbers
+
+    def _get_source_files(self):
+        """
+        Returns:
+            tuple: (files, folders) files is a list of [relative path, full path]. folders is a list of relative paths.
+        """
+
+        source = self._get_source()
+
+        if is_file(source):
+            return [[self.filename, source]], []
+
+        exclude = set(self.source_exclude)
+        exclude.add(self.version_folder_name)
+
+        files = []
+        folders = []
+
+        for root, dirs, filenames in os.walk(source):
+            dirs[:] = [folder for folder in dirs if folder not in exclude]
+            dirs.sort()
+
+            relative_root = fix_slashes(os.path.relpath(root, source))
+            if relative_root == '.':
+                relative_root = ''
+
+            for folder in dirs:
+                folders.append(join_path(relative_root, folder) if relative_root else folder)
+
+            filenames.sort()
+            for filename in filenames:
+                if filename in exclude:
+                    continue
+                relative_path = join_path(relative_root, filename) if relative_root else filename
+                files.append([relative_path, join_path(root, filename)])
+
+        return files, folders
+
+    def _get_latest_manifest(self, version_folder):
+        version_numbers = self._get_manifest_version_numbers(version_folder)
+
+        if not version_numbers:
+            return
+
+        manifest_path = self._get_manifest_path('%s.%s' % (self.version_name, version_numbers[-1]), version_folder)
+
+        return self._read_manifest(manifest_path)
+
+    def _read_manifest(self, manifest_path):
+        if not os.path.isfile(manifest_path):
+            return
+
+        with open(manifest_path, 'r') as manifest_file:
+            return json.load(manifest_file)
+
+    def _store_blobs(self, version_folder):
+        """
+        Add the files of the versioned file or folder to the blob store.
+        Files with the same size and modified time as in the latest manifest are not read again.
+
+        Returns:
+            dict: The manifest of the new version.
+        """
+
+        blob_store = BlobStore(version_folder)
+
+        previous_files = {}
+        previous_manifest = self._get_latest_manifest(version_folder)
+        if previous_manifest:
+            previous_files = previous_manifest.get('files', {})
+
+        files, folders = self._get_source_files()
+
+        manifest_files = {}
+        total_size = 0
+
+        for relative_path, filepath in files:
+            file_stat = os.stat(filepath)
+
+            previous = previous_files.get(relative_path)
+
+            if previous and previous['size'] == file_stat.st_size and previous['mtime'] == file_stat.st_mtime and \
+                    blob_store.has_blob(previous['hash']):
+                file_hash = previous['hash']
+            else:
+                file_hash = blob_store.add_file(filepath)
+
+            manifest_files[relative_path] = {'hash': file_hash,
+                                             'size': file_stat.st_size,
+                                             'mtime': file_stat.st_mtime}
+            total_size += file_stat.st_size
+
+        source_type = 'folder'
+        if is_file(self._get_source()):
+            source_type = 'file'
+
+        return {'type': source_type,
+                'files': manifest_files,
+                'folders': folders,
+                'size': total_size,
+                'time': time.time()}
+
+    def _build_version(self, filename, manifest, version_folder, allow_copy=False):
+        """
+        Create the version file or folder from blobs.
+
+        Args:
+            allow_copy (bool): Copy blobs that can not be hardlinked. Otherwise stop and remove the partial version.
+
+        Returns:
+            bool: Whether the version was built.
+        """
+
+        blob_store = BlobStore(version_folder)
+
+        if manifest['type'] == 'file':
+            targets = [[filename, file_entry['hash']] for file_entry in manifest['files'].values()]
+        else:
+            os.makedirs(filename)
+            for folder in manifest['folders']:
+                folder_path = join_path(filename, folder)
+                if not os.path.isdir(folder_path):
+                    os.makedirs(folder_path)
+
+            targets = [[join_path(filename, relative_path), file_entry['hash']]
+                       for relative_path, file_entry in manifest['files'].items()]
+
+        for target_path, file_hash in targets:
+            target_folder = get_dirname(target_path)
+            if target_folder and not os.path.isdir(target_folder):
+                os.makedirs(target_folder)
+
+            if blob_store.link_blob(file_hash, target_path):
+                continue
+
+            if not allow_copy:
+                if manifest['type'] == 'file':
+                    if os.path.isfile(filename):
+                        os.remove(filename)
+                else:
+                    shutil.rmtree(filename, ignore_errors=True)
+                return False
+
+            blob_store.copy_blob(file_hash, target_path)
+
+        return True
+
+    def _save(self, filename):
+
+        self._create_version_folder()
+        self._create_comment_file()
+
+        if not exists(self._get_source()):
+            return
+
+        if os.path.isfile(filename):
+            os.remove(filename)
+        elif os.path.isdir(filename):
+            shutil.rmtree(filename, onerror=delete_read_only_error)
+
+        manifest = self._store_blobs(self.version_folder)
+
+        manifest_path = self._get_manifest_path(filename, self.version_folder)
+        manifest_folder = get_dirname(manifest_path)
+        if not os.path.isdir(manifest_folder):
+            os.makedirs(manifest_folder)
+
+        self._write_manifest(manifest_path, manifest)
+
+        if not self._build_version(filename, manifest, self.version_folder):
+            log.info('Hardlinks not supported. Version %s is kept as a manifest.' % filename)
+
+    def _materialize(self, version_path):
+        """
+        Create a version that was saved only as a manifest.
+
+        Returns:
+            bool
+        """
+
+        version_folder = get_dirname(version_path)
+        manifest = self._read_manifest(self._get_manifest_path(version_path, version_folder))
 
-    def run(self, directory):
-        import time
-        path_to_watch = "."
-        before = dict([(f, None) for f in os.listdir(path_to_watch)])
+        if not manifest:
+            return False
 
-        while 1:
-            time.sleep(10)
+        if 'delta' in manifest:
+            text = self.get_version_text(int(get_basename(version_path).split('.')[-1]))
 
-            after = dict([(f, None) for f in os.listdir(path_to_watch)])
+            with open(version_path, 'wb') as version_file:
+                version_file.write(text.encode('utf-8'))
 
-            added = [f for f in after if f not in before]
-            removed = [f for f in before if f not in after]
+            return True
 
-            if added: util.show("Added: ", ", ".join(added))
-            if removed: util.show("Removed: ", ", ".join(removed))
+        return self._build_version(version_path, manifest, version_folder, allow_copy=True)
 
-            before = after
+    def _write_manifest(self, manifest_path, manifest):
+        temp_path = manifest_path + '.tmp'
 
+        with open(temp_path, 'w') as manifest_file:
+            json.dump(manifest, manifest_file, indent=4, sort_keys=True)
 
-class VersionFile(object):
-    """
-    Convenience to version a file or folder.
-    
-    Args:
-        filepath (str): The path to the file to version.
-    """
+        if os.path.isfile(manifest_path):
+            os.remove(manifest_path)
+        os.rename(temp_path, manifest_path)
 
-    def __init__(self, filepath):
-        self.filepath = filepath
+    def _get_blob_lines(self, blob_store, file_hash):
+        """
+        Returns:
+            list: The lines of a text blob with line endings. None if the blob is not utf-8 text.
+        """
 
-        if filepath:
-            self.filename = get_basename(self.filepath)
-            self.path = get_dirname(filepath)
+        try:
+            text = blob_store.get_data(file_hash).decode('utf-8')
+        except UnicodeDecodeError:
+            return
 
-        self.version_folder_name = '.version'
-        self.version_name = 'version'
-        self.version_folder = None
-        self.updated_old = False
+        return text.splitlines(True)
 
-    def _prep_directories(self):
-        self._create_version_folder()
-        self._create_comment_file()
+    def _get_referenced_hashes(self, version_folder):
+        """
+        Returns:
+            set: The hashes of the blobs used by any manifest in the version folder, including the default version.
+        """
 
-    def _create_version_folder(self):
+        manifest_folder = self._get_manifest_folder(version_folder)
 
-        self.version_folder = create_dir(self.version_folder_name, self.path)
+        referenced = set()
 
-    def _create_comment_file(self):
-        self.comment_file = create_file('comments.txt', self.version_folder)
+        if not os.path.isdir(manifest_folder):
+            return referenced
 
-    def _increment_version_file_name(self):
+        for filename in os.listdir(manifest_folder):
+            if not filename.endswith('.json'):
+                continue
 
-        path = join_path(self.version_folder, self.version_name + '.1')
+            manifest = self._read_manifest(join_path(manifest_folder, filename))
 
-        return inc_path_name(path)
+            if not manifest:
+                continue
 
-    def _default_version_file_name(self):
+            for file_entry in manifest.get('files', {}).values():
+                referenced.add(file_entry['hash'])
 
-        if not self.version_name:
+        return referenced
+
+    def _delta_previous_version(self, filename):
+        """
+        Store the version before filename as a delta to filename.
+        Versions that are a multiple of delta_keyframe stay whole so rebuilding never walks far.
+        """
+
+        if not is_file(self.filepath):
             return
 
-        version_folder = self._get_version_folder()
-        path = join_path(version_folder, self.version_name + '.default')
+        version_folder = self.version_folder
+        number = int(get_basename(filename).split('.')[-1])
 
-        return path
+        previous_numbers = [inc for inc in self._get_manifest_version_numbers(version_folder) if inc < number]
 
-    def _get_version_path(self, version_int):
-        path = join_path(self._get_version_folder(), self.version_name + '.' + str(version_int))
+        if not previous_numbers:
+            return
 
-        return path
+        previous_number = previous_numbers[-1]
 
-    def _get_version_number(self, filepath):
+        if self.delta_keyframe and not previous_number % self.delta_keyframe:
+            return
 
-        version_number = util.get_end_number(filepath)
+        previous_path = self._get_version_path(previous_number)
+        previous_manifest_path = self._get_manifest_path(previous_path, version_folder)
+        previous_manifest = self._read_manifest(previous_manifest_path)
+        manifest = self._read_manifest(self._get_manifest_path(filename, version_folder))
 
-        return version_number
+        if not previous_manifest or not manifest or 'delta' in previous_manifest:
+            return
 
-    def _get_version_folder(self):
-        if is_file(self.filepath):
-            dir_name = get_dirname(self.filepath)
-            path = join_path(dir_name, self.version_folder_name)
-        else:
-            path = join_path(self.filepath, self.version_folder_name)
-        return path
+        if len(previous_manifest['files']) != 1 or len(manifest['files']) != 1:
+            return
 
-    def _get_comment_path(self):
-        folder = self._get_version_folder()
+        name, previous_entry = list(previous_manifest['files'].items())[0]
+        previous_hash = previous_entry['hash']
+        file_hash = list(manifest['files'].values())[0]['hash']
 
-        filepath = None
+        blob_store = BlobStore(version_folder)
 
-        if folder:
-            filepath = join_path(folder, 'comments.txt')
+        previous_lines = self._get_blob_lines(blob_store, previous_hash)
+        lines = self._get_blob_lines(blob_store, file_hash)
 
-        return filepath
+        if previous_lines is None or lines is None:
+            return
 
-    def _save(self, filename):
+        previous_manifest['files'] = {}
+        previous_manifest['delta'] = {'base': number,
+                                      'name': name,
+                                      'ops': get_line_delta(lines, previous_lines)}
 
-        self._create_version_folder()
-        self._create_comment_file()
+        self._write_manifest(previous_manifest_path, previous_manifest)
 
-        if is_dir(self.filepath):
-            copy_dir(self.filepath, filename)
-        if is_file(self.filepath):
-            copy_file(self.filepath, filename)
+        if os.path.isfile(previous_path):
+            os.remove(previous_path)
+
+        if previous_hash in self._get_referenced_hashes(version_folder):
+            return
+
+        blob_store.remove_blob(previous_hash)
 
-    def save_comment(self, comment=None, version_file=None):
+    def _undelta_version(self, version_number):
+        """
+        Store a delta version whole again, so the version it depends on can be deleted.
+        """
+
+        version_folder = self._get_version_folder()
+        manifest_path = self._get_manifest_path(self._get_version_path(version_number), version_folder)
+        manifest = self._read_manifest(manifest_path)
+
+        if not manifest or 'delta' not in manifest:
+            return
+
+        text = self.get_version_text(version_number)
+        data = text.encode('utf-8')
+
+        file_hash = BlobStore(version_folder).add_data(data)
+
+        manifest['files'] = {manifest['delta']['name']: {'hash': file_hash,
+                                                         'size': len(data),
+                                                         'mtime': manifest['time']}}
+        manifest.pop('delta')
+
+        self._write_manifest(manifest_path, manifest)
+
+    def save_comment(self, comment=None, version_file=None, data=None):
         """
         Save a comment to a log file.
 
         Args:
             comment (str)
             version_file (str): The corresponding version file.
+            data (dict): Extra values to store with the comment. dict[name] = str
         """
         # TODO: Use splitext if the the version is being used as the extension.
         version = version_file.split('.')
@@ -278,18 +1884,37 @@ class VersionFile(object):
         if not comment:
             comment = '-'
 
+        index = self._get_index(self.version_folder or self._get_version_folder())
+        if not index.exists() and is_file(self.comment_file) and os.path.getsize(self.comment_file):
+            self._migrate_index(index)
+
+        if version.isdigit():
+            index_version = int(version)
+        else:
+            index_version = version
+
+        index.add(index_version, comment, user, self._get_saved_size(version_file), data=data)
+
         comment.replace('"', '\"')
 
-        write_lines(self.comment_file,
-                    ['version = %s; comment = "%s"; user = "%s"' % (version, comment, user)],
-                    append=True)
+        line = 'version = %s; comment = "%s"; user = "%s"' % (version, comment, user)
+
+        if data:
+            names = list(data.keys())
+            names.sort()
+            for name in names:
+                value = str(data[name]).replace('"', "'").replace(';', ',')
+                line += '; %s = "%s"' % (name, value)
 
-    def save(self, comment=None):
+        write_lines(self.comment_file, [line], append=True)
+
+    def save(self, comment=None, data=None):
         """
         Save a version.
         
         Args:
             comment (str): The comment to add to the version.
+            data (dict): Extra values to store with the comment, see get_version_value.
         
         Returns:
             str: The new version file name
@@ -307,7 +1932,14 @@ class VersionFile(object):
 
         self._save(inc_file_name)
 
-        self.save_comment(comment, inc_file_name)
+        if self.reverse_delta:
+            try:
+                self._delta_previous_version(inc_file_name)
+            except:
+                util.warning('Could not store the previous version of %s as a delta.' % self.filepath)
+                log.info(traceback.format_exc())
+
+        self.save_comment(comment, inc_file_name, data)
 
         return inc_file_name
 
@@ -378,7 +2010,7 @@ class VersionFile(object):
 
     def get_version_path(self, version_int):
         """
-        Get the path to a version.
+        Get the path to a version. A version that was saved only as a manifest is created first.
         
         Args:
             version_int (int): The version number.
@@ -386,7 +2018,111 @@ class VersionFile(object):
         Returns:
             str: The path to the version.
         """
-        return self._get_version_path(version_int)
+        path = self._get_version_path(version_int)
+
+        if not exists(path):
+            self._materialize(path)
+
+        return path
+
+    def get_manifest(self, version_int):
+        """
+        Returns:
+            dict: type, files, folders, size and time of the version. None if the version has no manifest.
+        """
+        return self._read_manifest(self._get_manifest_path(self._get_version_path(version_int)))
+
+    def set_source(self, source_path, exclude=None):
+        """
+        Save versions of source_path, while keeping them in the version folder of filepath.
+        Used to snapshot a folder without copying it next to the version folder first.
+        Files with the same size and modified time as in the last version are linked to the same blob, not read again.
+
+        Args:
+            source_path (str): The file or folder to version.
+            exclude (list): File and folder names to leave out of versions.
+        """
+        self.source_path = source_path
+        self.source_exclude = list(exclude or [])
+
+    def set_reverse_delta(self, bool_value):
+        """
+        Store older versions of a text file as the difference to the version after them.
+        Only the latest version and every delta_keyframe version are stored whole.
+        """
+        self.reverse_delta = bool_value
+
+    def get_version_text(self, version_int):
+        """
+        Get the contents of a text file version without creating the version file.
+
+        Returns:
+            str
+        """
+
+        version_folder = self._get_version_folder()
+        blob_store = BlobStore(version_folder)
+
+        deltas = []
+        number = version_int
+        manifest = self.get_manifest(number)
+
+        while manifest and 'delta' in manifest:
+            deltas.append(manifest['delta']['ops'])
+            number = manifest['delta']['base']
+            manifest = self.get_manifest(number)
+
+        if manifest:
+            lines = self._get_blob_lines(blob_store, list(manifest['files'].values())[0]['hash'])
+        else:
+            path = self._get_version_path(number)
+            if not is_file(path):
+                return
+            with open(path, 'rb') as version_file:
+                lines = version_file.read().decode('utf-8').splitlines(True)
+
+        for ops in reversed(deltas):
+            lines = apply_line_delta(lines, ops)
+
+        return ''.join(lines)
+
+    def get_version_diff(self, version_a, version_b=None, context=3):
+        """
+        Get a unified diff between two versions of a text file.
+
+        Args:
+            version_a (int): The older version.
+            version_b (int): The newer version. By default, the current file.
+            context (int): The number of unchanged lines around each change.
+
+        Returns:
+            list: The lines of the diff.
+        """
+
+        text_a = self.get_version_text(version_a) or ''
+        name_b = 'current'
+
+        if version_b is None:
+            with open(self.filepath, 'rb') as current_file:
+                text_b = current_file.read().decode('utf-8')
+        else:
+            text_b = self.get_version_text(version_b) or ''
+            name_b = 'version %s' % version_b
+
+        return list(difflib.unified_diff(text_a.splitlines(True), text_b.splitlines(True),
+                                         'version %s' % version_a, name_b, n=context))
+
+    def remove_unused_blobs(self):
+        """
+        Delete blobs that no manifest uses anymore.
+
+        Returns:
+            int: The number of bytes freed.
+        """
+
+        version_folder = self._get_version_folder()
+
+        return BlobStore(version_folder).remove_unreferenced(self._get_referenced_hashes(version_folder))
 
     def get_version_comment(self, version_int):
         """
@@ -401,77 +2137,108 @@ class VersionFile(object):
         comment, user = self.get_version_data(version_int)
         return comment
 
-    def get_organized_version_data(self):
+    def get_version_value(self, version_int, name):
         """
+        Get a value saved with a version, see save.
+
+        Args:
+            version_int (int): The version number.
+            name (str): The name of the value.
+
         Returns:
-            version, comment, user, file_size, modified, version_file
+            str: None if the version has no value with the name.
         """
 
-        log.info('Get organized version data')
-        versions = self.get_versions(return_version_numbers_also=True)
+        entry = self.get_version_entry(version_int)
 
-        if not versions:
+        if not entry:
             return
-        version_paths = None
-        version_numbers = None
-        if versions:
-            version_paths = versions[0]
-            version_numbers = versions[1]
 
-        filepath = self._get_comment_path()
+        return entry.get('data', {}).get(name)
 
-        if not filepath:
-            return []
+    def get_version_entry(self, version_int):
+        """
+        Returns:
+            dict: version, comment, user, size in bytes, time in seconds since the epoch and data.
+        """
 
-        datas = []
+        index = self.get_index()
 
-        if is_file(filepath):
+        if not index:
+            return
+
+        return index.get(version_int)
 
-            lines = get_file_lines(filepath)
+    def get_index(self):
+        """
+        Get the index of the version folder. An index is created from comments.txt the first time.
 
-            for line in lines:
+        Returns:
+            VersionIndex
+        """
 
-                line_info_dict = {}
-                version = None
-                comment = None
-                user = None
-                file_size = None
-                modified = None
+        version_folder = self._get_version_folder()
 
-                split_line = util.split_line(line, ';')
+        if not version_folder or not os.path.isdir(version_folder):
+            return
 
-                for sub_line in split_line:
+        index = self._get_index(version_folder)
 
-                    assignment = util.split_line(sub_line, '=')
+        if not index.exists():
+            comment_path = self._get_comment_path()
 
-                    if assignment and assignment[0]:
-                        name = assignment[0].strip()
-                        value = assignment[1].strip()
+            if is_file(comment_path) and os.path.getsize(comment_path):
+                self._migrate_index(index)
 
-                        line_info_dict[name] = value
+        return index
 
-                if 'version' not in line_info_dict:
-                    continue
+    def get_organized_version_data(self, start=0, count=None):
+        """
+        Args:
+            start (int): The index of the first version to get.
+            count (int): The number of versions to get. By default, all versions after start.
+
+        Returns:
+            version, comment, user, file_size, modified, version_file
+        """
 
-                version = int(line_info_dict['version'])
+        log.info('Get organized version data')
+        version_numbers = self.get_version_numbers()
 
-                if int(line_info_dict['version']) not in version_numbers:
-                    continue
+        if not version_numbers:
+            return
+
+        index = self.get_index()
+
+        if not index:
+            return []
+
+        version_numbers = set(version_numbers)
+        version_folder = self._get_version_folder()
+
+        entries = [entry for entry in index.get_entries() if entry['version'] in version_numbers]
+
+        if count is None:
+            entries = entries[start:]
+        else:
+            entries = entries[start:start + count]
+
+        datas = []
+
+        for entry in entries:
+            version = entry['version']
 
-                if 'comment' in line_info_dict:
-                    comment = line_info_dict['comment']
-                    comment = comment[1:-1]
-                if 'user' in line_info_dict:
-                    user = line_info_dict['user']
-                    user = user[1:-1]
+            file_size = None
+            if entry.get('size') is not None:
+                file_size = round(entry['size'] * 0.000001, 2)
 
-                version_file = version_paths[version]
-                version_file = join_path(self.filepath, '%s/%s' % (self.version_folder_name, version_file))
+            modified = None
+            if entry.get('time') is not None:
+                modified = format_date_time(datetime.datetime.fromtimestamp(entry['time']))
 
-                file_size = get_filesize(version_file)
-                modified = get_last_modified_date(version_file)
+            version_file = join_path(version_folder, '%s.%s' % (self.version_name, version))
 
-                datas.append([version, comment, user, file_size, modified, version_file])
+            datas.append([version, entry.get('comment'), entry.get('user'), file_size, modified, version_file])
 
         return datas
 
@@ -485,40 +2252,13 @@ class VersionFile(object):
         Returns:
             tuple: (comment, user)
         """
-        filepath = self._get_comment_path()
-
-        if not filepath:
-            return None, None
-
-        if is_file(filepath):
 
-            lines = get_file_lines(filepath)
+        entry = self.get_version_entry(version_int)
 
-            version = None
-            comment = None
-            user = None
-
-            for line in lines:
-
-                start_index = line.find('"')
-                if start_index > -1:
-                    end_index = line.find('";')
-
-                    subpart = line[start_index + 1:end_index]
-
-                    subpart = subpart.replace('"', '\\"')
-
-                    line = line[:start_index + 1] + subpart + line[end_index:]
-
-                try:
-                    exec(line)
-                except:
-                    pass
-
-                if version == version_int:
-                    return comment, user
+        if not entry:
+            return None, None
 
-        return None, None
+        return entry.get('comment'), entry.get('user')
 
     def get_version_numbers(self):
 
@@ -529,6 +2269,10 @@ class VersionFile(object):
         if not files:
             return
 
+        files += ['%s.%s' % (self.version_name, number)
+                  for number in self._get_manifest_version_numbers(version_folder)]
+        files = list(set(files))
+
         number_list = []
 
         for filepath in files:
@@ -571,6 +2315,10 @@ class VersionFile(object):
         if not files:
             return None
 
+        files += ['%s.%s' % (self.version_name, number)
+                  for number in self._get_manifest_version_numbers(version_folder)]
+        files = list(set(files))
+
         number_list = []
         pass_files = []
 
@@ -621,31 +2369,80 @@ class VersionFile(object):
         log.info('Get latest version')
         versions, version_numbers = self.get_versions(return_version_numbers_also=True)
 
-        latest_version = versions[version_numbers[-1]]
-
-        return join_path(self.filepath, '%s/%s' % (self.version_folder_name, latest_version))
+        return self.get_version_path(version_numbers[-1])
 
     def get_default(self):
         filename = self._default_version_file_name()
 
         return filename
 
-    def delete_version(self, version_number):
+    def delete_version(self, version_number, remove_unused_blobs=True):
+
+        previous_numbers = [inc for inc in self._get_manifest_version_numbers() if inc < version_number]
 
-        path = self.get_version_path(version_number)
+        if previous_numbers:
+            previous_manifest = self.get_manifest(previous_numbers[-1])
+
+            if previous_manifest and previous_manifest.get('delta', {}).get('base') == version_number:
+                self._undelta_version(previous_numbers[-1])
+
+        path = self._get_version_path(version_number)
 
         if is_file(path):
             delete_file(path)
-        else:
+        elif exists(path):
             delete_dir(path)
 
+        manifest_path = self._get_manifest_path(path)
+
+        if os.path.isfile(manifest_path):
+            os.remove(manifest_path)
+
+        index = self.get_index()
+        if index and index.get(version_number):
+            index.remove(version_number)
+
+        if remove_unused_blobs:
+            self.remove_unused_blobs()
+
+
+class SettingsBatch(object):
+    """
+    Buffer the writes of a SettingsFile and write once when the batch ends.
+    Batches can be nested, only the outer batch writes.
+    """
+
+    def __init__(self, settings):
+        self.settings = settings
+
+    def __enter__(self):
+        self.settings._batch_depth += 1
+        return self.settings
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.settings._batch_depth -= 1
+
+        if not self.settings._batch_depth:
+            self.settings.flush()
+
+        return False
+
 
 class SettingsFile(object):
+    """
+    Settings kept in a json file.
+
+    Every change is written with an atomic rename. Use batch to write many changes once,
+    or set_debounce to write a short time after the last change.
+    If the file was changed by someone else since it was read, changes are merged into it instead of replacing it.
+    revision goes up each time the settings are read again or merged from disk, so callers can tell their copies are stale.
+    """
 
     def __init__(self):
 
         self.directory = None
         self.filepath = None
+        self.revision = 0
 
         self.settings_dict = {}
         self.optional_dict = {}
@@ -653,6 +2450,15 @@ class SettingsFile(object):
         self.write = None
         self._has_json = None
 
+        self._batch_depth = 0
+        self._dirty = False
+        self._debounce = 0
+        self._debounce_timer = None
+        self._stat_key = None
+        self._changed = set()
+        self._cleared = False
+        self._lock = threading.RLock()
+
     def _get_json_file(self):
         directory = get_dirname(self.filepath)
 
@@ -698,6 +2504,7 @@ class SettingsFile(object):
         if not lines:
             return
 
+        self.revision += 1
         self.settings_dict = {}
         self.settings_order = []
 
@@ -732,9 +2539,14 @@ class SettingsFile(object):
             return
 
         self.filepath = filepath
+        self.revision += 1
 
         data = None
 
+        self._stat_key = self._get_stat_key(filepath)
+        self._changed = set()
+        self._cleared = False
+
         try:
             data = OrderedDict(get_json(filepath))
         except:
@@ -742,12 +2554,72 @@ class SettingsFile(object):
             self.settings_dict = {}
             return
 
-        self.settings_order = list(data.keys())
-        self.settings_dict = data
+        self.settings_order = list(data.keys())
+        self.settings_dict = data
+
+    def _get_stat_key(self, filepath):
+        try:
+            file_stat = os.stat(filepath)
+        except OSError:
+            return
+
+        return file_stat.st_mtime, file_stat.st_size
+
+    def _write(self):
+
+        with self._lock:
+            self._dirty = True
+
+            if self._batch_depth:
+                return
+
+            if self._debounce:
+                if self._debounce_timer:
+                    self._debounce_timer.cancel()
+
+                self._debounce_timer = threading.Timer(self._debounce, self.flush)
+                self._debounce_timer.daemon = True
+                self._debounce_timer.start()
+                return
+
+        self.flush()
+
+    def _merge_from_disk(self, filepath):
+        """
+        The file changed on disk since it was read. Keep the changes made here and take everything else from disk.
+        """
+
+        try:
+            disk_data = OrderedDict(get_json(filepath) or [])
+        except:
+            return
+
+        util.warning('Settings file changed on disk by another editor. Merging changes: %s' % filepath)
+
+        if self._cleared:
+            disk_data = OrderedDict()
+
+        settings_order = []
+        settings_dict = {}
+
+        for key in self.settings_order:
+            if key in self._changed:
+                settings_dict[key] = self.settings_dict[key]
+            elif key in disk_data:
+                settings_dict[key] = disk_data[key]
+            else:
+                continue
+
+            settings_order.append(key)
 
-    def _write(self):
+        for key in disk_data:
+            if key not in settings_dict:
+                settings_dict[key] = disk_data[key]
+                settings_order.append(key)
 
-        self._write_json()
+        self.settings_order = settings_order
+        self.settings_dict = settings_dict
+        self.revision += 1
 
     def _write_json(self):
 
@@ -756,27 +2628,40 @@ class SettingsFile(object):
         if not filepath:
             return
 
-        out_list = []
+        with FileLock(filepath):
+            stat_key = self._get_stat_key(filepath)
 
-        for key in self.settings_order:
-            value = self.settings_dict[key]
+            if self._stat_key is not None and stat_key is not None and stat_key != self._stat_key and stat_key[1]:
+                self._merge_from_disk(filepath)
+
+            out_list = []
+
+            for key in self.settings_order:
+                value = self.settings_dict[key]
 
-            out_list.append([key, value])
+                out_list.append([key, value])
 
-        out_data = OrderedDict(out_list)
+            out_data = OrderedDict(out_list)
 
-        set_json(filepath, list(out_data.items()))
+            set_json(filepath, list(out_data.items()), atomic=True)
+
+            self._stat_key = self._get_stat_key(filepath)
+        self._changed = set()
+        self._cleared = False
 
     def set(self, name, value):
 
         log.info('Set setting %s %s' % (name, value))
 
-        self.settings_dict[name] = value
+        with self._lock:
+            self.settings_dict[name] = value
+
+            if name not in self.settings_order:
+                self.settings_order.append(name)
 
-        if name not in self.settings_order:
-            self.settings_order.append(name)
+            self._changed.add(name)
 
-        self._write()
+            self._write()
 
     def get(self, name):
 
@@ -821,16 +2706,60 @@ class SettingsFile(object):
 
     def clear(self):
 
-        self.settings_dict = {}
-        self.settings_order = []
+        with self._lock:
+            self.settings_dict = {}
+            self.settings_order = []
+            self._changed = set()
+            self._cleared = True
 
-        self._write()
+            self._write()
 
     def reload(self):
 
+        self.flush()
         self._read_json()
 
+    def batch(self):
+        """
+        Write all changes once at the end.
+
+        Usage:
+            with settings.batch():
+                settings.set('a', 1)
+                settings.set('b', 2)
+        """
+        return SettingsBatch(self)
+
+    def set_debounce(self, seconds):
+        """
+        Write changes the given number of seconds after the last change, instead of on every change.
+        Good for interactive editors. Use 0 to write on every change again.
+        """
+
+        if not seconds:
+            self.flush()
+
+        self._debounce = seconds
+
+    def flush(self):
+        """
+        Write changes that are waiting on a batch or a debounce.
+        """
+
+        with self._lock:
+            if self._debounce_timer:
+                self._debounce_timer.cancel()
+                self._debounce_timer = None
+
+            if not self._dirty:
+                return
+
+            self._dirty = False
+            self._write_json()
+
     def set_directory(self, directory, filename='settings.json'):
+        self.flush()
+
         self.directory = directory
 
         self.filepath = join_path(self.directory, filename)
@@ -1115,147 +3044,673 @@ class ParsePython(object):
                             parent_scope = self.last_scope.parent
                         """
 
-            sub_scope = PythonScope(scope_name)
-            sub_scope.set_bracket(scope_bracket)
-            sub_scope.set_parent(parent_scope)
-            sub_scope.set_indent(indent)
-            sub_scope.set_scope_type(scope_type)
+            sub_scope = PythonScope(scope_name)
+            sub_scope.set_bracket(scope_bracket)
+            sub_scope.set_parent(parent_scope)
+            sub_scope.set_indent(indent)
+            sub_scope.set_scope_type(scope_type)
+
+            self.last_parent_scope = parent_scope
+            self.last_scope = sub_scope
+            self.indents.append(indent)
+
+            return True
+
+        return False
+
+
+class PythonScope(object):
+
+    def __init__(self, name):
+        self.name = name
+        self.parent = None
+        self.children = []
+
+        self.bracket_string = '()'
+        self.docstring = ''
+        self.scope_lines = []
+        self.scope_type = ''
+
+        self.indent = None
+
+    def set_scope_type(self, scope_type_name):
+        self.scope_type = scope_type_name
+
+    def set_bracket(self, bracket_string):
+        self.bracket_string = bracket_string
+
+    def set_scope_lines(self, lines):
+        self.scope_lines = lines
+
+    def set_parent(self, parent_scope):
+        self.parent = parent_scope
+        parent_scope.set_child(self)
+
+    def set_child(self, child_scope):
+        self.children.append(child_scope)
+
+    def set_indent(self, indent):
+        self.indent = indent
+
+
+class StatCache(object):
+    """
+    Stat and listdir results kept for the length of a with block.
+    While a StatCache is active, exists, is_dir, is_file, get_files, get_folders and get_files_and_folders reuse what was already found,
+    and listing a directory records what kind of thing each entry is, so checking those entries later does not stat them again.
+    Each thread has its own active cache, so a with block only affects the thread it runs in.
+    Paths created or removed through util_file, from any thread, are dropped from every active cache.
+
+    Usage:
+        with util_file.StatCache() as stat_cache:
+            refresh_things()
+        print(stat_cache.get_stats())
+    """
+
+    _local = threading.local()
+    _caches = []
+    _lock = threading.RLock()
+
+    def __init__(self):
+        self.kinds = {}
+        self.listings = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self):
+        local = StatCache._local
+        active = getattr(local, 'active', None)
+
+        if active:
+            local.depth += 1
+            return active
+
+        local.active = self
+        local.depth = 1
+
+        with StatCache._lock:
+            StatCache._caches.append(self)
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        local = StatCache._local
+        local.depth -= 1
+
+        if local.depth > 0:
+            return
+
+        with StatCache._lock:
+            if local.active in StatCache._caches:
+                StatCache._caches.remove(local.active)
+
+        local.active = None
+        local.depth = 0
+
+    @classmethod
+    def get_active(cls):
+        """
+        Returns:
+            StatCache: The cache of the current thread's with block, or None.
+        """
+        return getattr(cls._local, 'active', None)
+
+    @classmethod
+    def remove(cls, path):
+        """
+        Drop path, everything under it and the listings above it from every active cache.
+        """
+
+        if not cls._caches or not path:
+            return
+
+        path = os.path.normpath(path)
+
+        with cls._lock:
+            for cache in cls._caches:
+                cache._remove(path)
+
+    def _remove(self, path):
+        prefix = path.rstrip(os.sep) + os.sep
+
+        with StatCache._lock:
+            for found in [found for found in self.kinds if found == path or found.startswith(prefix)]:
+                self.kinds.pop(found, None)
+            for found in [found for found in self.listings if found == path or found.startswith(prefix)]:
+                self.listings.pop(found, None)
+
+            parent = os.path.dirname(path)
+
+            while parent:
+                self.listings.pop(parent, None)
+                if self.kinds.get(parent, True) is None:
+                    self.kinds.pop(parent)
+
+                next_parent = os.path.dirname(parent)
+                if next_parent == parent:
+                    break
+                parent = next_parent
+
+    @staticmethod
+    def _get_stat_kind(path):
+        try:
+            mode = os.stat(path).st_mode
+        except (OSError, ValueError):
+            return
+
+        if stat.S_ISDIR(mode):
+            return 'dir'
+        if stat.S_ISREG(mode):
+            return 'file'
+
+        return 'other'
+
+    @staticmethod
+    def _get_entry_kind(entry):
+        try:
+            if entry.is_dir():
+                return 'dir'
+            if entry.is_file():
+                return 'file'
+        except OSError:
+            return
+
+        return 'other'
+
+    def get_kind(self, path):
+        """
+        Returns:
+            str: 'dir', 'file' or 'other', or None if nothing is at path.
+        """
+
+        path = os.path.normpath(path)
+
+        with StatCache._lock:
+            if path in self.kinds:
+                self.hits += 1
+                return self.kinds[path]
+
+            if not util.is_windows():
+                names = self.listings.get(os.path.dirname(path))
+                if names is not None and os.path.basename(path) not in names:
+                    self.hits += 1
+                    self.kinds[path] = None
+                    return
+
+        kind = self._get_stat_kind(path)
+
+        with StatCache._lock:
+            self.misses += 1
+            self.kinds[path] = kind
+
+        return kind
+
+    def list_dir(self, directory, kind=None):
+        """
+        Args:
+            directory (str): The directory to list.
+            kind (str): Only return names of this kind: 'dir', 'file' or 'other'.
+
+        Returns:
+            list: The names in directory. Raises OSError like os.listdir if it can not be listed.
+        """
+
+        directory = os.path.normpath(directory)
+
+        with StatCache._lock:
+            names = self.listings.get(directory)
+            if names is not None:
+                self.hits += 1
+
+        if names is None:
+            names = self._list_dir(directory)
+
+        if not kind:
+            return list(names)
+
+        prefix = directory.rstrip(os.sep) + os.sep
+        kinds = self.kinds
+
+        found = []
+
+        for name in names:
+            path = prefix + name
+            if path in kinds:
+                name_kind = kinds[path]
+            else:
+                name_kind = self.get_kind(path)
+            if name_kind == kind:
+                found.append(name)
+
+        return found
+
+    def _list_dir(self, directory):
+
+        kinds = {}
+        names = []
+
+        if scandir:
+            prefix = directory.rstrip(os.sep) + os.sep
+            for entry in scandir(directory):
+                names.append(entry.name)
+                kinds[prefix + entry.name] = self._get_entry_kind(entry)
+        else:
+            names = os.listdir(directory)
+
+        with StatCache._lock:
+            self.misses += 1
+            self.kinds.update(kinds)
+            self.kinds[directory] = 'dir'
+            self.listings[directory] = names
+
+        return names
+
+    def get_stats(self):
+        """
+        Returns:
+            dict: hits are checks answered from the cache, which is the number of syscalls saved. misses are checks that had to go to disk.
+        """
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'paths': len(self.kinds),
+                'directories': len(self.listings)}
+
+
+class ReadCache(object):
+    """
+    Cache of parsed json files. Entries are keyed by path and checked against the modified time and size
+    of the file on every read, so a changed file is read again.
+    The least recently used entries are dropped once max_entries or max_bytes is passed.
+    Paths added with cache_read_data stay opted in, so get_json caches them again after they are dropped.
+    """
+
+    read_files = OrderedDict()
+    max_entries = 256
+    max_bytes = 64 * 1024 * 1024
+
+    hits = 0
+    misses = 0
+
+    _stat_keys = {}
+    _sizes = {}
+    _bytes = 0
+    _paths = set()
+    _lock = threading.RLock()
+
+    @classmethod
+    def _get_stat_key(cls, path):
+        try:
+            file_stat = os.stat(path)
+        except OSError:
+            return
+
+        return file_stat.st_mtime, file_stat.st_size
+
+    @classmethod
+    def _trim(cls):
+        while cls.read_files and (len(cls.read_files) > cls.max_entries or cls._bytes > cls.max_bytes):
+            path = next(iter(cls.read_files))
+            cls._remove(path)
+
+    @classmethod
+    def _remove(cls, path):
+        cls.read_files.pop(path, None)
+        cls._stat_keys.pop(path, None)
+        cls._bytes -= cls._sizes.pop(path, 0)
+
+    @classmethod
+    def is_read(cls, path):
+        """
+        Whether the cache has current data for path. Stale entries are removed.
+        """
+
+        with cls._lock:
+            if path not in cls.read_files:
+                return False
+
+            if cls._stat_keys.get(path) != cls._get_stat_key(path):
+                log.info('Cache out of date %s' % path)
+                cls._remove(path)
+                return False
+
+            return True
+
+    @classmethod
+    def get_read_data(cls, path):
+        """
+        Returns:
+            The cached data, or None if the cache has no current data for path.
+        """
+
+        with cls._lock:
+            if not cls.is_read(path):
+                cls.misses += 1
+                return
+
+            cls.hits += 1
+
+            data = cls.read_files.pop(path)
+            cls.read_files[path] = data
+
+            return data
+
+    @classmethod
+    def set_read_data(cls, path, data, stat_key=None):
+        log.info('Caching %s' % path)
+
+        if stat_key is None:
+            stat_key = cls._get_stat_key(path)
+
+        if stat_key is None:
+            return
+
+        with cls._lock:
+            cls._remove(path)
+
+            cls.read_files[path] = data
+            cls._stat_keys[path] = stat_key
+            cls._sizes[path] = stat_key[1]
+            cls._bytes += stat_key[1]
+
+            cls._trim()
+
+    @classmethod
+    def remove_read_data(cls, path):
+        """
+        Drop path from the cache and stop caching it.
+        """
+        log.info('Cache removed %s' % path)
+
+        with cls._lock:
+            cls._remove(path)
+            cls._paths.discard(path)
+
+    @classmethod
+    def is_cached_path(cls, path):
+        """
+        Whether path was added with cache_read_data, even if its data has since been dropped.
+        """
+        return path in cls._paths or path in cls.read_files
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._paths.clear()
+            cls.read_files.clear()
+            cls._stat_keys.clear()
+            cls._sizes.clear()
+            cls._bytes = 0
+
+    @classmethod
+    def get_stats(cls):
+        """
+        Returns:
+            dict: entries, bytes, hits and misses
+        """
+
+        with cls._lock:
+            return {'entries': len(cls.read_files),
+                    'bytes': cls._bytes,
+                    'hits': cls.hits,
+                    'misses': cls.misses}
+
+    @classmethod
+    def cache_read_data(cls, path):
+        """
+        Read a json file into the cache. get_json uses the cache for this path while the file does not change.
+        """
+
+        if not path:
+            return
+
+        with cls._lock:
+            cls._paths.add(path)
+
+        if cls.is_read(path):
+            return
+
+        log.info('Caching %s' % path)
+        file_data = None
+
+        if path.endswith('.json'):
+            stat_key = cls._get_stat_key(path)
+            file_data = _read_json(path)
+
+            if file_data:
+                cls.set_read_data(path, file_data, stat_key)
+
+
+class FileLock(object):
+    """
+    An advisory lock on a file, held for the length of a with block.
+    It uses flock on Linux and Mac, and msvcrt on Windows.
+    The lock is taken on a hidden .lock file next to the file, so it still holds when the file is replaced by a rename.
+    Many shared locks can be held at once. An exclusive lock waits until no other lock is held.
+    Only code that also uses FileLock is kept out.
+
+    Usage:
+        with util_file.FileLock(filepath):
+            write_things(filepath)
+
+    Args:
+        filepath (str): The file to lock.
+        exclusive (bool): Exclusive for writing, or shared for reading.
+        timeout (float): Seconds to wait for the lock. None waits until it is free. If it times out, a warning is given and the block runs without the lock.
+    """
+
+    retry_seconds = 0.002
+    max_retry_seconds = 0.05
+
+    def __init__(self, filepath, exclusive=True, timeout=30.0):
+        self.filepath = filepath
+        self.exclusive = exclusive
+        self.timeout = timeout
+
+        self.locked = False
+
+        self._file = None
 
-            self.last_parent_scope = parent_scope
-            self.last_scope = sub_scope
-            self.indents.append(indent)
+    def __enter__(self):
+        self.acquire()
+        return self
 
-            return True
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
 
-        return False
+    def get_lock_path(self):
+        return join_path(get_dirname(self.filepath), '.%s.lock' % get_basename(self.filepath))
 
+    def _try_lock(self, lock_file, block):
+        if fcntl:
+            flags = fcntl.LOCK_EX if self.exclusive else fcntl.LOCK_SH
+            if not block:
+                flags |= fcntl.LOCK_NB
+            try:
+                fcntl.flock(lock_file.fileno(), flags)
+            except (IOError, OSError):
+                return False
+            return True
 
-class PythonScope(object):
+        if msvcrt:
+            try:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            except (IOError, OSError):
+                return False
+            return True
 
-    def __init__(self, name):
-        self.name = name
-        self.parent = None
-        self.children = []
+        return True
 
-        self.bracket_string = '()'
-        self.docstring = ''
-        self.scope_lines = []
-        self.scope_type = ''
+    def _unlock(self, lock_file):
+        try:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            elif msvcrt:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        except (IOError, OSError):
+            pass
 
-        self.indent = None
+    def _is_current(self, lock_file, lock_path):
+        """
+        The lock file can be removed by the last holder while this waits on it. Then this holds a lock nobody else sees.
+        """
+        if not fcntl:
+            return True
 
-    def set_scope_type(self, scope_type_name):
-        self.scope_type = scope_type_name
+        try:
+            return os.fstat(lock_file.fileno()).st_ino == os.stat(lock_path).st_ino
+        except OSError:
+            return False
 
-    def set_bracket(self, bracket_string):
-        self.bracket_string = bracket_string
+    def acquire(self):
+        """
+        Returns:
+            bool: Whether the lock was taken.
+        """
 
-    def set_scope_lines(self, lines):
-        self.scope_lines = lines
+        if self.locked:
+            return True
 
-    def set_parent(self, parent_scope):
-        self.parent = parent_scope
-        parent_scope.set_child(self)
+        lock_path = self.get_lock_path()
 
-    def set_child(self, child_scope):
-        self.children.append(child_scope)
+        start = time.time()
+        wait = self.retry_seconds
+        warned = False
 
-    def set_indent(self, indent):
-        self.indent = indent
+        while True:
+            try:
+                lock_file = open(lock_path, 'a+')
+            except (IOError, OSError):
+                util.warning('Could not open lock file: %s' % lock_path)
+                return False
 
+            block = self.timeout is None and fcntl is not None
 
-class ReadCache(object):
-    read_files = {}
+            if self._try_lock(lock_file, block):
+                if self._is_current(lock_file, lock_path):
+                    self._file = lock_file
+                    self.locked = True
+                    return True
 
-    @classmethod
-    def is_read(cls, path):
+                self._unlock(lock_file)
+                lock_file.close()
+                continue
 
-        if path in ReadCache.read_files:
-            return True
+            lock_file.close()
 
-        return False
+            seconds = time.time() - start
 
-    @classmethod
-    def set_read_data(cls, path, data):
-        log.info('Caching %s' % path)
-        cls.read_files[path] = data
+            if not warned:
+                util.show('waiting... to use file: %s' % self.filepath)
+                warned = True
 
-    @classmethod
-    def remove_read_data(cls, path):
-        log.info('Cache removed %s' % path)
-        if path in cls.read_files:
-            cls.read_files.pop(path, None)
+            if self.timeout is not None and seconds >= self.timeout:
+                util.warning('Timed out waiting for lock on file: %s' % self.filepath)
+                return False
 
-    @classmethod
-    def cache_read_data(cls, path):
+            time.sleep(wait)
+            wait = min(wait * 2, self.max_retry_seconds)
 
-        if not path:
+    def release(self):
+
+        if not self.locked:
             return
 
-        log.info('Caching %s' % path)
-        file_data = None
+        lock_file = self._file
+        lock_path = self.get_lock_path()
 
-        if path.endswith('.json'):
-            file_data = get_json(path)
+        self._file = None
+        self.locked = False
 
-        if file_data:
-            cls.read_files[path] = file_data
+        if fcntl:
+            remove = self.exclusive
+            if not remove:
+                try:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    remove = True
+                except (IOError, OSError):
+                    pass
+
+            if remove and self._is_current(lock_file, lock_path):
+                try:
+                    os.remove(lock_path)
+                except OSError:
+                    pass
+
+        self._unlock(lock_file)
+        lock_file.close()
+
+        if not fcntl:
+            try:
+                os.remove(lock_path)
+            except OSError:
+                pass
 
 
 def is_locked(filepath):
-    if exists(get_lock_name(filepath)):
-        return True
+    """
+    Whether another FileLock holds an exclusive lock on the file.
+    """
 
-    return False
+    file_lock = FileLock(filepath, exclusive=False, timeout=0)
+
+    if not exists(file_lock.get_lock_path()):
+        return False
+
+    if fcntl:
+        try:
+            with open(file_lock.get_lock_path(), 'a+') as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_SH | fcntl.LOCK_NB)
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+        except (IOError, OSError):
+            return True
+
+        return False
+
+    return True
 
 
 def lock(filepath):
-    lock_name = get_lock_name(filepath)
+    """
+    Returns:
+        FileLock: An exclusive lock on the file. Give it to remove_lock when done.
+    """
+    file_lock = FileLock(filepath)
+    file_lock.acquire()
 
-    create_file(lock_name)
+    return file_lock
 
 
-def remove_lock(filepath):
-    lock = get_lock_name(filepath)
-    # if is_locked(filepath):
-    delete_file(lock)
+def remove_lock(file_lock):
+    if isinstance(file_lock, FileLock):
+        file_lock.release()
 
 
 def get_lock_name(filepath):
-    return filepath + '.lock'
+    return FileLock(filepath).get_lock_path()
 
 
 def queue_file_access(func):
+    """
+    Decorator that holds an exclusive FileLock on the first argument while the function runs.
+    """
 
+    @wraps(func)
     def wrapper(*args, **kwargs):
 
         filepath = args[0]
 
-        inc = 0
-        while is_locked(args[0]):
-            if inc == 0:
-                util.show('waiting... to use file: %s' % filepath)
-
-            if inc == 400:
-                util.show('still waiting... to use file: %s' % filepath)
-
-            if inc == 800:
-                remove_lock(filepath)
-
-            time.sleep(0.005)
-            inc += 1
-
-        lock(filepath)
-
         result = None
 
-        try:
-            result = func(*args, **kwargs)
-        except:
-            status = traceback.format_exc()
-            util.error(status)
+        with FileLock(filepath):
+            try:
+                result = func(*args, **kwargs)
+            except:
+                status = traceback.format_exc()
+                util.error(status)
 
-        remove_lock(filepath)
         return result
 
     return wrapper
@@ -1362,7 +3817,12 @@ def get_files(directory, filter_text=''):
         list: A list of files in the directory.
     """
 
-    files = os.listdir(directory)
+    stat_cache = StatCache.get_active()
+
+    if stat_cache:
+        files = stat_cache.list_dir(directory)
+    else:
+        files = os.listdir(directory)
 
     found = []
 
@@ -1536,8 +3996,13 @@ def get_folders(directory, recursive=False, filter_text='', skip_dot_prefix=Fals
     else:
         # files = None
 
+        stat_cache = StatCache.get_active()
+
         try:
-            found_folders = next(os.walk(directory))[1]
+            if stat_cache:
+                found_folders = stat_cache.list_dir(directory, 'dir')
+            else:
+                found_folders = next(os.walk(directory))[1]
         except:
             found_folders = []
 
@@ -1555,8 +4020,13 @@ def get_files_and_folders(directory):
         list: A list of files and folders in the directory.
     """
 
+    stat_cache = StatCache.get_active()
+
     try:
-        files = os.listdir(directory)
+        if stat_cache:
+            files = stat_cache.list_dir(directory)
+        else:
+            files = os.listdir(directory)
     except:
         files = []
 
@@ -1647,84 +4117,360 @@ def get_files_with_extension(extension, directory, fullpath=False, filter_text='
     Returns:
         list: A list of files with the extension.
     """
-    found = []
+    found = []
+
+    try:
+        objects = os.listdir(directory)
+    except:
+        return found
+
+    for filename_and_extension in objects:
+        _, test_extension = os.path.splitext(filename_and_extension)
+
+        if filter_text and filename_and_extension.find(filter_text) == -1:
+            continue
+
+        if not extension.startswith('.'):
+            extension = '.' + extension
+
+        if extension == test_extension:
+            if fullpath:
+                found.append(join_path(directory, filename_and_extension))
+            else:
+                found.append(filename_and_extension)
+
+    return found
+
+
+def get_size(path, round_value=2):
+    size = 0
+
+    if is_dir(path):
+        size = get_folder_size(path, round_value)
+    if is_file(path):
+        size = get_filesize(path, round_value)
+
+    return size
+
+
+def get_filesize(filepath, round_value=2):
+    """
+    Get the size of a file.
+    
+    Args:
+        filepath (str): TODO: Fill in description.
+        round_value (int): TODO: Fill in description.
+        
+    Return
+        float: The size of the file specified by filepath.
+    """
+
+    size = os.path.getsize(filepath)
+    size_format = round(size * 0.000001, round_value)
+
+    return size_format
+
+
+def get_file_hash(filepath, chunk_size=1048576):
+    """
+    Get a hash of the contents of a file. The file is read in chunks so large files are not loaded whole.
+
+    Args:
+        filepath (str): The file to hash.
+        chunk_size (int): The number of bytes to read at a time.
+
+    Returns:
+        str: sha1 hex digest of the file contents.
+    """
+
+    hash_inst = hashlib.sha1()
+
+    with open(filepath, 'rb') as open_file:
+        chunk = open_file.read(chunk_size)
+        while chunk:
+            hash_inst.update(chunk)
+            chunk = open_file.read(chunk_size)
+
+    return hash_inst.hexdigest()
+
+
+class FolderSizeService(object):
+    """
+    Finds folder sizes by listing folders with scandir on a WorkerPool, one level at a time.
+    What each folder holds is cached and reused while the modified time of the folder stays the same.
+    Adding, removing or renaming a file changes the modified time of its folder. A file changed in place does not, so its new size shows once something else in the folder changes.
+    That is fine for the version and maintenance views. Use cache=False where sizes have to be exact.
+    Files with more than one hardlink, like version files linked to their blobs, are counted once per request.
+
+    Args:
+        max_workers (int): Threads to list folders with.
+        cache (bool): Reuse cached folders. With False every folder is listed again, and the cache is updated with what is found.
+    """
+
+    max_entries = 200000
+
+    # directory: [mtime, bytes of files, {file name: size}, [sub folder names], {file name: (device, inode)}]
+    _entries = OrderedDict()
+    _lock = threading.RLock()
+
+    hits = 0
+    misses = 0
+
+    def __init__(self, max_workers=None, cache=True):
+        self.max_workers = max_workers
+        self.cache = cache
+
+    def _read(self, directory):
+        return self._read_directory(directory, self.cache)
+
+    @classmethod
+    def _read_directory(cls, directory, use_cache=True):
+        try:
+            mtime = os.stat(directory).st_mtime
+        except OSError:
+            return
+
+        if use_cache:
+            with cls._lock:
+                entry = cls._entries.get(directory)
+                if entry and entry[0] == mtime:
+                    cls.hits += 1
+                    return entry
+
+        file_bytes = 0
+        files = {}
+        folders = []
+        links = {}
+
+        try:
+            iterator = scandir(directory) if scandir else None
+        except OSError:
+            return
+
+        if iterator is not None:
+            for child in iterator:
+                try:
+                    if child.is_dir(follow_symlinks=False):
+                        folders.append(child.name)
+                        continue
+                    file_stat = child.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                files[child.name] = file_stat.st_size
+                file_bytes += file_stat.st_size
+                if file_stat.st_nlink > 1:
+                    links[child.name] = (file_stat.st_dev, file_stat.st_ino)
+        else:
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                return
+            for name in names:
+                child_path = os.path.join(directory, name)
+                if os.path.isdir(child_path) and not os.path.islink(child_path):
+                    folders.append(name)
+                    continue
+                try:
+                    file_stat = os.lstat(child_path)
+                except OSError:
+                    continue
+                files[name] = file_stat.st_size
+                file_bytes += file_stat.st_size
+                if file_stat.st_nlink > 1:
+                    links[name] = (file_stat.st_dev, file_stat.st_ino)
+
+        entry = [mtime, file_bytes, files, folders, links]
+
+        with cls._lock:
+            cls.misses += 1
+            cls._entries.pop(directory, None)
+            cls._entries[directory] = entry
+
+            while len(cls._entries) > cls.max_entries:
+                cls._entries.popitem(last=False)
+
+        return entry
+
+    def get_size_bytes(self, path, skip_names=None, progress_function=None, is_cancelled=None):
+        """
+        Args:
+            path (str): A folder or file.
+            skip_names (list): File and folder names to leave out, like ['.version']. Folders with these names are skipped with everything under them.
+            progress_function: Called with (path, bytes so far) after a level of folders adds to the size.
+            is_cancelled: Called after each level. Stop and return what was found so far if it returns True.
+
+        Returns:
+            int: The size in bytes.
+        """
+
+        path = fix_slashes(path)
+
+        if not os.path.isdir(path):
+            try:
+                return os.path.getsize(path)
+            except OSError:
+                return 0
+
+        skip_names = set(util.convert_to_sequence(skip_names or []))
+
+        total = 0
+        reported = 0
+        level = [path]
+        linked = set()
+
+        with util.WorkerPool(self.max_workers) as pool:
+            while level:
+                entries = pool.map(self._read, level)
+
+                next_level = []
+
+                for directory, entry in zip(level, entries):
+                    if not entry:
+                        continue
+
+                    total += entry[1]
+
+                    if skip_names:
+                        for name in skip_names:
+                            if name in entry[2]:
+                                total -= entry[2][name]
+
+                    for name, inode in entry[4].items():
+                        if name in skip_names:
+                            continue
+                        if inode in linked:
+                            total -= entry[2][name]
+                        else:
+                            linked.add(inode)
+
+                    for name in entry[3]:
+                        if name in skip_names:
+                            continue
+                        next_level.append(directory + '/' + name)
+
+                level = next_level
+
+                if progress_function and level and total != reported:
+                    progress_function(path, total)
+                    reported = total
+
+                if is_cancelled and is_cancelled():
+                    break
+
+        return total
+
+    def request(self, paths, function, skip_names=None, round_value=2):
+        """
+        Find sizes on a background thread.
+        function is called from that thread with (path, size in MB, finished) as sizes come in. Big folders report partial sizes with finished False first.
+        UI code should pass the results on to the main thread.
+
+        Returns:
+            FolderSizeRequest: Call cancel on it to stop.
+        """
+
+        size_request = FolderSizeRequest(self, paths, function, skip_names, round_value)
+        size_request.start()
+
+        return size_request
+
+    @classmethod
+    def clear(cls, directory=None):
+        """
+        Forget cached folders under directory, or all of them.
+        """
+
+        with cls._lock:
+            if not directory:
+                cls._entries.clear()
+                return
+
+            directory = fix_slashes(directory)
+            for key in list(cls._entries.keys()):
+                if key == directory or key.startswith(directory + '/'):
+                    cls._entries.pop(key)
+
+    @classmethod
+    def get_stats(cls):
+        return {'directories': len(cls._entries), 'hits': cls.hits, 'misses': cls.misses}
+
+
+class FolderSizeRequest(threading.Thread):
+    """
+    Finds the sizes of paths one after the other and reports them to a function. Made by FolderSizeService.request
+    """
 
-    try:
-        objects = os.listdir(directory)
-    except:
-        return found
+    def __init__(self, service, paths, function, skip_names=None, round_value=2):
+        super(FolderSizeRequest, self).__init__()
 
-    for filename_and_extension in objects:
-        _, test_extension = os.path.splitext(filename_and_extension)
+        self.daemon = True
 
-        if filter_text and filename_and_extension.find(filter_text) == -1:
-            continue
+        self.service = service
+        self.paths = list(paths)
+        self.function = function
+        self.skip_names = skip_names
+        self.round_value = round_value
 
-        if not extension.startswith('.'):
-            extension = '.' + extension
+        self._cancelled = False
 
-        if extension == test_extension:
-            if fullpath:
-                found.append(join_path(directory, filename_and_extension))
-            else:
-                found.append(filename_and_extension)
+    def _to_mb(self, size):
+        return round(size * 0.000001, self.round_value)
 
-    return found
+    def _report(self, path, size, finished):
+        try:
+            self.function(path, self._to_mb(size), finished)
+        except Exception:
+            util.error(traceback.format_exc())
 
+    def cancel(self):
+        self._cancelled = True
 
-def get_size(path, round_value=2):
-    size = 0
+    def is_cancelled(self):
+        return self._cancelled
 
-    if is_dir(path):
-        size = get_folder_size(path, round_value)
-    if is_file(path):
-        size = get_filesize(path, round_value)
+    def run(self):
 
-    return size
+        for path in self.paths:
+            if self._cancelled:
+                return
 
+            def progress(sub_path, size, path=path):
+                if not self._cancelled:
+                    self._report(path, size, False)
 
-def get_filesize(filepath, round_value=2):
-    """
-    Get the size of a file.
-    
-    Args:
-        filepath (str): TODO: Fill in description.
-        round_value (int): TODO: Fill in description.
-        
-    Return
-        float: The size of the file specified by filepath.
-    """
+            size = self.service.get_size_bytes(path, self.skip_names, progress, self.is_cancelled)
 
-    size = os.path.getsize(filepath)
-    size_format = round(size * 0.000001, round_value)
+            if not self._cancelled:
+                self._report(path, size, True)
 
-    return size_format
 
+_folder_size_service = None
 
-def get_folder_size(path, round_value=2, skip_names=None):
+
+def get_folder_size_service():
     """
-    skip_names will skip folders and files that have the same name specified in skip_names list.
+    Returns:
+        FolderSizeService: The cached service used by the version and maintenance views.
     """
-    if skip_names is None:
-        skip_names = []
-    size = 0
 
-    skip_names = util.convert_to_sequence(skip_names)
+    global _folder_size_service
 
-    for root, dirs, files in os.walk(path):
+    if _folder_size_service is None:
+        _folder_size_service = FolderSizeService()
 
-        root_name = get_basename(root)
-        if root_name in skip_names:
-            continue
+    return _folder_size_service
 
-        for name in files:
 
-            if name in skip_names:
-                continue
+def get_folder_size(path, round_value=2, skip_names=None):
+    """
+    Get the size of a folder in MB. Every folder is listed again, so files changed in place are counted at their new size.
+
+    skip_names will skip folders and files that have the same name specified in skip_names list.
+    """
 
-            size += get_filesize(join_path(root, name), round_value)
+    size = FolderSizeService(cache=False).get_size_bytes(path, skip_names)
 
-    return size
+    return round(size * 0.000001, round_value)
 
 
 def format_date_time(python_date_time_value, separators=True):
@@ -1854,10 +4600,30 @@ def get_file_lines(filepath):
 
 
 # @queue_file_access
-def set_json(filepath, data, append=False):
+def set_json(filepath, data, append=False, atomic=False):
+    """
+    Args:
+        filepath (str)
+        data: Anything json can write.
+        append (bool): Add to the end of the file.
+        atomic (bool): Write to a temporary file and rename it over filepath,
+            so the file is never left half written. Not used with append.
+    """
     get_permission(filepath)
 
     log.info('Writing json %s' % filepath)
+
+    if atomic and not append:
+        try:
+            text = json.dumps(data, indent=4, sort_keys=True, separators=(',', ':'))
+        except:
+            util.error(traceback.format_exc())
+            util.warning('Trouble writing json file: %s' % filepath)
+            return
+
+        write_replace(filepath, text)
+        return
+
     write_mode = 'w'
     if append:
         write_mode = 'a'
@@ -1870,12 +4636,165 @@ def set_json(filepath, data, append=False):
             util.warning('Trouble writing json file: %s' % util.show(filepath))
 
 
+def replace_file(source_filepath, filepath):
+    """
+    Rename source_filepath over filepath in one step where the os allows it.
+    """
+
+    if hasattr(os, 'replace'):
+        os.replace(source_filepath, filepath)
+        return
+
+    if util.is_windows() and os.path.isfile(filepath):
+        os.remove(filepath)
+
+    os.rename(source_filepath, filepath)
+
+
+class AtomicWrite(object):
+    """
+    Write to a temporary file next to filepath, and rename it over filepath when the with block finishes without error.
+    Readers see either the old file or the new file, never a partial one. On error the temporary file is removed and filepath is left as it was.
+
+    Usage:
+        with util_file.AtomicWrite(filepath, 'wb') as open_file:
+            open_file.write(data)
+
+    Args:
+        filepath (str): The file to write.
+        mode (str): 'w' or 'wb'.
+        lock (bool): Hold an exclusive FileLock on filepath while writing.
+    """
+
+    def __init__(self, filepath, mode='w', lock=False):
+        self.filepath = filepath
+        self.mode = mode
+        self.lock = lock
+
+        self.temp_path = None
+
+        self._file = None
+        self._file_lock = None
+
+    def __enter__(self):
+
+        if self.lock:
+            self._file_lock = FileLock(self.filepath)
+            self._file_lock.acquire()
+
+        directory = get_dirname(self.filepath) or '.'
+
+        try:
+            temp_handle, self.temp_path = tempfile.mkstemp(prefix='.%s.' % get_basename(self.filepath),
+                                                           suffix='.tmp', dir=directory)
+            self._file = os.fdopen(temp_handle, self.mode)
+        except:
+            self._release_lock()
+            raise
+
+        return self._file
+
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        try:
+            if exc_type is None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            self._file.close()
+
+            if exc_type is None:
+                if os.path.isfile(self.filepath):
+                    shutil.copymode(self.filepath, self.temp_path)
+                else:
+                    os.chmod(self.temp_path, 0o666 & ~get_umask())
+
+                replace_file(self.temp_path, self.filepath)
+                StatCache.remove(self.filepath)
+        except:
+            self._remove_temp()
+            self._release_lock()
+            raise
+
+        if exc_type is not None:
+            self._remove_temp()
+
+        self._release_lock()
+
+    def _remove_temp(self):
+        if self.temp_path and os.path.isfile(self.temp_path):
+            os.remove(self.temp_path)
+
+    def _release_lock(self):
+        if self._file_lock:
+            self._file_lock.release()
+            self._file_lock = None
+
+
+def get_umask():
+    """
+    The process umask, read once and kept.
+    os.umask can only be read by setting it, so it is read under a lock.
+
+    Returns:
+        int
+    """
+
+    global _umask
+
+    if _umask is None:
+        with _umask_lock:
+            if _umask is None:
+                _umask = os.umask(0o022)
+                os.umask(_umask)
+
+    return _umask
+
+
+_umask = None
+_umask_lock = threading.Lock()
+
+
+def write_replace(filepath, text, lock=False):
+    """
+    Write text to a temporary file next to filepath, then rename it over filepath.
+    Readers see either the old file or the new file, never a partial one.
+    Raises OSError if the file could not be written, and leaves filepath as it was.
+
+    Args:
+        filepath (str)
+        text (str): Text, or bytes to write in binary.
+        lock (bool): Hold an exclusive FileLock on filepath while writing.
+    """
+
+    mode = 'w'
+    if isinstance(text, bytes) and not isinstance(text, str):
+        mode = 'wb'
+
+    with AtomicWrite(filepath, mode, lock=lock) as open_file:
+        open_file.write(text)
+
+
 # @queue_file_access
 def get_json(filepath):
-    if ReadCache.is_read(filepath):
-        log.info('Skipping reading %s' % filepath)
-        return ReadCache.read_files[filepath]
+    if ReadCache.is_cached_path(filepath):
+        data = ReadCache.get_read_data(filepath)
+
+        if data is not None:
+            log.info('Skipping reading %s' % filepath)
+            return data
+
+        stat_key = ReadCache._get_stat_key(filepath)
+        data = _read_json(filepath)
+
+        if data:
+            ReadCache.set_read_data(filepath, data, stat_key)
+
+        return data
+
+    return _read_json(filepath)
 
+
+def _read_json(filepath):
     log.info('Reading json %s' % filepath)
 
     if os.stat(filepath).st_size == 0:
@@ -1898,18 +4817,26 @@ def exists(directory, case_sensitive=False):
     if not directory:
         return False
 
-    log.debug('exists: %s' % directory)
+    log.debug('exists: %s', directory)
 
     if case_sensitive and not util.is_windows():
         case_sensitive = False
 
+    stat_cache = StatCache.get_active()
+
     if case_sensitive:
         parent_folder = get_dirname(directory)
         thing = get_basename(directory)
-        if thing in os.listdir(parent_folder):
+        if stat_cache:
+            names = stat_cache.list_dir(parent_folder)
+        else:
+            names = os.listdir(parent_folder)
+        if thing in names:
             return True
         else:
             return False
+    elif stat_cache:
+        return stat_cache.get_kind(directory) is not None
     else:
         try:
             stat = os.stat(directory)
@@ -1929,21 +4856,29 @@ def is_dir(directory, case_sensitive=False):
     if not directory:
         return False
 
-    log.debug('is directory: %s' % directory)
+    log.debug('is directory: %s', directory)
 
     if case_sensitive and not util.is_windows():
         case_sensitive = False
 
+    stat_cache = StatCache.get_active()
+
     if case_sensitive:
         parent_folder = get_dirname(directory)
         folder = get_basename(directory)
         try:
-            if folder in os.listdir(parent_folder):
+            if stat_cache:
+                names = stat_cache.list_dir(parent_folder)
+            else:
+                names = os.listdir(parent_folder)
+            if folder in names:
                 return True
         except:
             pass
         else:
             return False
+    elif stat_cache:
+        return stat_cache.get_kind(directory) == 'dir'
     else:
         try:
             mode = os.stat(directory)[stat.ST_MODE]
@@ -1962,7 +4897,12 @@ def is_file(filepath):
     if not filepath:
         return False
 
-    log.debug('is file: %s' % filepath)
+    log.debug('is file: %s', filepath)
+
+    stat_cache = StatCache.get_active()
+
+    if stat_cache:
+        return stat_cache.get_kind(filepath) == 'file'
 
     try:
         mode = os.stat(filepath)[stat.ST_MODE]
@@ -2331,6 +5271,9 @@ def rename(directory, name, make_unique=False):
         except:
             util.error(traceback.format_exc())
             return False
+    finally:
+        StatCache.remove(directory)
+        StatCache.remove(renamepath)
 
     return renamepath
 
@@ -2346,6 +5289,9 @@ def move(path1, path2):
     Returns:
         bool: Whether the move was successful.
     """
+    StatCache.remove(path1)
+    StatCache.remove(path2)
+
     try:
         shutil.move(path1, path2)
     except:
@@ -2355,7 +5301,7 @@ def move(path1, path2):
     return True
 
 
-def write_lines(filepath, lines, append=False):
+def write_lines(filepath, lines, append=False, atomic=False):
     """
     Write a list of text lines to a file. Every entry in the list is a new line.
     
@@ -2363,6 +5309,7 @@ def write_lines(filepath, lines, append=False):
         filepath (str): filename and path
         lines (list): A list of text lines. Each entry is a new line.
         append (bool): Whether to append the text or if not replace it.
+        atomic (bool): Write to a temporary file and rename it over filepath, so the file is never left half written.
     
     """
 
@@ -2374,6 +5321,14 @@ def write_lines(filepath, lines, append=False):
 
     text = '\n'.join(map(str, lines))
 
+    if atomic:
+        if append:
+            old_text = get_file_text(filepath) if is_file(filepath) else ''
+            if old_text:
+                text = old_text + '\n' + text
+        write_replace(filepath, text)
+        return
+
     if append:
         write_string = 'a'
         text = '\n' + text
@@ -2382,16 +5337,6 @@ def write_lines(filepath, lines, append=False):
         open_file.write(text)
 
 
-def write_replace(filepath, stuff_to_write):
-    open_file = open(filepath, 'w')
-
-    try:
-        open_file.write(stuff_to_write)
-    except:
-        util.warning('Could not write: %s' % stuff_to_write)
-
-    open_file.close()
-
 # ---- create
 
 
@@ -2429,6 +5374,8 @@ def create_dir(name, directory=None, make_unique=False):
     if type(full_path) == bool:
         util.warning('Path to create is type bool. Check command was called correctly.')
         return False
+    StatCache.remove(full_path)
+
     try:
         os.makedirs(full_path)
     except:
@@ -2464,6 +5411,8 @@ def delete_dir(name, directory=None):
 
         return full_path
 
+    StatCache.remove(full_path)
+
     try:
         shutil.rmtree(full_path, onerror=delete_read_only_error)
     except:
@@ -2526,6 +5475,8 @@ def create_file(name, directory=None, make_unique=False):
 
     open_file = None
 
+    StatCache.remove(full_path)
+
     try:
         open_file = open(full_path, 'a')
         open_file.close()
@@ -2580,6 +5531,8 @@ def delete_file(name, directory=None, show_warning=True):
     except:
         pass
 
+    StatCache.remove(full_path)
+
     try:
         os.remove(full_path)
     except:
@@ -2600,6 +5553,201 @@ def copy_with_subprocess(cmd):
     return True
 
 
+class CopyEngine(object):
+    """
+    Copies folders with the file copies spread over a WorkerPool.
+    Folders are made first, then files are copied with their modified times.
+
+    Args:
+        max_workers (int): Threads to copy with.
+        link (str): None to copy every file.
+            'hardlink' links the blobs and version files inside .version folders instead of copying them.
+            Those are replaced rather than edited, so the copies can share them.
+            The comment and index files of .version folders are appended to, so they are always copied.
+            'reflink' asks the file system for a copy on write clone of every file, and falls back to copying.
+        exclude (list): File and folder names to skip, like ['.version'].
+    """
+
+    history_folder_name = '.version'
+    shared_history_names = ('blobs', 'version.')
+
+    def __init__(self, max_workers=None, link=None, exclude=None):
+        self.max_workers = max_workers
+        self.link = link
+        self.exclude = set(exclude or [])
+
+        self._progress_function = None
+        self._cancelled = False
+        self._lock = threading.Lock()
+
+        self.copied = 0
+        self.linked = 0
+        self.bytes = 0
+
+    def set_progress_function(self, function):
+        """
+        Args:
+            function: Called as function(done, total, filepath) after each file.
+        """
+        self._progress_function = function
+
+    def cancel(self):
+        """
+        Stop starting new file copies. Can be called from the progress function.
+        """
+        self._cancelled = True
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def _get_entries(self, directory, destination):
+        folders = [destination]
+        files = []
+
+        for dirpath, dirnames, filenames in os.walk(directory):
+            dirnames[:] = [name for name in dirnames if name not in self.exclude]
+
+            relative = os.path.relpath(dirpath, directory)
+            target_path = destination
+            if relative != '.':
+                target_path = os.path.join(destination, relative)
+
+            history_parts = self._get_history_parts(relative)
+
+            for name in dirnames:
+                folders.append(os.path.join(target_path, name))
+
+            for name in filenames:
+                if name in self.exclude:
+                    continue
+
+                shared = False
+                if history_parts is not None:
+                    shared = (history_parts or [name])[0].startswith(self.shared_history_names)
+
+                files.append((os.path.join(dirpath, name), os.path.join(target_path, name), shared))
+
+        return folders, files
+
+    def _get_history_parts(self, relative):
+        """
+        Returns:
+            list: The parts of a relative folder after its last .version folder. None if it is not in one.
+        """
+
+        parts = relative.replace('\\', '/').split('/')
+
+        if self.history_folder_name not in parts:
+            return
+
+        parts.reverse()
+        index = parts.index(self.history_folder_name)
+        parts = parts[:index]
+        parts.reverse()
+
+        return parts
+
+    def _copy_file(self, source, destination, shared):
+
+        if self._cancelled:
+            return
+
+        linked = False
+
+        if self.link == 'hardlink' and shared and hasattr(os, 'link'):
+            if os.path.isfile(destination):
+                os.remove(destination)
+            try:
+                os.link(source, destination)
+                linked = True
+            except (OSError, NotImplementedError):
+                pass
+
+        if self.link == 'reflink' and not linked:
+            linked = reflink_file(source, destination)
+
+        if not linked:
+            shutil.copy2(source, destination)
+
+        size = os.path.getsize(destination)
+
+        with self._lock:
+            if linked:
+                self.linked += 1
+            else:
+                self.copied += 1
+            self.bytes += size
+
+    def copy(self, directory, destination):
+        """
+        Copy the contents of directory into destination. Destination is created if needed.
+        If a file can not be copied, the copies not yet started are cancelled and the error is raised.
+
+        Returns:
+            int: The number of files copied or linked.
+        """
+
+        self._cancelled = False
+
+        folders, files = self._get_entries(directory, destination)
+
+        for folder in folders:
+            if not os.path.isdir(folder):
+                os.makedirs(folder)
+
+        total = len(files)
+        done = 0
+
+        with util.WorkerPool(self.max_workers) as pool:
+            jobs = [(pool.submit(self._copy_file, *entry), entry[1]) for entry in files]
+
+            try:
+                for job, filepath in jobs:
+                    job.result()
+                    done += 1
+
+                    if self._progress_function:
+                        self._progress_function(done, total, filepath)
+            except:
+                self.cancel()
+                raise
+
+        return total
+
+
+def reflink_file(source, destination):
+    """
+    Clone source to destination with copy on write, where the file system supports it.
+    Only linux FICLONE is tried here.
+
+    Returns:
+        bool: False if the clone could not be made. Nothing is left at destination in that case.
+    """
+
+    if not util.is_linux():
+        return False
+
+    try:
+        import fcntl
+    except ImportError:
+        return False
+
+    ficlone = 0x40049409
+
+    try:
+        with open(source, 'rb') as source_file:
+            with open(destination, 'wb') as destination_file:
+                fcntl.ioctl(destination_file.fileno(), ficlone, source_file.fileno())
+    except (IOError, OSError):
+        if os.path.isfile(destination):
+            os.remove(destination)
+        return False
+
+    shutil.copystat(source, destination)
+
+    return True
+
+
 def fast_copy(directory, directory_destination):
     win = linux = False
     if util.is_linux():
@@ -2650,12 +5798,14 @@ def copy_dir(directory, directory_destination, ignore_patterns=None):
     if not is_dir(directory):
         return
 
+    StatCache.remove(directory_destination)
+
     if ignore_patterns:
         shutil.copytree(directory,
                         directory_destination,
                         ignore=shutil.ignore_patterns(ignore_patterns))
     else:
-        fast_copy(directory, directory_destination)
+        CopyEngine().copy(directory, directory_destination)
         # if not exists(directory_destination):
         #    shutil.copytree(directory,
         #                    directory_destination)
@@ -2675,20 +5825,54 @@ def copy_file(filepath, filepath_destination):
         str: The destination directory
     """
 
-    get_permission(filepath)
-    # uid = os.getuid()
-    # gid = os.getgid()
-    # os.chown(filepath_destination, uid, gid)
+    get_permission(filepath)
+    # uid = os.getuid()
+    # gid = os.getgid()
+    # os.chown(filepath_destination, uid, gid)
+
+    if is_file(filepath):
+
+        if is_dir(filepath_destination):
+            filename = get_basename(filepath)
+            filepath_destination = join_path(filepath_destination, filename)
+
+        StatCache.remove(filepath_destination)
+        shutil.copyfile(filepath, filepath_destination)
+
+    return filepath_destination
+
+
+def get_line_delta(lines, target_lines):
+    """
+    Get the operations that turn lines into target_lines.
+
+    Returns:
+        list: ['=', start, end] copies lines[start:end]. ['+', [lines]] adds lines.
+    """
+
+    ops = []
+
+    matcher = difflib.SequenceMatcher(None, lines, target_lines, autojunk=False)
+
+    for tag, start1, end1, start2, end2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append(['=', start1, end1])
+        elif tag in ('replace', 'insert'):
+            ops.append(['+', target_lines[start2:end2]])
 
-    if is_file(filepath):
+    return ops
 
-        if is_dir(filepath_destination):
-            filename = get_basename(filepath)
-            filepath_destination = join_path(filepath_destination, filename)
 
-        shutil.copyfile(filepath, filepath_destination)
+def apply_line_delta(lines, ops):
+    found = []
 
-    return filepath_destination
+    for op in ops:
+        if op[0] == '=':
+            found.extend(lines[op[1]:op[2]])
+        else:
+            found.extend(op[1])
+
+    return found
 
 
 def delete_versions(folder, keep=1):
@@ -2709,13 +5893,15 @@ def delete_versions(folder, keep=1):
 
     for version in version_list:
 
-        version_inst.delete_version(version)
+        version_inst.delete_version(version, remove_unused_blobs=False)
 
         deleted += 1
 
         if count - deleted == keep:
             break
 
+    version_inst.remove_unused_blobs()
+
 # ---- python
 
 
@@ -2790,6 +5976,159 @@ def source_python_module(code_directory):
         return None
 
 
+class CodeCache(object):
+    """
+    Compiled python code keyed by a hash of the source and the path.
+    A script that has not changed is executed again from its code object instead of being compiled.
+    If directory is set, or the VETALA_CODE_CACHE environment variable, code is also written there with marshal
+    so a new session can skip compiling too.
+    """
+
+    code = OrderedDict()
+    max_entries = 2048
+    directory = os.environ.get('VETALA_CODE_CACHE')
+
+    hits = 0
+    misses = 0
+
+    _hashes = {}
+    _lock = threading.RLock()
+
+    @classmethod
+    def _get_disk_path(cls, key):
+        name = hashlib.sha1(('%s %s' % key).encode('utf-8')).hexdigest()
+        return join_path(cls.directory, '%s.py%s%s.code' % (name, sys.version_info[0], sys.version_info[1]))
+
+    @classmethod
+    def _load_disk(cls, key):
+        if not cls.directory:
+            return
+
+        disk_path = cls._get_disk_path(key)
+
+        if not os.path.isfile(disk_path):
+            return
+
+        try:
+            with open(disk_path, 'rb') as open_file:
+                return marshal.load(open_file)
+        except Exception:
+            return
+
+    @classmethod
+    def _save_disk(cls, key, code):
+        if not cls.directory:
+            return
+
+        disk_path = cls._get_disk_path(key)
+
+        try:
+            if not os.path.isdir(cls.directory):
+                os.makedirs(cls.directory)
+
+            temp_handle, temp_path = tempfile.mkstemp(suffix='.tmp', dir=cls.directory)
+            with os.fdopen(temp_handle, 'wb') as temp_file:
+                marshal.dump(code, temp_file)
+
+            replace_file(temp_path, disk_path)
+        except Exception:
+            log.debug('Could not write code cache %s' % disk_path)
+
+    @classmethod
+    def get_code(cls, filepath):
+        """
+        Args:
+            filepath (str): A python file.
+
+        Returns:
+            code: The compiled code of the file, from the cache if the source did not change.
+        """
+
+        stat_key = ReadCache._get_stat_key(filepath)
+
+        with cls._lock:
+            cached = cls._hashes.get(filepath)
+
+            if stat_key and cached and cached[0] == stat_key and cached[1] in cls.code:
+                cls.hits += 1
+                code = cls.code.pop(cached[1])
+                cls.code[cached[1]] = code
+                return code
+
+        with open(filepath, 'rb') as open_file:
+            source = open_file.read()
+
+        key = (hashlib.sha1(source).hexdigest(), filepath)
+
+        with cls._lock:
+            code = cls.code.get(key)
+
+        if code is None:
+            code = cls._load_disk(key)
+
+            if code is None:
+                with cls._lock:
+                    cls.misses += 1
+                code = compile(source, filepath, 'exec', 0, True)
+                cls._save_disk(key, code)
+
+        with cls._lock:
+            cls._hashes[filepath] = (stat_key, key)
+            cls.code.pop(key, None)
+            cls.code[key] = code
+
+            while len(cls.code) > cls.max_entries:
+                cls.code.popitem(last=False)
+
+        return code
+
+    @classmethod
+    def source_module(cls, filepath):
+        """
+        Execute the file as a new module, the same way source_python_module does, but without compiling unchanged code.
+        Builtins are read when the module executes, so the module sees the current process builtins.
+
+        Returns:
+            module: The module, or the traceback as a string if it failed.
+        """
+
+        try:
+            code = cls.get_code(filepath)
+
+            name = hashlib.md5(filepath.encode()).hexdigest()
+
+            remove_sourced_code(filepath)
+
+            module = types.ModuleType(name)
+            module.__file__ = filepath
+            sys.modules[name] = module
+
+            exec(code, module.__dict__)
+
+            return module
+        except Exception:
+            return traceback.format_exc()
+
+    @classmethod
+    def remove(cls, filepath):
+        with cls._lock:
+            cached = cls._hashes.pop(filepath, None)
+            if cached:
+                cls.code.pop(cached[1], None)
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls.code.clear()
+            cls._hashes.clear()
+            cls.hits = 0
+            cls.misses = 0
+
+    @classmethod
+    def get_stats(cls):
+        return {'entries': len(cls.code), 'hits': cls.hits, 'misses': cls.misses}
+
+
 def load_python_module(module_name, directory):
     """
     Load a module by name and return its instance.
@@ -2966,18 +6305,17 @@ def get_line_imports(lines):
 def get_defined(module_path, name_only=False):
     """
     Get classes and definitions from the text of a module.
+    Results come from the SymbolIndex, so the module is only parsed again when it changes.
     """
 
-    file_text = get_file_text(module_path)
+    return get_symbol_index().get_defined(module_path, name_only)
 
-    if not file_text:
-        return
+
+def _get_ast_defined(ast_tree, name_only=False):
 
     functions = []
     classes = []
 
-    ast_tree = ast.parse(file_text, 'string', 'exec')
-
     for node in ast_tree.body:
 
         # if node:
@@ -3023,11 +6361,16 @@ def get_defined_classes(module_path):
     if not file_text:
         return None, None
 
+    ast_tree = ast.parse(file_text)
+
+    return _get_ast_defined_classes(ast_tree)
+
+
+def _get_ast_defined_classes(ast_tree):
+
     defined = []
     defined_dict = {}
 
-    ast_tree = ast.parse(file_text)
-
     for node in ast_tree.body:
         if isinstance(node, ast.ClassDef):
             defined.append(node.name)
@@ -3060,9 +6403,10 @@ def get_ast_function_args(function_node):
     if not function_node.args:
         return found_args
 
-    defaults = function_node.args.defaults
+    # copies, so the node is not changed and can be read again.
+    defaults = list(function_node.args.defaults)
 
-    args = function_node.args.args
+    args = list(function_node.args.args)
 
     args.reverse()
     defaults.reverse()
@@ -3121,7 +6465,16 @@ def get_ast_function_args(function_node):
 
 
 def get_ast_class_sub_functions(module_path, class_name):
-    defined, defined_dict = get_defined_classes(module_path)
+    """
+    Results come from the SymbolIndex, so the module is only parsed again when it changes.
+
+    Returns:
+        tuple: (functions, variables) of the class and the classes it inherits from in the module.
+    """
+    return get_symbol_index().get_class_members(module_path, class_name)
+
+
+def _get_ast_class_sub_functions(defined, defined_dict, class_name):
 
     if not defined:
         return None, None
@@ -3305,6 +6658,370 @@ def get_ast_assignment(text, line_number, assignment):
 
     return line_assign_dict
 
+
+class SymbolIndex(object):
+    """
+    Modules, classes, functions and their signatures, found once and kept until the files change.
+    Modules are checked against their modified time and size on every lookup and parsed again only if they changed.
+    Module listings of folders, like the folders on sys.path, are checked at most every check_seconds.
+    The index is kept in a json file between sessions, and can be built on a thread with build.
+
+    Args:
+        cache_path (str): The json file to keep the index in.
+    """
+
+    version = 1
+    max_modules = 4000
+    check_seconds = 2.0
+
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path
+
+        self._modules = OrderedDict()
+        self._folders = {}
+        self._checked = {}
+        self._loaded = False
+        self._dirty = False
+        self._lock = threading.RLock()
+        self._thread = None
+
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+
+        if not self.cache_path or not os.path.isfile(self.cache_path):
+            return
+
+        try:
+            cache = _read_json(self.cache_path)
+        except Exception:
+            log.debug('Could not read symbol index %s' % self.cache_path)
+            return
+
+        if not cache or cache.get('version') != self.version:
+            return
+
+        self._modules.update(cache.get('modules', {}))
+        self._folders.update(cache.get('folders', {}))
+
+    @staticmethod
+    def _get_stat_key(filepath):
+        try:
+            file_stat = os.stat(filepath)
+        except OSError:
+            return
+
+        return [file_stat.st_mtime, file_stat.st_size]
+
+    def _parse_module(self, module_path):
+
+        record = {'defined': None, 'names': None, 'classes': {}}
+
+        file_text = get_file_text(module_path)
+
+        if not file_text:
+            return record
+
+        try:
+            ast_tree = ast.parse(file_text, 'string', 'exec')
+        except (SyntaxError, ValueError, TypeError):
+            return record
+
+        try:
+            record['defined'] = _get_ast_defined(ast_tree)
+            record['names'] = _get_ast_defined(ast_tree, name_only=True)
+        except Exception:
+            log.debug(traceback.format_exc())
+
+        defined, defined_dict = _get_ast_defined_classes(ast_tree)
+
+        for class_name in defined:
+            try:
+                functions, variables = _get_ast_class_sub_functions(defined, defined_dict, class_name)
+            except Exception:
+                # some class bodies, like tuple assignments, can not be read yet.
+                functions, variables = [], []
+            record['classes'][class_name] = [functions, variables]
+
+        return record
+
+    def _get_module(self, module_path):
+        if not module_path:
+            return
+
+        stat_key = self._get_stat_key(module_path)
+
+        if stat_key is None:
+            return
+
+        with self._lock:
+            self._load()
+            record = self._modules.get(module_path)
+
+            if record and record['stat'] == stat_key:
+                self.hits += 1
+                self._modules.pop(module_path)
+                self._modules[module_path] = record
+                return record
+
+        record = self._parse_module(module_path)
+        record['stat'] = stat_key
+
+        with self._lock:
+            self.misses += 1
+            self._modules.pop(module_path, None)
+            self._modules[module_path] = record
+            self._dirty = True
+
+            while len(self._modules) > self.max_modules:
+                self._modules.popitem(last=False)
+
+        return record
+
+    def _list_folder(self, folder):
+        """
+        Returns:
+            dict: mtime of the folder, modules found in it, and mtime of each sub folder with whether it is a package.
+        """
+
+        record = {'mtime': None, 'modules': [], 'folders': {}}
+
+        try:
+            record['mtime'] = os.stat(folder).st_mtime
+            names = os.listdir(folder)
+        except OSError:
+            return record
+
+        for name in names:
+            sub_path = os.path.join(folder, name)
+
+            if name.endswith('.py'):
+                if not name.startswith('__'):
+                    record['modules'].append(name.split('.')[0])
+                continue
+
+            try:
+                mtime = os.stat(sub_path).st_mtime
+            except OSError:
+                continue
+
+            if not os.path.isdir(sub_path):
+                continue
+
+            is_package = os.path.isfile(os.path.join(sub_path, '__init__.py'))
+            record['folders'][name] = [mtime, is_package]
+
+        return record
+
+    def _is_folder_current(self, folder, record):
+        try:
+            if os.stat(folder).st_mtime != record['mtime']:
+                return False
+        except OSError:
+            return record['mtime'] is None
+
+        for name, value in record['folders'].items():
+            try:
+                if os.stat(os.path.join(folder, name)).st_mtime != value[0]:
+                    return False
+            except OSError:
+                return False
+
+        return True
+
+    def _get_folder(self, folder):
+
+        now = time.time()
+
+        with self._lock:
+            self._load()
+            record = self._folders.get(folder)
+            checked = self._checked.get(folder, 0)
+
+        if record and now - checked < self.check_seconds:
+            self.hits += 1
+            return record
+
+        if record and self._is_folder_current(folder, record):
+            with self._lock:
+                self.hits += 1
+                self._checked[folder] = now
+            return record
+
+        record = self._list_folder(folder)
+
+        with self._lock:
+            self.misses += 1
+            self._folders[folder] = record
+            self._checked[folder] = now
+            self._dirty = True
+
+        return record
+
+    def get_modules(self, paths=None):
+        """
+        Returns:
+            list: Names of packages and modules found directly in paths. By default sys.path
+        """
+
+        if not paths:
+            paths = sys.path
+        paths = util.convert_to_sequence(paths)
+
+        found = set()
+
+        for path in paths:
+            if not path:
+                continue
+
+            record = self._get_folder(fix_slashes(path))
+
+            found.update(record['modules'])
+
+            for name, value in record['folders'].items():
+                if value[1]:
+                    found.add(str(name))
+
+        return list(found)
+
+    def get_defined(self, module_path, name_only=False):
+        """
+        Returns:
+            list: Classes then functions defined at the top of the module, with their arguments unless name_only. None if the module could not be read.
+        """
+
+        record = self._get_module(module_path)
+
+        if not record:
+            return
+
+        if name_only:
+            defined = record['names']
+        else:
+            defined = record['defined']
+
+        if defined is None:
+            return
+
+        return list(defined)
+
+    def get_class_members(self, module_path, class_name):
+        """
+        Returns:
+            tuple: (functions, variables) of the class, including what it inherits from classes in the same module.
+            (None, None) if the module has no classes, and None if the class is not in it.
+        """
+
+        record = self._get_module(module_path)
+
+        if not record or not record['classes']:
+            return None, None
+
+        members = record['classes'].get(class_name)
+
+        if not members:
+            return
+
+        functions, variables = members
+
+        return list(functions or []), list(variables or [])
+
+    def build(self, paths=None, module_folders=None):
+        """
+        Index on a thread: the module listings of paths (sys.path by default), and every module under module_folders.
+        """
+
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._thread = SymbolIndexThread(self, paths, module_folders)
+        self._thread.start()
+
+    def index_folder(self, folder):
+        """
+        Index every python module under folder.
+        """
+
+        for root, dirs, files in os.walk(folder):
+            dirs[:] = [name for name in dirs if not name.startswith('.') or name == '.code']
+            dirs[:] = [name for name in dirs if name not in ('__pycache__', '.version', '.backup')]
+
+            for name in files:
+                if name.endswith('.py'):
+                    self._get_module(fix_slashes(os.path.join(root, name)))
+
+    def save(self):
+        if not self.cache_path or not self._dirty:
+            return
+
+        with self._lock:
+            cache = {'version': self.version,
+                     'modules': dict(self._modules),
+                     'folders': dict(self._folders)}
+            self._dirty = False
+
+        try:
+            create_dir(get_dirname(self.cache_path))
+            set_json(self.cache_path, cache, atomic=True)
+        except Exception:
+            log.debug('Could not save symbol index %s' % self.cache_path)
+
+    def get_stats(self):
+        return {'modules': len(self._modules), 'folders': len(self._folders), 'hits': self.hits,
+                'misses': self.misses}
+
+
+class SymbolIndexThread(threading.Thread):
+    """
+    Builds a SymbolIndex in the background and saves it.
+    """
+
+    def __init__(self, index, paths=None, module_folders=None):
+        super(SymbolIndexThread, self).__init__()
+
+        self.daemon = True
+
+        self.index = index
+        self.paths = paths
+        self.module_folders = module_folders or []
+
+    def run(self):
+        try:
+            self.index.get_modules(self.paths)
+
+            for folder in self.module_folders:
+                self.index.index_folder(folder)
+
+            self.index.save()
+        except Exception:
+            log.debug(traceback.format_exc())
+
+
+_symbol_index = None
+
+
+def get_symbol_index():
+    """
+    Returns:
+        SymbolIndex: The index used by get_defined and the code completer. It is saved next to the vetala settings.
+    """
+
+    global _symbol_index
+
+    if _symbol_index is None:
+        settings_path = os.environ.get('VETALA_SETTINGS')
+        if not settings_path:
+            settings_path = get_default_directory()
+
+        _symbol_index = SymbolIndex(join_path(settings_path, 'symbol_index.json'))
+        atexit.register(_symbol_index.save)
+
+    return _symbol_index
+
 # --- applications
 
 
@@ -3345,11 +7062,12 @@ def open_website(url):
 
 
 def get_maya_path():
-    if util.is_in_maya():
-        dirpath = os.environ['MAYA_LOCATION']
+    dirpath = os.environ.get('MAYA_LOCATION')
+
+    if dirpath:
         return dirpath
-    else:
-        util.warning('Could not find Maya.')
+
+    util.warning('Could not find Maya. Set MAYA_LOCATION to the Maya install folder.')
 
 
 def get_mayapy():
@@ -0,0 +1,1094 @@
+# Copyright (C) 2022 Louis Vottero louis.vot@gmail.com    All rights reserved.
+
+"""
+Sparse skin weights and the binary skin weight file.
+
+SkinWeightMatrix holds skin weights without Maya. Rows are vertices, columns are influences.
+Only weights that exist are stored.
+
+A weight file stores every influence of one mesh in a single file as a SkinWeightMatrix.
+
+Layout:
+    magic, format version, flags, header size
+    json header: influences, positions, vertex count and the location of each data block
+    data blocks: row offsets, influence indices and weight values, each 8 byte aligned
+
+When the file is not compressed the blocks are read straight from a memory map.
+
+WeightCatalog is a json summary of every mesh folder in a skin weights data folder.
+"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+
+import os
+import sys
+import json
+import zlib
+import mmap
+import array
+import struct
+import time
+import random
+import hashlib
+
+from . import util
+from . import util_file
+from . import logger
+
+log = logger.get_logger(__name__)
+
+weight_file_name = 'weights.skin'
+catalog_file_name = 'catalog.json'
+
+_magic = b'VSKW'
+_format_version = 1
+_flag_compressed = 1
+_header_struct = struct.Struct('<4sHHI')
+_alignment = 8
+_catalog_version = 1
+
+
+def _get_int_typecode(byte_size):
+    for typecode in ('H', 'I', 'L'):
+        if array.array(typecode).itemsize == byte_size:
+            return typecode
+
+
+def _array_to_bytes(values):
+    if sys.byteorder != 'little':
+        values = array.array(values.typecode, values)
+        values.byteswap()
+
+    if util.python_version < 3:
+        return values.tostring()
+
+    return values.tobytes()
+
+
+def _array_from_bytes(typecode, data):
+    values = array.array(typecode)
+
+    if util.python_version < 3:
+        values.fromstring(bytes(data))
+    else:
+        values.frombytes(data)
+
+    if sys.byteorder != 'little':
+        values.byteswap()
+
+    return values
+
+
+_index_typecode = _get_int_typecode(4)
+
+
+def _pad(size):
+    remainder = size % _alignment
+    if not remainder:
+        return 0
+    return _alignment - remainder
+
+
+class SkinWeightMatrix(object):
+    """
+    Sparse skin weights that do not depend on Maya.
+    Rows are vertices and columns are influences.
+    The weights of vertex v are values[offsets[v]:offsets[v + 1]].
+    The columns of those weights are indices[offsets[v]:offsets[v + 1]].
+
+    Args:
+        influences (list): Column labels. Influence names or skin cluster influence indices.
+        vertex_count (int): The number of rows.
+    """
+
+    def __init__(self, influences=None, vertex_count=0):
+
+        if influences is None:
+            influences = []
+
+        self.influences = list(influences)
+        self.offsets = array.array(_index_typecode, [0] * (vertex_count + 1))
+        self.indices = array.array(_index_typecode)
+        self.values = array.array('d')
+
+        self._influence_lookup = None
+
+    def _set_rows(self, offsets, indices, values):
+
+        self.offsets = _to_array(_index_typecode, offsets)
+        self.indices = _to_array(_index_typecode, indices)
+        self.values = _to_array('d', values)
+
+    def _get_influence_lookup(self):
+        if self._influence_lookup is None:
+            self._influence_lookup = dict((influence, inc) for inc, influence in enumerate(self.influences))
+
+        return self._influence_lookup
+
+    def _set_influences(self, influences):
+        self.influences = list(influences)
+        self._influence_lookup = None
+
+    def _rebuild(self, row_function):
+        """
+        row_function gets the indices and values of a row and returns the new indices and values.
+        """
+
+        offsets = self.offsets
+        indices = self.indices
+        values = self.values
+
+        new_offsets = [0] * len(offsets)
+        new_indices = []
+        new_values = []
+
+        for vertex_index in range(len(offsets) - 1):
+            start = offsets[vertex_index]
+            end = offsets[vertex_index + 1]
+
+            if start != end:
+                row_indices, row_values = row_function(indices[start:end], values[start:end])
+                new_indices.extend(row_indices)
+                new_values.extend(row_values)
+
+            new_offsets[vertex_index + 1] = len(new_values)
+
+        self._set_rows(new_offsets, new_indices, new_values)
+
+    @classmethod
+    def from_rows(cls, influences, offsets, indices, values):
+        """
+        Create a matrix from row arrays.
+
+        Args:
+            influences (list): Column labels.
+            offsets (list): Where each row starts in indices and values. One more entry than the vertex count.
+            indices (list): The column of every weight.
+            values (list): The weights.
+
+        Returns:
+            SkinWeightMatrix
+        """
+
+        matrix = cls(influences)
+        matrix._set_rows(offsets, indices, values)
+
+        return matrix
+
+    @classmethod
+    def from_columns(cls, influences, columns, vertex_count=None):
+        """
+        Create a matrix from a weight list per influence.
+
+        Args:
+            influences (list): Column labels.
+            columns (list): A weight list for each influence. Each list has a weight for every vertex.
+            vertex_count (int): By default, the length of the longest weight list.
+
+        Returns:
+            SkinWeightMatrix
+        """
+
+        if vertex_count is None:
+            vertex_count = 0
+            for column in columns:
+                if column and len(column) > vertex_count:
+                    vertex_count = len(column)
+
+        counts = [0] * (vertex_count + 1)
+        sparse_columns = []
+
+        for column in columns:
+            if not column:
+                sparse_columns.append(([], []))
+                continue
+
+            vertex_indices = [inc for inc, weight in enumerate(column) if weight]
+            weights = [column[inc] for inc in vertex_indices]
+
+            for vertex_index in vertex_indices:
+                counts[vertex_index + 1] += 1
+
+            sparse_columns.append((vertex_indices, weights))
+
+        for inc in range(vertex_count):
+            counts[inc + 1] += counts[inc]
+
+        value_count = counts[-1]
+
+        indices = [0] * value_count
+        values = [0.0] * value_count
+
+        position = counts[:-1]
+
+        for column_index, (vertex_indices, weights) in enumerate(sparse_columns):
+            for vertex_index, weight in zip(vertex_indices, weights):
+                slot = position[vertex_index]
+                indices[slot] = column_index
+                values[slot] = weight
+                position[vertex_index] = slot + 1
+
+        return cls.from_rows(influences, counts, indices, values)
+
+    @classmethod
+    def from_dict(cls, weights_dict, vertex_count=None):
+        """
+        Create a matrix from a dictionary of weight lists.
+        This is the format returned by maya_lib.deform.get_skin_weights.
+
+        Args:
+            weights_dict (dict): dict[influence] = weight list corresponding to point order.
+
+        Returns:
+            SkinWeightMatrix
+        """
+
+        influences = list(weights_dict.keys())
+        columns = [weights_dict[influence] for influence in influences]
+
+        return cls.from_columns(influences, columns, vertex_count)
+
+    @classmethod
+    def from_influence_dict(cls, influence_dict):
+        """
+        Create a matrix from the influence dictionary used by SkinWeightData.
+        Influences without weights are skipped.
+
+        Args:
+            influence_dict (dict): dict[influence] = {'position': [x, y, z], 'weights': [weight per vertex]}
+
+        Returns:
+            SkinWeightMatrix
+        """
+
+        influences = [influence for influence in influence_dict if influence_dict[influence].get('weights')]
+        influences.sort()
+
+        columns = [influence_dict[influence]['weights'] for influence in influences]
+
+        return cls.from_columns(influences, columns)
+
+    @property
+    def vertex_count(self):
+        return len(self.offsets) - 1
+
+    @property
+    def influence_count(self):
+        return len(self.influences)
+
+    @property
+    def nonzero_count(self):
+        return len(self.values)
+
+    def copy(self):
+        return self.from_rows(self.influences,
+                              array.array(self.offsets.typecode, self.offsets),
+                              array.array(self.indices.typecode, self.indices),
+                              array.array(self.values.typecode, self.values))
+
+    def has_influence(self, influence):
+        return influence in self._get_influence_lookup()
+
+    def get_influence_index(self, influence):
+        return self._get_influence_lookup().get(influence)
+
+    def get_row(self, vertex_index):
+        """
+        Returns:
+            list: [influence, weight] for every stored weight of the vertex.
+        """
+
+        start = self.offsets[vertex_index]
+        end = self.offsets[vertex_index + 1]
+
+        return [[self.influences[self.indices[slot]], self.values[slot]] for slot in range(start, end)]
+
+    def get_weight(self, vertex_index, influence):
+
+        column = self.get_influence_index(influence)
+        if column is None:
+            return 0.0
+
+        for slot in range(self.offsets[vertex_index], self.offsets[vertex_index + 1]):
+            if self.indices[slot] == column:
+                return self.values[slot]
+
+        return 0.0
+
+    def get_sparse_columns(self):
+        """
+        Transpose the matrix in one pass.
+
+        Returns:
+            list: (vertex indices, weights) for each influence.
+        """
+
+        columns = [([], []) for _ in self.influences]
+
+        offsets = self.offsets
+        indices = self.indices
+        values = self.values
+
+        for vertex_index in range(len(offsets) - 1):
+            for slot in range(offsets[vertex_index], offsets[vertex_index + 1]):
+                vertex_indices, weights = columns[indices[slot]]
+                vertex_indices.append(vertex_index)
+                weights.append(values[slot])
+
+        return columns
+
+    def get_column(self, influence):
+        """
+        Returns:
+            list: The weight of the influence at every vertex.
+        """
+
+        weights = [0.0] * self.vertex_count
+
+        column = self.get_influence_index(influence)
+        if column is None:
+            return weights
+
+        indices = self.indices
+        values = self.values
+        offsets = self.offsets
+
+        for vertex_index in range(len(offsets) - 1):
+            for slot in range(offsets[vertex_index], offsets[vertex_index + 1]):
+                if indices[slot] == column:
+                    weights[vertex_index] = values[slot]
+
+        return weights
+
+    def to_dict(self):
+        """
+        Convert to a dictionary of weight lists. Only influences with stored weights are added.
+
+        Returns:
+            dict: dict[influence] = weight list corresponding to point order.
+        """
+
+        vertex_count = self.vertex_count
+
+        weights_dict = {}
+
+        for influence, (vertex_indices, weights) in zip(self.influences, self.get_sparse_columns()):
+            if not vertex_indices:
+                continue
+
+            column = [0] * vertex_count
+            for vertex_index, weight in zip(vertex_indices, weights):
+                column[vertex_index] = weight
+
+            weights_dict[influence] = column
+
+        return weights_dict
+
+    def get_flat_weights(self, influences=None):
+        """
+        Get the weights vertex by vertex, with one weight for each influence.
+        This is the layout MFnSkinCluster.setWeights expects.
+
+        Args:
+            influences (list): The influences and their order. By default, all influences.
+
+        Returns:
+            list
+        """
+
+        if influences is None:
+            influences = self.influences
+
+        influence_count = len(influences)
+
+        lookup = self._get_influence_lookup()
+        column_position = {}
+        for inc, influence in enumerate(influences):
+            if influence in lookup:
+                column_position[lookup[influence]] = inc
+
+        flat = [0.0] * (self.vertex_count * influence_count)
+
+        offsets = self.offsets
+        indices = self.indices
+        values = self.values
+
+        for vertex_index in range(len(offsets) - 1):
+            row_start = vertex_index * influence_count
+
+            for slot in range(offsets[vertex_index], offsets[vertex_index + 1]):
+                position = column_position.get(indices[slot])
+                if position is not None:
+                    flat[row_start + position] = values[slot]
+
+        return flat
+
+    def normalize(self):
+        """
+        Scale the weights of every vertex so they add up to 1.
+        """
+
+        values = self.values
+        offsets = self.offsets
+
+        for vertex_index in range(len(offsets) - 1):
+            start = offsets[vertex_index]
+            end = offsets[vertex_index + 1]
+
+            if start == end:
+                continue
+
+            total = sum(values[start:end])
+
+            if not total or total == 1.0:
+                continue
+
+            for slot in range(start, end):
+                values[slot] /= total
+
+    def prune(self, threshold=0.0001, normalize=True):
+        """
+        Remove weights below the threshold.
+
+        Args:
+            threshold (float): Weights smaller than this are removed.
+            normalize (bool): Whether to normalize the weights that remain.
+        """
+
+        def prune_row(row_indices, row_values):
+            found_indices = []
+            found_values = []
+
+            for index, value in zip(row_indices, row_values):
+                if value < threshold:
+                    continue
+
+                found_indices.append(index)
+                found_values.append(value)
+
+            return found_indices, found_values
+
+        self._rebuild(prune_row)
+
+        if normalize:
+            self.normalize()
+
+    def limit_influences(self, max_influences, normalize=True):
+        """
+        Keep only the largest weights on every vertex.
+
+        Args:
+            max_influences (int): The number of influences allowed per vertex.
+            normalize (bool): Whether to normalize the weights that remain.
+        """
+
+        def limit_row(row_indices, row_values):
+            if len(row_values) <= max_influences:
+                return row_indices, row_values
+
+            order = sorted(range(len(row_values)), key=lambda inc: row_values[inc], reverse=True)
+            order = sorted(order[:max_influences])
+
+            return [row_indices[inc] for inc in order], [row_values[inc] for inc in order]
+
+        self._rebuild(limit_row)
+
+        if normalize:
+            self.normalize()
+
+    def remap_influences(self, mapping, influences=None):
+        """
+        Rename influences, or move their weights onto other influences.
+        Weights of influences that map to the same influence are added together.
+
+        Args:
+            mapping (dict): dict[old influence] = new influence. Influences that map to None are removed.
+                Influences missing from the mapping keep their label.
+            influences (list): The new column order. By default, new influences in the order they are first mapped.
+        """
+
+        new_labels = []
+        for influence in self.influences:
+            new_labels.append(mapping.get(influence, influence))
+
+        if influences is None:
+            influences = []
+            visited = {}
+            for label in new_labels:
+                if label is None or label in visited:
+                    continue
+                visited[label] = None
+                influences.append(label)
+
+        lookup = dict((influence, inc) for inc, influence in enumerate(influences))
+
+        column_map = [lookup.get(label) if label is not None else None for label in new_labels]
+
+        def remap_row(row_indices, row_values):
+
+            found = {}
+            order = []
+
+            for index, value in zip(row_indices, row_values):
+                column = column_map[index]
+                if column is None:
+                    continue
+                if column in found:
+                    found[column] += value
+                else:
+                    found[column] = value
+                    order.append(column)
+
+            order.sort()
+
+            return order, [found[column] for column in order]
+
+        self._rebuild(remap_row)
+        self._set_influences(influences)
+
+
+def _to_array(typecode, values):
+    if isinstance(values, array.array) and values.typecode == typecode:
+        return values
+
+    return array.array(typecode, values)
+
+
+def write_weight_file(filepath, matrix, positions=None, compress=True, double_precision=True):
+    """
+    Write skin weights to a binary weight file.
+
+    Args:
+        filepath (str): The file to write.
+        matrix (SkinWeightMatrix): The weights. Influences should be names.
+        positions (list): Optional world position for each influence, matching matrix.influences.
+        compress (bool): Whether to zlib compress the data blocks. Uncompressed files can be memory mapped.
+        double_precision (bool): Whether to store weights as doubles, otherwise floats.
+
+    Returns:
+        str: The filepath.
+    """
+
+    index_typecode = 'H'
+    if matrix.influence_count > 65535:
+        index_typecode = _index_typecode
+
+    value_typecode = 'd'
+    if not double_precision:
+        value_typecode = 'f'
+
+    block_arrays = [['offsets', _index_typecode, matrix.offsets],
+                    ['indices', index_typecode, matrix.indices],
+                    ['values', value_typecode, matrix.values]]
+
+    blocks = []
+    block_data = []
+    data_offset = 0
+
+    for name, typecode, values in block_arrays:
+        values = _to_array(typecode, values)
+
+        raw = _array_to_bytes(values)
+        if compress:
+            raw = zlib.compress(raw, 1)
+
+        blocks.append({'name': name,
+                       'typecode': typecode,
+                       'count': len(values),
+                       'offset': data_offset,
+                       'size': len(raw)})
+
+        padding = _pad(len(raw))
+        block_data.append(raw + b'\0' * padding)
+        data_offset += len(raw) + padding
+
+    if positions is None:
+        positions = [None] * matrix.influence_count
+
+    header = {'influences': list(matrix.influences),
+              'positions': list(positions),
+              'vertex_count': matrix.vertex_count,
+              'blocks': blocks}
+
+    header_data = json.dumps(header).encode('utf-8')
+    header_data += b' ' * _pad(_header_struct.size + len(header_data))
+
+    flags = 0
+    if compress:
+        flags |= _flag_compressed
+
+    util_file.get_permission(filepath)
+
+    log.info('Writing weight file %s' % filepath)
+
+    with util_file.AtomicWrite(filepath, 'wb', lock=True) as open_file:
+        open_file.write(_header_struct.pack(_magic, _format_version, flags, len(header_data)))
+        open_file.write(header_data)
+        for data in block_data:
+            open_file.write(data)
+
+    return filepath
+
+
+def is_weight_file(filepath):
+    """
+    Check if the file is a binary weight file.
+    """
+
+    if not util_file.is_file(filepath):
+        return False
+
+    with open(filepath, 'rb') as open_file:
+        magic = open_file.read(len(_magic))
+
+    return magic == _magic
+
+
+def read_weight_header(filepath):
+    """
+    Read only the header of a weight file.
+
+    Returns:
+        dict: influences, positions, vertex_count and blocks
+    """
+
+    with open(filepath, 'rb') as open_file:
+        header, flags = _read_header(open_file.read(_header_struct.size), open_file.read)
+
+    return header
+
+
+def _read_header(header_bytes, read_function):
+
+    magic, version, flags, header_size = _header_struct.unpack(header_bytes)
+
+    if magic != _magic:
+        raise ValueError('Not a skin weight file.')
+    if version > _format_version:
+        raise ValueError('Skin weight file version %s is newer than supported version %s' % (version,
+                                                                                             _format_version))
+
+    header = json.loads(read_function(header_size).decode('utf-8'))
+    header['data_start'] = _header_struct.size + header_size
+
+    return header, flags
+
+
+def read_weight_file(filepath):
+    """
+    Read a weight file in one read.
+
+    Returns:
+        tuple: (SkinWeightMatrix, positions) positions is a list matching the matrix influences.
+    """
+
+    log.info('Reading weight file %s' % filepath)
+
+    with open(filepath, 'rb') as open_file:
+
+        file_size = os.fstat(open_file.fileno()).st_size
+
+        mapped = None
+        try:
+            mapped = mmap.mmap(open_file.fileno(), 0, access=mmap.ACCESS_READ)
+            buffer_view = memoryview(mapped)
+        except (ValueError, EnvironmentError):
+            buffer_view = memoryview(open_file.read(file_size))
+
+        try:
+            position = [_header_struct.size]
+
+            def read_header_bytes(size):
+                start = position[0]
+                position[0] += size
+                return bytes(buffer_view[start:start + size])
+
+            header, flags = _read_header(bytes(buffer_view[:_header_struct.size]), read_header_bytes)
+
+            compressed = flags & _flag_compressed
+            data_start = header['data_start']
+
+            found = {}
+
+            for block in header['blocks']:
+                start = data_start + block['offset']
+                raw = buffer_view[start:start + block['size']]
+
+                if compressed:
+                    raw = zlib.decompress(raw)
+
+                found[block['name']] = _array_from_bytes(block['typecode'], raw)
+                raw = None
+        finally:
+            if hasattr(buffer_view, 'release'):
+                buffer_view.release()
+            if mapped is not None:
+                mapped.close()
+
+    matrix = SkinWeightMatrix.from_rows(header['influences'], found['offsets'], found['indices'], found['values'])
+
+    return matrix, header['positions']
+
+
+def read_influence_dict(filepath):
+    """
+    Read a weight file into the influence dictionary used by SkinWeightData.
+
+    Returns:
+        dict: dict[influence] = {'position': [x, y, z], 'weights': [weight per vertex]}
+    """
+
+    matrix, positions = read_weight_file(filepath)
+
+    vertex_count = matrix.vertex_count
+
+    influence_dict = {}
+
+    for influence, position, (vertex_indices, weights) in zip(matrix.influences, positions,
+                                                              matrix.get_sparse_columns()):
+        column = [0.0] * vertex_count
+        for vertex_index, weight in zip(vertex_indices, weights):
+            column[vertex_index] = weight
+
+        influence_dict[influence] = {'position': position, 'weights': column}
+
+    return influence_dict
+
+
+def write_influence_dict(filepath, influence_dict, compress=True):
+    """
+    Write an influence dictionary, as returned by read_influence_dict, to a weight file.
+    """
+
+    matrix = SkinWeightMatrix.from_influence_dict(influence_dict)
+    positions = [influence_dict[influence].get('position') for influence in matrix.influences]
+
+    return write_weight_file(filepath, matrix, positions, compress=compress)
+
+
+def get_weight_hash(matrix, positions=None, settings_lines=None):
+    """
+    Hash the weights of a mesh before they are written.
+    Two exports with the same hash write the same weight files.
+
+    Args:
+        matrix (SkinWeightMatrix): The weights, with influence names as columns.
+        positions (list): The world position of each influence.
+        settings_lines (list): The lines of settings.info, these hold the topology of the mesh.
+
+    Returns:
+        str
+    """
+
+    hash_inst = hashlib.sha1()
+
+    header = {'influences': matrix.influences,
+              'positions': positions,
+              'settings': settings_lines}
+
+    hash_inst.update(json.dumps(header, sort_keys=True).encode('utf-8'))
+
+    for values in (matrix.offsets, matrix.indices, matrix.values):
+        hash_inst.update(_array_to_bytes(values))
+
+    return hash_inst.hexdigest()
+
+
+def get_folder_hash(file_entries):
+    """
+    Combine the hashes of the files of a mesh folder into one hash.
+
+    Args:
+        file_entries (dict): dict[filename] = {'size': int, 'hash': str}
+
+    Returns:
+        str
+    """
+
+    hash_inst = hashlib.sha1()
+
+    names = list(file_entries.keys())
+    names.sort()
+
+    for name in names:
+        hash_inst.update(('%s:%s\n' % (name, file_entries[name]['hash'])).encode('utf-8'))
+
+    return hash_inst.hexdigest()
+
+
+def create_catalog_entry(folder_path, mesh=None, mesh_info=None, influences=None, positions=None,
+                         vertex_count=None):
+    """
+    Describe a mesh folder for the WeightCatalog. The files in the folder are sized and hashed.
+
+    Args:
+        folder_path (str): The mesh folder.
+        mesh (str): The name of the mesh the weights came from.
+        mesh_info (list): [vertex count, edge count, face count, first face verts, last face verts]
+        influences (list): The influence names.
+        positions (list): The world position of each influence.
+        vertex_count (int): The number of weighted points.
+
+    Returns:
+        dict
+    """
+
+    files = {}
+
+    for filename in util_file.get_files(folder_path):
+        filepath = util_file.join_path(folder_path, filename)
+        files[filename] = {'size': os.path.getsize(filepath),
+                           'hash': util_file.get_file_hash(filepath)}
+
+    entry = {'mesh': mesh,
+             'vertex_count': vertex_count,
+             'influences': list(influences or []),
+             'positions': [list(position) if position is not None else None for position in (positions or [])],
+             'files': files,
+             'size': sum(file_entry['size'] for file_entry in files.values()),
+             'hash': get_folder_hash(files)}
+
+    if mesh_info:
+        entry['topology'] = {'vertex_count': mesh_info[0],
+                             'edge_count': mesh_info[1],
+                             'face_count': mesh_info[2],
+                             'first_face': list(mesh_info[3]),
+                             'last_face': list(mesh_info[4])}
+
+    return entry
+
+
+class WeightCatalog(object):
+    """
+    One small json file in a skin weights data folder that describes every mesh folder in it.
+    It is written at export, so listing meshes, checking topology and finding what changed
+    do not need to open each mesh folder.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.filepath = util_file.join_path(directory, catalog_file_name)
+        self.entries = {}
+
+        self.load()
+
+    def exists(self):
+        return util_file.is_file(self.filepath)
+
+    def load(self):
+        """
+        Returns:
+            bool: Whether a catalog was found.
+        """
+
+        self.entries = {}
+
+        if not self.exists():
+            return False
+
+        data = util_file.get_json(self.filepath)
+
+        if not data:
+            return False
+
+        self.entries = data.get('meshes', {})
+
+        return True
+
+    def save(self):
+        data = {'version': _catalog_version, 'meshes': self.entries}
+
+        util_file.set_json(self.filepath, data, atomic=True)
+
+        return self.filepath
+
+    def get_folders(self):
+        folders = list(self.entries.keys())
+        folders.sort()
+
+        return folders
+
+    def has_entry(self, folder):
+        return folder in self.entries
+
+    def get_entry(self, folder):
+        return self.entries.get(folder)
+
+    def set_entry(self, folder, entry):
+        self.entries[folder] = entry
+
+    def remove_entry(self, folder):
+        if folder in self.entries:
+            self.entries.pop(folder)
+            return True
+
+        return False
+
+    def is_file_current(self, folder, filename):
+        """
+        Whether a file in a mesh folder is still the file recorded in the catalog.
+        A folder written by an older vtool, copied in by hand or reverted keeps its old entry.
+
+        Returns:
+            bool
+        """
+
+        entry = self.get_entry(folder)
+
+        if not entry:
+            return False
+
+        file_entry = entry.get('files', {}).get(filename)
+
+        if not file_entry:
+            return False
+
+        filepath = util_file.join_path(util_file.join_path(self.directory, folder), filename)
+
+        try:
+            size = os.path.getsize(filepath)
+        except OSError:
+            return False
+
+        if size != file_entry['size']:
+            return False
+
+        return util_file.get_file_hash(filepath) == file_entry['hash']
+
+    def get_topology(self, folder):
+        entry = self.get_entry(folder)
+
+        if not entry:
+            return
+
+        return entry.get('topology')
+
+    def is_compatible(self, folder, vertex_count, edge_count=None, face_count=None):
+        """
+        Check the topology counts of a mesh against the counts recorded for folder.
+
+        Returns:
+            bool: None if the folder has no recorded topology.
+        """
+
+        topology = self.get_topology(folder)
+
+        if not topology:
+            return
+
+        if topology['vertex_count'] != vertex_count:
+            return False
+        if edge_count is not None and topology['edge_count'] != edge_count:
+            return False
+        if face_count is not None and topology['face_count'] != face_count:
+            return False
+
+        return True
+
+    def get_changes(self, other):
+        """
+        Compare this catalog against another, usually a catalog from an older version.
+
+        Args:
+            other (WeightCatalog): The catalog to compare against.
+
+        Returns:
+            dict: 'added', 'removed' and 'changed' lists of folder names.
+        """
+
+        other_entries = {}
+        if other:
+            other_entries = other.entries
+
+        added = []
+        changed = []
+
+        for folder in self.get_folders():
+            if folder not in other_entries:
+                added.append(folder)
+                continue
+
+            if self.entries[folder].get('hash') != other_entries[folder].get('hash'):
+                changed.append(folder)
+
+        removed = [folder for folder in other_entries if folder not in self.entries]
+        removed.sort()
+
+        return {'added': added, 'removed': removed, 'changed': changed}
+
+
+def benchmark_weight_formats(directory, vertex_count=200000, influence_count=300, max_influences=4, seed=0):
+    """
+    Compare writing and reading the text weight layout against the binary weight file.
+    Synthetic weights are written into directory/text and directory/binary.
+
+    Returns:
+        dict: Timings in seconds and sizes in bytes for each format.
+    """
+
+    random_inst = random.Random(seed)
+
+    influences = ['joint_%s' % inc for inc in range(influence_count)]
+    columns = [[0] * vertex_count for _ in range(influence_count)]
+
+    for vertex_index in range(vertex_count):
+        picked = random_inst.sample(range(influence_count), max_influences)
+        split = [random_inst.random() for _ in picked]
+        total = sum(split)
+        for influence_index, weight in zip(picked, split):
+            columns[influence_index][vertex_index] = weight / total
+
+    positions = [[0.0, float(inc), 0.0] for inc in range(influence_count)]
+
+    text_path = util_file.create_dir('text', directory)
+    binary_path = util_file.create_dir('binary', directory)
+
+    results = {}
+
+    start = time.time()
+    info_lines = []
+    for influence, position, weights in zip(influences, positions, columns):
+        filepath = util_file.create_file('%s.weights' % influence, text_path)
+        util_file.write_lines(filepath, str(weights))
+        info_lines.append("{'%s' : {'position' : %s}}" % (influence, str(position)))
+    util_file.write_lines(util_file.create_file('influence.info', text_path), info_lines)
+    results['text_write'] = time.time() - start
+
+    start = time.time()
+    for influence in influences:
+        lines = util_file.get_file_lines(util_file.join_path(text_path, '%s.weights' % influence))
+        json.loads(lines[0])
+    results['text_read'] = time.time() - start
+
+    results['text_size'] = sum(os.path.getsize(util_file.join_path(text_path, filename))
+                               for filename in util_file.get_files(text_path))
+
+    for compress in (True, False):
+        suffix = 'compressed'
+        if not compress:
+            suffix = 'mapped'
+
+        filepath = util_file.join_path(binary_path, '%s.%s' % (suffix, weight_file_name))
+
+        start = time.time()
+        matrix = SkinWeightMatrix.from_columns(influences, columns, vertex_count)
+        write_weight_file(filepath, matrix, positions, compress=compress)
+        results['binary_%s_write' % suffix] = time.time() - start
+
+        start = time.time()
+        read_weight_file(filepath)
+        results['binary_%s_read' % suffix] = time.time() - start
+
+        start = time.time()
+        read_influence_dict(filepath)
+        results['binary_%s_read_dense' % suffix] = time.time() - start
+
+        results['binary_%s_size' % suffix] = os.path.getsize(filepath)
+
+    keys = list(results.keys())
+    keys.sort()
+    for key in keys:
+        util.show('%s: %s' % (key, results[key]))
+
+    return results